@@ -1,54 +1,74 @@
-import importlib.util
-import os
-import sys
-import json
-
-NODE_CLASS_MAPPINGS = {}
-NODE_DISPLAY_NAME_MAPPINGS = {}
-
-python = sys.executable
-
-def get_ext_dir(subpath=None, mkdir=False):
-    dir = os.path.dirname(__file__)
-    if subpath is not None:
-        dir = os.path.join(dir, subpath)
-
-    dir = os.path.abspath(dir)
-
-    if mkdir and not os.path.exists(dir):
-        os.makedirs(dir)
-    return dir
-
-def serialize(obj):
-    if isinstance(obj, (str, int, float, bool, list, dict, type(None))):
-        return obj
-    return str(obj)
-
-# 获取py目录路径
-py = get_ext_dir("py")
-
-# 遍历py目录中的所有.py文件
-files = os.listdir(py)
-all_nodes = {}
-
-for file in files:
-    if not file.endswith(".py"):
-        continue
-    name = os.path.splitext(file)[0]
-    imported_module = importlib.import_module(".py.{}".format(name), __name__)
-    try:
-        NODE_CLASS_MAPPINGS = {**NODE_CLASS_MAPPINGS, **imported_module.NODE_CLASS_MAPPINGS}
-        NODE_DISPLAY_NAME_MAPPINGS = {**NODE_DISPLAY_NAME_MAPPINGS, **imported_module.NODE_DISPLAY_NAME_MAPPINGS}
-        serialized_CLASS_MAPPINGS = {k: serialize(v) for k, v in imported_module.NODE_CLASS_MAPPINGS.items()}
-        serialized_DISPLAY_NAME_MAPPINGS = {k: serialize(v) for k, v in imported_module.NODE_DISPLAY_NAME_MAPPINGS.items()}
-        all_nodes[file] = {
-            "NODE_CLASS_MAPPINGS": serialized_CLASS_MAPPINGS, 
-            "NODE_DISPLAY_NAME_MAPPINGS": serialized_DISPLAY_NAME_MAPPINGS
-        }
-    except Exception as e:
-        print(f"Error loading {file}: {str(e)}")
-
-# 定义web目录（如果需要前端资源）
-WEB_DIRECTORY = "./js"
-
-__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"] 
\ No newline at end of file
+import importlib
+
+# 静态节点清单：节点名 -> (py目录下的模块名, 类名, 显示名称)
+# 注册时不导入任何节点模块（也就不会导入 torch/numpy/PIL），
+# 节点类在第一次被访问（INPUT_TYPES、IS_CHANGED、执行等）时才真正加载
+NODE_MANIFEST = {
+    "ycCanvasAnimationPathBrush": ("Canvas_AnimationPathBrush", "ycCanvasAnimationPathBrush", "Canvas Animation Path Brush"),
+    "ycImageAnimatePath": ("Image_AnimatePath", "ycImageAnimatePath", "Image Animate Path"),
+    "ycImageAnimatePathSweep": ("Image_AnimatePathSweep", "ycImageAnimatePathSweep", "Image Animate Path Sweep"),
+    "ycImageAnimatePathToDisk": ("Image_AnimatePathToDisk", "ycImageAnimatePathToDisk", "Image Animate Path To Disk"),
+    "ycAnimationEffects": ("Animation_Effects", "ycAnimationEffects", "Animation Effects"),
+    "ycAnimationEffectsMerge": ("Animation_EffectsMerge", "ycAnimationEffectsMerge", "Animation Effects Merge"),
+    "ycAnimatedLayerComposite": ("Animation_LayerComposite", "ycAnimatedLayerComposite", "Animated Layer Composite"),
+    "ycAnimationTrajectoryExport": ("Animation_TrajectoryExport", "ycAnimationTrajectoryExport", "Animation Trajectory Export"),
+    "ycAnimationPointTracks": ("Animation_PointTracks", "ycAnimationPointTracks", "Animation Point Tracks"),
+    "ycAnimationOpticalFlow": ("Animation_OpticalFlow", "ycAnimationOpticalFlow", "Animation Optical Flow"),
+}
+
+
+class _LazyNodeMeta(type):
+    """
+    延迟加载的节点类：
+    - 类属性访问（RETURN_TYPES、INPUT_TYPES 等）转发到真实节点类
+    - 实例化时直接返回真实节点类的实例
+    ComfyUI 写入的属性（如 RELATIVE_PYTHON_MODULE）保存在代理类上
+    """
+
+    def _load(cls):
+        real_class = type.__getattribute__(cls, "__dict__").get("_real_class")
+        if real_class is None:
+            module = importlib.import_module(f".py.{cls._module_name}", __name__)
+            real_class = getattr(module, cls._class_name)
+            type.__setattr__(cls, "_real_class", real_class)
+        return real_class
+
+    def __getattr__(cls, name):
+        # 只有代理类自身没有的属性才会进入这里
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return getattr(cls._load(), name)
+
+    def __call__(cls, *args, **kwargs):
+        return cls._load()(*args, **kwargs)
+
+
+def _make_lazy_node(node_name, module_name, class_name):
+    return _LazyNodeMeta(node_name, (), {
+        "__module__": f"{__name__}.py.{module_name}",
+        "__doc__": None,
+        "_module_name": module_name,
+        "_class_name": class_name,
+    })
+
+
+NODE_CLASS_MAPPINGS = {
+    node_name: _make_lazy_node(node_name, module_name, class_name)
+    for node_name, (module_name, class_name, _) in NODE_MANIFEST.items()
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    node_name: display_name
+    for node_name, (_, _, display_name) in NODE_MANIFEST.items()
+}
+
+# 轨迹预览HTTP接口（/yc_animation/trajectory），只在ComfyUI服务器中注册
+try:
+    from .py.TrajectoryServer import register_routes
+    register_routes()
+except ImportError:
+    pass
+
+# 定义web目录（如果需要前端资源）
+WEB_DIRECTORY = "./js"
+
+__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
@@ -0,0 +1,283 @@
+"""
+动画管线基准测试
+- 合成背景图、前景精灵（单个/批次）、画笔路径（1万~5万点）和效果字符串
+- 计时 ycImageAnimatePath.animate、PathDataParser.parse/serialize、ycCanvasAnimationPathBrush.main
+- 结果输出为 JSON，可与基线结果对比
+
+用法：
+    python benchmarks/bench_animation.py --preset quick --output bench.json
+    python benchmarks/bench_animation.py --preset full --baseline bench.json --fail-on-regression
+"""
+import argparse
+import itertools
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+
+import comfy_stub
+
+comfy_stub.install()
+
+import torch  # noqa: E402
+
+from PathDataParser import PathDataParser  # noqa: E402
+from Image_AnimatePath import ycImageAnimatePath  # noqa: E402
+from Canvas_AnimationPathBrush import ycCanvasAnimationPathBrush  # noqa: E402
+
+
+# 基准矩阵预设
+PRESETS = {
+    "quick": {
+        "canvas_sizes": [(512, 512)],
+        "frame_counts": [30],
+        "modes": ["single", "batch"],
+        "smooth": [True, False],
+        "animate_path_points": [200],
+        "parser_path_points": [10000],
+        "repeats": 3,
+    },
+    "full": {
+        "canvas_sizes": [(512, 512), (1024, 576), (1920, 1080)],
+        "frame_counts": [30, 120],
+        "modes": ["single", "batch"],
+        "smooth": [True, False],
+        "animate_path_points": [200, 2000],
+        "parser_path_points": [10000, 50000],
+        "repeats": 5,
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# 合成数据
+# ---------------------------------------------------------------------------
+
+def make_background(width, height, seed=0):
+    """渐变 + 噪声背景 (1, H, W, 3)"""
+    gen = torch.Generator().manual_seed(seed)
+    ys = torch.linspace(0.0, 1.0, height).view(height, 1, 1)
+    xs = torch.linspace(0.0, 1.0, width).view(1, width, 1)
+    base = torch.cat([xs.expand(height, width, 1), ys.expand(height, width, 1),
+                      ((xs + ys) / 2).expand(height, width, 1)], dim=2)
+    noise = torch.rand((height, width, 3), generator=gen) * 0.1
+    return (base * 0.9 + noise).clamp(0.0, 1.0).unsqueeze(0)
+
+
+def make_sprites(count, size, seed=0):
+    """圆形精灵批次 (B, h, w, 3) 及对应遮罩 (B, h, w)"""
+    gen = torch.Generator().manual_seed(seed)
+    coords = torch.linspace(-1.0, 1.0, size)
+    radius = torch.sqrt(coords.view(size, 1) ** 2 + coords.view(1, size) ** 2)
+    masks = []
+    images = []
+    for i in range(count):
+        r = 0.6 + 0.4 * (i + 1) / count
+        masks.append((radius <= r).float())
+        color = torch.rand(3, generator=gen)
+        images.append(color.view(1, 1, 3) * (1.0 - 0.5 * radius.clamp(0, 1)).unsqueeze(2))
+    return torch.stack(images).clamp(0.0, 1.0), torch.stack(masks)
+
+
+def make_brush_points(num_points, width, height, seed=0):
+    """模拟画笔轨迹：平滑曲线 + 手抖噪声"""
+    rng = random.Random(seed)
+    points = []
+    for i in range(num_points):
+        t = i / max(1, num_points - 1)
+        x = width * (0.1 + 0.8 * t) + math.sin(t * math.pi * 6) * width * 0.05 + rng.uniform(-0.5, 0.5)
+        y = height * (0.5 + 0.3 * math.sin(t * math.pi * 2)) + rng.uniform(-0.5, 0.5)
+        points.append({"x": x, "y": y})
+    return points
+
+
+def make_path_data(num_points, width, height, num_keyframes, total_frames, seed=0):
+    """把一条画笔轨迹切分到多个关键帧，返回 JSON 格式的 path_data"""
+    points = make_brush_points(num_points, width, height, seed)
+    keyframes = []
+    chunk = max(2, math.ceil(num_points / num_keyframes))
+    for k in range(num_keyframes):
+        segment = points[k * chunk:(k + 1) * chunk + 1]
+        if not segment:
+            break
+        frame = round(k * (total_frames - 1) / max(1, num_keyframes))
+        keyframes.append({"frame": frame, "points": segment})
+    return PathDataParser.serialize(keyframes, use_json=True)
+
+
+def make_effects_data(num_keyframes, total_frames):
+    """每个关键帧一组效果"""
+    effect_strings = []
+    for k in range(num_keyframes + 1):
+        frame = round(k * (total_frames - 1) / max(1, num_keyframes))
+        scale = 0.8 + 0.4 * (k % 2)
+        effect_strings.append(f"{frame}:{scale},{scale},{k * 30.0},{k % 2},0,{1.0 - 0.1 * (k % 3)}")
+    return '|'.join(effect_strings)
+
+
+# ---------------------------------------------------------------------------
+# 计时
+# ---------------------------------------------------------------------------
+
+def time_call(func, repeats):
+    """重复执行并返回每次耗时（秒）"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(name, params, times):
+    return {
+        "name": name,
+        "params": params,
+        "id": name + "[" + ",".join(f"{k}={params[k]}" for k in sorted(params)) + "]",
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+
+
+def bench_parser(preset, results):
+    for num_points in preset["parser_path_points"]:
+        path_data = make_path_data(num_points, 1024, 1024, 4, 120)
+        legacy_data = PathDataParser.serialize(PathDataParser.parse(path_data)["keyframes"], use_json=False)
+        parsed = PathDataParser.parse(path_data)
+        params = {"points": num_points}
+        results.append(summarize("PathDataParser.parse[json]", params,
+                                 time_call(lambda: PathDataParser.parse(path_data), preset["repeats"])))
+        results.append(summarize("PathDataParser.parse[legacy]", params,
+                                 time_call(lambda: PathDataParser.parse(legacy_data), preset["repeats"])))
+        results.append(summarize("PathDataParser.serialize", params,
+                                 time_call(lambda: PathDataParser.serialize(parsed["keyframes"]), preset["repeats"])))
+
+
+def bench_brush(preset, results):
+    node = ycCanvasAnimationPathBrush()
+    for num_points, (width, height) in itertools.product(preset["parser_path_points"], preset["canvas_sizes"]):
+        path_data = make_path_data(num_points, width, height, 4, 120)
+        params = {"points": num_points, "canvas": f"{width}x{height}"}
+        results.append(summarize(
+            "ycCanvasAnimationPathBrush.main", params,
+            time_call(lambda: node.main(width, height, path_data, 120, True), preset["repeats"])
+        ))
+
+
+def bench_animate(preset, results):
+    node = ycImageAnimatePath()
+    sprites, sprite_masks = make_sprites(3, 128)
+    matrix = itertools.product(preset["canvas_sizes"], preset["frame_counts"], preset["modes"],
+                               preset["smooth"], preset["animate_path_points"])
+    for (width, height), total_frames, mode, smooth, num_points in matrix:
+        background = make_background(width, height)
+        path_data = make_path_data(num_points, width, height, 3, total_frames)
+        effects_data = make_effects_data(3, total_frames)
+        kwargs = dict(
+            background_image=background, path_data=path_data, canvas_width=width, canvas_height=height,
+            total_frames=total_frames, foreground_scale=1.0, center_anchor=True, smooth_path=smooth,
+            effects_data=effects_data,
+        )
+        if mode == "batch":
+            kwargs.update(foreground_images=sprites, foreground_masks=sprite_masks,
+                          keyframe_image_map=f"0:0|{total_frames // 3}:1|{2 * total_frames // 3}:2")
+        else:
+            kwargs.update(foreground_image=sprites[:1], foreground_mask=sprite_masks[:1])
+        params = {"canvas": f"{width}x{height}", "frames": total_frames, "mode": mode,
+                  "smooth": smooth, "points": num_points}
+        results.append(summarize("ycImageAnimatePath.animate", params,
+                                 time_call(lambda: node.animate(**kwargs), preset["repeats"])))
+
+
+# ---------------------------------------------------------------------------
+# 基线对比
+# ---------------------------------------------------------------------------
+
+def compare_with_baseline(results, baseline, threshold):
+    """按 id 对比中位数耗时，返回回归项列表"""
+    baseline_by_id = {r["id"]: r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'benchmark':<90} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in results:
+        base = baseline_by_id.get(result["id"])
+        if base is None:
+            print(f"{result['id']:<90} {'-':>10} {result['median'] * 1000:>9.1f}ms {'new':>7}")
+            continue
+        ratio = result["median"] / base["median"] if base["median"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(result["id"])
+        elif ratio < 1.0 - threshold:
+            flag = "  faster"
+        print(f"{result['id']:<90} {base['median'] * 1000:>9.1f}ms {result['median'] * 1000:>9.1f}ms "
+              f"{ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ComfyUI-YCNodes_Animation benchmark suite")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--only", choices=["parser", "brush", "animate"], action="append",
+                        help="只运行指定的基准组（可重复）")
+    parser.add_argument("--repeats", type=int, default=None, help="覆盖预设的重复次数")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径（默认输出到标准输出）")
+    parser.add_argument("--baseline", default=None, help="基线结果 JSON，对比中位数耗时")
+    parser.add_argument("--threshold", type=float, default=0.10, help="回归判定阈值（默认10%%）")
+    parser.add_argument("--fail-on-regression", action="store_true", help="存在回归时返回非零退出码")
+    args = parser.parse_args(argv)
+
+    preset = dict(PRESETS[args.preset])
+    if args.repeats:
+        preset["repeats"] = args.repeats
+    groups = args.only or ["parser", "brush", "animate"]
+
+    torch.manual_seed(0)
+    results = []
+    if "parser" in groups:
+        bench_parser(preset, results)
+    if "brush" in groups:
+        bench_brush(preset, results)
+    if "animate" in groups:
+        bench_animate(preset, results)
+
+    report = {
+        "meta": {
+            "preset": args.preset,
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_threads": torch.get_num_threads(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+    elif not args.baseline:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# author.yichengup.benchmarks 2025.01.XX
@@ -0,0 +1,85 @@
+"""
+启动耗时基准
+在全新的子进程中模拟 ComfyUI 加载自定义节点包的方式（spec_from_file_location + exec_module），
+分别测量：
+- register: 导入节点包（注册节点）的耗时，以及注册后是否已导入 torch/numpy/PIL
+- first_use: 首次访问所有节点的 INPUT_TYPES（触发真正的模块加载）的耗时
+
+用法：
+    python benchmarks/bench_startup.py --repeats 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import comfy_stub
+
+# 子进程中执行的测量脚本
+_PROBE = r"""
+import importlib.util, json, sys, time, types
+sys.modules.setdefault("nodes", types.ModuleType("nodes"))
+heavy = ("torch", "numpy", "PIL")
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("yc_animation_pkg", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+sys.modules["yc_animation_pkg"] = module
+spec.loader.exec_module(module)
+register = time.perf_counter() - start
+heavy_after_register = sorted(name for name in heavy if name in sys.modules)
+start = time.perf_counter()
+for node_class in module.NODE_CLASS_MAPPINGS.values():
+    node_class.INPUT_TYPES()
+first_use = time.perf_counter() - start
+print(json.dumps({
+    "register": register,
+    "first_use": first_use,
+    "heavy_after_register": heavy_after_register,
+    "nodes": len(module.NODE_CLASS_MAPPINGS),
+}))
+"""
+
+
+def run_probe(init_path):
+    output = subprocess.check_output([sys.executable, "-c", _PROBE, init_path], text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ComfyUI-YCNodes_Animation startup benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径（默认输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    init_path = os.path.join(comfy_stub.REPO_DIR, "__init__.py")
+    runs = [run_probe(init_path) for _ in range(args.repeats)]
+    report = {
+        "repeats": args.repeats,
+        "nodes": runs[0]["nodes"],
+        "heavy_modules_after_register": runs[0]["heavy_after_register"],
+        "register_seconds": {
+            "min": min(r["register"] for r in runs),
+            "median": statistics.median(r["register"] for r in runs),
+        },
+        "first_use_seconds": {
+            "min": min(r["first_use"] for r in runs),
+            "median": statistics.median(r["first_use"] for r in runs),
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote startup benchmark to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# author.yichengup.benchmarks 2025.01.XX
@@ -0,0 +1,21 @@
+"""
+ComfyUI 运行环境桩模块
+基准测试在无 ComfyUI 的环境中（纯 CPU、无界面）运行，
+这里只提供节点模块导入时需要的最小占位模块
+"""
+import os
+import sys
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PY_DIR = os.path.join(REPO_DIR, "py")
+
+
+def install():
+    """注册占位模块，并把 py/ 目录加入 sys.path（节点模块支持绝对导入）"""
+    if "nodes" not in sys.modules:
+        sys.modules["nodes"] = types.ModuleType("nodes")
+    if PY_DIR not in sys.path:
+        sys.path.insert(0, PY_DIR)
+
+# author.yichengup.benchmarks 2025.01.XX
@@ -0,0 +1,77 @@
+// author.yichengup.AnimationEffectsMerge 2025.01.XX
+import { app } from "../../../scripts/app.js";
+
+// 固定声明的输入数量（effects_1 ~ effects_8），之后的输入按需添加
+const FIXED_INPUTS = 8;
+const INPUT_PATTERN = /^effects_(\d+)$/;
+
+function getDynamicInputs(node) {
+    return (node.inputs || [])
+        .map((input, slot) => ({ input, slot, match: INPUT_PATTERN.exec(input.name) }))
+        .filter(item => item.match && parseInt(item.match[1]) > FIXED_INPUTS)
+        .map(item => ({ ...item, index: parseInt(item.match[1]) }))
+        .sort((a, b) => a.index - b.index);
+}
+
+function isConnected(node, name) {
+    const input = (node.inputs || []).find(item => item.name === name);
+    return !!(input && input.link != null);
+}
+
+// 保持末尾始终只有一个空闲的动态输入：连接最后一个时追加，断开后移除多余的空闲输入
+function syncDynamicInputs(node) {
+    let dynamicInputs = getDynamicInputs(node);
+
+    // 移除末尾多余的空闲输入（保留一个）
+    while (dynamicInputs.length > 1) {
+        const last = dynamicInputs[dynamicInputs.length - 1];
+        const previous = dynamicInputs[dynamicInputs.length - 2];
+        if (last.input.link != null || previous.input.link != null) {
+            break;
+        }
+        node.removeInput(last.slot);
+        dynamicInputs = getDynamicInputs(node);
+    }
+
+    const lastIndex = dynamicInputs.length > 0 ? dynamicInputs[dynamicInputs.length - 1].index : FIXED_INPUTS;
+    const lastName = `effects_${lastIndex}`;
+    const lastIsFree = dynamicInputs.length > 0 && !isConnected(node, lastName);
+    if (!lastIsFree) {
+        node.addInput(`effects_${lastIndex + 1}`, "STRING");
+    }
+    node.setDirtyCanvas(true, true);
+}
+
+app.registerExtension({
+    name: "ycAnimationEffectsMerge",
+    async beforeRegisterNodeDef(nodeType, nodeData) {
+        if (nodeData.name !== "ycAnimationEffectsMerge") {
+            return;
+        }
+
+        const onNodeCreated = nodeType.prototype.onNodeCreated;
+        nodeType.prototype.onNodeCreated = function () {
+            const result = onNodeCreated?.apply(this, arguments);
+            syncDynamicInputs(this);
+            return result;
+        };
+
+        const onConnectionsChange = nodeType.prototype.onConnectionsChange;
+        nodeType.prototype.onConnectionsChange = function (type, slotIndex, connected, link, ioSlot) {
+            const result = onConnectionsChange?.apply(this, arguments);
+            // 只处理输入端（LiteGraph.INPUT === 1）
+            if (type === 1 && ioSlot && INPUT_PATTERN.test(ioSlot.name)) {
+                syncDynamicInputs(this);
+            }
+            return result;
+        };
+
+        const onConfigure = nodeType.prototype.onConfigure;
+        nodeType.prototype.onConfigure = function () {
+            const result = onConfigure?.apply(this, arguments);
+            // 加载工作流时输入已按保存的状态恢复，只需补齐末尾的空闲输入
+            setTimeout(() => syncDynamicInputs(this), 0);
+            return result;
+        };
+    }
+});
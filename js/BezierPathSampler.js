@@ -181,5 +181,47 @@ export function sampleMultiplePaths(paths, options = {}) {
     return allSampledPoints;
 }
 
+/**
+ * 将多个钢笔路径的锚点合并为一条贝塞尔锚点序列（不采样，供后端解析求值）
+ * 首尾重合的路径在连接处合并为一个锚点；不重合时以直线连接（与 sampleMultiplePaths 一致）
+ * @param {Array} paths - 路径数组 [{points: [{x, y, cp1, cp2}, ...]}, ...]
+ * @returns {Array} 锚点序列 [{x, y, cp1?, cp2?}, ...]
+ */
+export function joinBezierAnchors(paths) {
+    const anchors = [];
+    const copyAnchor = (p) => {
+        const anchor = { x: p.x, y: p.y };
+        if (p.cp1) anchor.cp1 = { x: p.cp1.x, y: p.cp1.y };
+        if (p.cp2) anchor.cp2 = { x: p.cp2.x, y: p.cp2.y };
+        return anchor;
+    };
+
+    for (const path of paths || []) {
+        const points = (path && path.points) || [];
+        if (points.length === 0) {
+            continue;
+        }
+        const first = copyAnchor(points[0]);
+        if (anchors.length > 0) {
+            const last = anchors[anchors.length - 1];
+            if (Math.abs(last.x - first.x) < 0.01 && Math.abs(last.y - first.y) < 0.01) {
+                // 连接处合并为一个锚点：保留前一路径的入控制柄和后一路径的出控制柄
+                if (first.cp2) last.cp2 = first.cp2; else delete last.cp2;
+            } else {
+                // 直线连接：去掉连接处的控制柄
+                delete last.cp2;
+                delete first.cp1;
+                anchors.push(first);
+            }
+        } else {
+            anchors.push(first);
+        }
+        for (let i = 1; i < points.length; i++) {
+            anchors.push(copyAnchor(points[i]));
+        }
+    }
+    return anchors;
+}
+
 // author.yichengup.BezierPathSampler 2025.01.XX
 
@@ -1,5 +1,5 @@
 // author.yichengup.CanvasAnimationPathBrush.ui 2025.01.XX
-import { sampleMultiplePaths } from "./BezierPathSampler.js";
+import { sampleMultiplePaths, joinBezierAnchors } from "./BezierPathSampler.js";
 import { PathDataParser } from "./PathDataParser.js";
 
 export const WIDGET_NAMES = {
@@ -267,8 +267,14 @@ export function initUIBindings(node, state) {
                         const paths = [];
                         if (kf.points && kf.points.length > 0) {
                             // 将点序列转换为路径对象
+                            // 贝塞尔关键帧恢复锚点和控制柄
                             paths.push({ 
-                                points: kf.points.map(p => ({ x: p.x, y: p.y })),
+                                points: (kf.bezier || kf.points).map(p => {
+                                    const point = { x: p.x, y: p.y };
+                                    if (p.cp1) point.cp1 = { x: p.cp1.x, y: p.cp1.y };
+                                    if (p.cp2) point.cp2 = { x: p.cp2.x, y: p.cp2.y };
+                                    return point;
+                                }),
                                 keyframePoints: [] // 从元数据中恢复关键帧点（如果需要）
                             });
                         }
@@ -702,6 +708,10 @@ export function initUIBindings(node, state) {
 export function syncPathDataWidget(node) {
     // 收集所有关键帧的路径数据，使用新的JSON格式
     const framePathMap = {}; // {frame: [points], ...}
+    const frameSourcePaths = {}; // {frame: [path 或 null（非贝塞尔路径）], ...}
+    const recordSourcePath = (frame, path) => {
+        (frameSourcePaths[frame] = frameSourcePaths[frame] || []).push(path);
+    };
     
     for (const kf of node.properties.keyframes) {
         for (const path of kf.paths) {
@@ -751,6 +761,7 @@ export function syncPathDataWidget(node) {
                     if (!framePathMap[frame]) {
                         framePathMap[frame] = [];
                     }
+                    recordSourcePath(frame, isBezierPath ? path : null);
                     // 如果该关键帧还没有路径点，添加完整路径
                     if (framePathMap[frame].length === 0) {
                         framePathMap[frame].push(...sampledPoints);
@@ -773,6 +784,7 @@ export function syncPathDataWidget(node) {
                 if (!framePathMap[kf.frame]) {
                     framePathMap[kf.frame] = [];
                 }
+                recordSourcePath(kf.frame, isBezierPath ? path : null);
                 // 如果该关键帧已有路径点，合并路径（去重连接点）
                 if (framePathMap[kf.frame].length === 0) {
                     framePathMap[kf.frame].push(...sampledPoints);
@@ -793,14 +805,25 @@ export function syncPathDataWidget(node) {
     }
     
     // 转换为新的JSON格式
+    // 完全由贝塞尔路径组成的关键帧直接发送锚点和控制柄（后端解析求值），不发送采样点
     const keyframes = Object.keys(framePathMap)
         .sort((a, b) => parseInt(a) - parseInt(b))
-        .map(frame => ({
-            frame: parseInt(frame),
-            points: framePathMap[frame],
-            direction: node.properties.keyframes.find(kf => kf.frame === parseInt(frame))?.direction || 1,
-            metadata: node.properties.keyframes.find(kf => kf.frame === parseInt(frame))?.metadata || {}
-        }));
+        .map(frame => {
+            const sourcePaths = frameSourcePaths[frame] || [];
+            const bezier = sourcePaths.length > 0 && sourcePaths.every(path => path)
+                ? joinBezierAnchors(sourcePaths)
+                : null;
+            const keyframe = {
+                frame: parseInt(frame),
+                points: bezier ? bezier.map(a => ({ x: a.x, y: a.y })) : framePathMap[frame],
+                direction: node.properties.keyframes.find(kf => kf.frame === parseInt(frame))?.direction || 1,
+                metadata: node.properties.keyframes.find(kf => kf.frame === parseInt(frame))?.metadata || {}
+            };
+            if (bezier) {
+                keyframe.bezier = bezier;
+            }
+            return keyframe;
+        });
     
     // 使用PathDataParser序列化（JSON格式）
     const pathData = PathDataParser.serialize(keyframes, true, {});
@@ -136,15 +136,33 @@ export class PathDataParser {
      * @private
      */
     static _normalizeKeyframes(keyframes) {
-        const normalized = keyframes.map(kf => ({
-            frame: parseInt(kf.frame || 0),
-            points: (kf.points || []).map(p => ({
-                x: parseFloat(p.x || 0),
-                y: parseFloat(p.y || 0)
-            })),
-            direction: kf.direction !== undefined ? parseInt(kf.direction) : 1, // 默认正向
-            metadata: kf.metadata || {}
-        }));
+        const normalized = keyframes.map(kf => {
+            const normalizedKf = {
+                frame: parseInt(kf.frame || 0),
+                points: (kf.points || []).map(p => ({
+                    x: parseFloat(p.x || 0),
+                    y: parseFloat(p.y || 0)
+                })),
+                direction: kf.direction !== undefined ? parseInt(kf.direction) : 1, // 默认正向
+                metadata: kf.metadata || {}
+            };
+            // 贝塞尔几何：锚点 + 可选控制柄；没有点序列时使用锚点坐标
+            if (Array.isArray(kf.bezier) && kf.bezier.length > 0) {
+                normalizedKf.bezier = kf.bezier.map(a => {
+                    const anchor = { x: parseFloat(a.x || 0), y: parseFloat(a.y || 0) };
+                    for (const handle of ["cp1", "cp2"]) {
+                        if (a[handle]) {
+                            anchor[handle] = { x: parseFloat(a[handle].x || 0), y: parseFloat(a[handle].y || 0) };
+                        }
+                    }
+                    return anchor;
+                });
+                if (normalizedKf.points.length === 0) {
+                    normalizedKf.points = normalizedKf.bezier.map(a => ({ x: a.x, y: a.y }));
+                }
+            }
+            return normalizedKf;
+        });
 
         // 按帧号排序
         normalized.sort((a, b) => a.frame - b.frame);
@@ -0,0 +1,106 @@
+"""
+动画图层（稀疏输出）
+保存变换后的前景图块（按效果+前景图索引去重，相当于变换缓存）以及每帧的放置信息，
+不保存整幅画布，内存只与前景图尺寸有关；由合成节点铺到任意背景上
+"""
+import math
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class AnimatedLayer:
+    """
+    单个动画图层
+
+    - tiles: 变换后的前景图块列表，每项为 (h, w, 4) uint8 RGBA 数组
+    - tile_index: (T,) int32，每帧使用的图块索引，-1 表示该帧前景不可见
+    - offsets: (T, 2) int32，图块左上角的整数放置坐标（与渲染节点的粘贴坐标一致）
+    - subpixel: (T, 2) float32，精确放置坐标相对 offsets 的小数偏移
+    """
+
+    # 节点间传递的图层类型
+    LAYER_TYPE = "YC_ANIMATED_LAYER"
+
+    def __init__(self, frame_count: int, canvas_width: int, canvas_height: int):
+        self.canvas_width = int(canvas_width)
+        self.canvas_height = int(canvas_height)
+        self.tiles: List[np.ndarray] = []
+        self.tile_index = np.full((frame_count,), -1, dtype=np.int32)
+        self.offsets = np.zeros((frame_count, 2), dtype=np.int32)
+        self.subpixel = np.zeros((frame_count, 2), dtype=np.float32)
+        self._tile_keys: Dict[Hashable, int] = {}
+
+    @property
+    def frame_count(self) -> int:
+        return int(self.tile_index.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        """图块和放置表占用的字节数"""
+        tables = self.tile_index.nbytes + self.offsets.nbytes + self.subpixel.nbytes
+        return sum(tile.nbytes for tile in self.tiles) + tables
+
+    def has_tile(self, key: Hashable) -> bool:
+        return key in self._tile_keys
+
+    def add_tile(self, key: Hashable, tile_pil: Any) -> int:
+        """登记变换后的前景图块（PIL RGBA），相同 key 只保存一次，返回图块索引"""
+        index = self._tile_keys.get(key)
+        if index is None:
+            index = len(self.tiles)
+            self.tiles.append(np.array(tile_pil.convert("RGBA")))
+            self._tile_keys[key] = index
+        return index
+
+    def tile_for_key(self, key: Hashable) -> Optional[int]:
+        return self._tile_keys.get(key)
+
+    def place(self, frame_idx: int, tile_index: int, x: float, y: float, paste_x: int, paste_y: int):
+        """
+        记录一帧的放置信息
+        x, y: 图块左上角的精确坐标；paste_x, paste_y: 渲染时使用的整数坐标
+        """
+        self.tile_index[frame_idx] = tile_index
+        self.offsets[frame_idx] = (paste_x, paste_y)
+        self.subpixel[frame_idx] = (x - paste_x, y - paste_y)
+
+    def hide(self, frame_idx: int):
+        """该帧前景不可见"""
+        self.tile_index[frame_idx] = -1
+        self.offsets[frame_idx] = 0
+        self.subpixel[frame_idx] = 0.0
+
+    def fill_from_sources(self, frame_sources: List[int]):
+        """按 frame_sources 复制静止帧/跳帧的放置信息（与输出批次的复制方式一致）"""
+        sources = np.asarray(frame_sources, dtype=np.int64)
+        self.tile_index[:] = self.tile_index[sources]
+        self.offsets[:] = self.offsets[sources]
+        self.subpixel[:] = self.subpixel[sources]
+
+    def placement(self, frame_idx: int, subpixel: bool = False) -> Tuple[int, int, float, float]:
+        """
+        返回 (x, y, frac_x, frac_y)
+        subpixel=False 时为渲染节点的整数坐标，小数部分为0；
+        subpixel=True 时整数部分向下取整，小数部分在 [0, 1) 内
+        """
+        paste_x, paste_y = (int(v) for v in self.offsets[frame_idx])
+        if not subpixel:
+            return paste_x, paste_y, 0.0, 0.0
+        exact_x = paste_x + float(self.subpixel[frame_idx, 0])
+        exact_y = paste_y + float(self.subpixel[frame_idx, 1])
+        base_x = math.floor(exact_x)
+        base_y = math.floor(exact_y)
+        return base_x, base_y, exact_x - base_x, exact_y - base_y
+
+    def describe(self) -> Dict[str, Any]:
+        """图层摘要（用于日志/报告）"""
+        return {
+            "frames": self.frame_count,
+            "canvas": [self.canvas_width, self.canvas_height],
+            "tiles": len(self.tiles),
+            "visible_frames": int((self.tile_index >= 0).sum()),
+            "bytes": self.nbytes,
+        }
+
+# author.yichengup.AnimatedLayer 2025.01.XX
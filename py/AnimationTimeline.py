@@ -0,0 +1,900 @@
+"""
+动画时间轴
+路径插值（样条平滑 + 路径长度插值、贝塞尔）、效果插值、关键帧图片映射和循环播放规划，
+以及前景图逐帧仿射变换（与渲染结果一致，供点轨迹和光流使用）
+渲染节点和只计算运动的节点（轨迹导出、点轨迹、光流、轨迹预览接口）共用同一份时间轴，保证运动完全一致
+"""
+import json
+import math
+import os
+import sys
+
+import torch
+
+# 导入解析工具（支持相对导入和绝对导入）
+try:
+    from .PathDataParser import PathDataParser
+    from .EffectsDataParser import EffectsDataParser
+    from .BezierPath import BezierPath
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from PathDataParser import PathDataParser
+    from EffectsDataParser import EffectsDataParser
+    from BezierPath import BezierPath
+
+
+class AnimationTimeline:
+    """
+    时间轴计算（无状态，不做任何图像处理）
+    渲染节点继承本类；其他节点直接创建实例使用
+    """
+
+    def build_render_timeline(self, keyframes, effects_dict, total_frames, smooth_path=True,
+                               keyframe_image_map_dict=None, spline_tolerance=0.0, end_behavior="hold"):
+        """
+        预先计算每一帧的渲染参数
+        返回列表，每项为 {'position', 'path_kf_info', 'effects', 'fg_index', 'key'}
+        key 相同的帧渲染结果完全相同（位置、效果、前景图索引均一致）
+        end_behavior 为 loop/ping_pong 时（见 plan_cycle_frames），周期之后的帧不再插值，
+        直接沿用周期内对应帧的参数，并额外带有 'cycle_source'（对应的周期内帧号）
+        """
+        cycle_sources = self.plan_cycle_frames(keyframes, total_frames, end_behavior)
+        keyframes = self.prepare_timeline_keyframes(keyframes)
+        
+        timeline = []
+        for frame_idx in range(total_frames):
+            if cycle_sources is not None and cycle_sources[frame_idx] != frame_idx:
+                timeline.append(dict(timeline[cycle_sources[frame_idx]], cycle_source=cycle_sources[frame_idx]))
+                continue
+            
+            # 计算当前帧的位置（使用方案3A：样条平滑 + 路径长度插值）
+            position, path_kf_info = self.interpolate_position(
+                keyframes, frame_idx, total_frames, smooth_path, spline_tolerance
+            )
+            
+            # 计算当前帧的效果参数（基于路径关键帧）
+            effects = self._interpolate_effects_based_on_path(
+                effects_dict, frame_idx, total_frames, keyframes, path_kf_info
+            )
+            
+            # 前景图索引（单个前景图模式固定为0）
+            fg_index = 0
+            if keyframe_image_map_dict:
+                fg_index = self._get_foreground_index_for_frame(frame_idx, keyframe_image_map_dict)
+            
+            timeline.append({
+                'position': position,
+                'path_kf_info': path_kf_info,
+                'effects': effects,
+                'fg_index': fg_index,
+                'key': self._render_key(position, effects, fg_index),
+            })
+        return timeline
+    
+    def prepare_timeline_keyframes(self, keyframes):
+        """贝塞尔关键帧预先建立弧长参数化路径，所有帧共用"""
+        return [
+            dict(kf, bezier_path=BezierPath.from_anchors(kf['bezier'])) if kf.get('bezier') else kf
+            for kf in keyframes
+        ]
+    
+    def parse_variant_list(self, text):
+        """
+        解析多组数据：
+        - JSON数组：元素为字符串（原样使用）或对象（序列化为JSON字符串）
+        - 其他：每个非空行为一组
+        """
+        if not text or not text.strip():
+            return []
+        stripped = text.strip()
+        if stripped.startswith('['):
+            try:
+                items = json.loads(stripped)
+                return [item if isinstance(item, str) else json.dumps(item, separators=(',', ':'))
+                        for item in items]
+            except json.JSONDecodeError:
+                # 不是合法的JSON数组，按行解析
+                pass
+        return [line.strip() for line in stripped.splitlines() if line.strip()]
+    
+    def _render_key(self, position, effects, fg_index):
+        """生成帧的渲染键：位置 + 效果 + 前景图索引"""
+        position_key = None if position is None else (position['x'], position['y'])
+        effects_key = (
+            effects['scale_x'], effects['scale_y'], effects['rotation'],
+            bool(effects['flip_x']), bool(effects['flip_y']), effects['opacity']
+        )
+        return (position_key, effects_key, fg_index)
+    
+    def plan_cycle_frames(self, keyframes, total_frames, end_behavior):
+        """
+        循环/往返播放：周期为第一个到最后一个关键帧（P = 末帧 - 首帧）
+        返回 cycle_sources 列表，cycle_sources[i] 为第 i 帧在第一个周期内对应的帧（周期内及之前的帧为自身）；
+        hold 或无法形成周期时返回 None
+        loop：首帧 + (i - 首帧) % P（末帧与首帧位于同一相位）；ping_pong：奇数周期反向，折返处不重复帧
+        """
+        if end_behavior == "hold" or len(keyframes) == 0:
+            return None
+        first_frame = keyframes[0]['frame']
+        last_frame = keyframes[-1]['frame']
+        period = last_frame - first_frame
+        if period < 1:
+            print(f"Warning: end_behavior '{end_behavior}' needs keyframes on at least two frames, holding instead")
+            return None
+        if last_frame >= total_frames - 1:
+            return None
+        
+        cycle_sources = list(range(last_frame + 1))
+        for frame_idx in range(last_frame + 1, total_frames):
+            cycle, phase = divmod(frame_idx - first_frame, period)
+            if end_behavior == "ping_pong" and cycle % 2 == 1:
+                cycle_sources.append(last_frame - phase)
+            else:
+                cycle_sources.append(first_frame + phase)
+        return cycle_sources
+    
+    def _parse_path_data(self, path_data):
+        """
+        解析路径数据字符串（向后兼容方法）
+        注意：新代码应直接使用 PathDataParser.parse()
+        """
+        # 使用新的PathDataParser解析
+        parsed_data = PathDataParser.parse(path_data)
+        return PathDataParser.extract_keyframes_for_animation(parsed_data)
+    
+    def _catmull_rom_interpolate(self, p0, p1, p2, p3, t):
+        """
+        Catmull-Rom样条插值
+        p0, p1, p2, p3: 四个控制点
+        t: 插值参数 (0-1)
+        返回插值点
+        """
+        # Catmull-Rom样条公式
+        t2 = t * t
+        t3 = t2 * t
+        
+        x = 0.5 * (
+            (2 * p1['x']) +
+            (-p0['x'] + p2['x']) * t +
+            (2 * p0['x'] - 5 * p1['x'] + 4 * p2['x'] - p3['x']) * t2 +
+            (-p0['x'] + 3 * p1['x'] - 3 * p2['x'] + p3['x']) * t3
+        )
+        
+        y = 0.5 * (
+            (2 * p1['y']) +
+            (-p0['y'] + p2['y']) * t +
+            (2 * p0['y'] - 5 * p1['y'] + 4 * p2['y'] - p3['y']) * t2 +
+            (-p0['y'] + 3 * p1['y'] - 3 * p2['y'] + p3['y']) * t3
+        )
+        
+        return {'x': x, 'y': y}
+    
+    def _smooth_path_with_spline(self, points, samples_per_segment=10, tolerance=0.0):
+        """
+        使用Catmull-Rom样条平滑路径点
+        points: 原始路径点列表
+        samples_per_segment: 每两个原始点之间插入的平滑点数量（tolerance为0时使用）
+        tolerance: 自适应细分容差（像素），大于0时每段细分到弦误差小于该值
+        返回平滑后的路径点列表
+        """
+        if len(points) < 2:
+            return points
+        
+        if len(points) == 2:
+            # 只有两个点，直接返回
+            return points
+        
+        smoothed = []
+        
+        # 对于每两个相邻点之间的线段进行样条插值
+        for i in range(len(points) - 1):
+            # 获取四个控制点（用于Catmull-Rom样条）
+            # 使用边界处理：如果超出范围，使用端点
+            p0 = points[max(0, i - 1)]
+            p1 = points[i]
+            p2 = points[i + 1]
+            p3 = points[min(len(points) - 1, i + 2)]
+            
+            if tolerance > 0:
+                # 自适应细分：密集输入上几乎不插点，稀疏的急弯处插点更多
+                self._flatten_catmull_rom_segment(p0, p1, p2, p3, tolerance, smoothed)
+                continue
+            
+            # 在p1和p2之间插入平滑点
+            for j in range(samples_per_segment):
+                t = j / samples_per_segment
+                point = self._catmull_rom_interpolate(p0, p1, p2, p3, t)
+                smoothed.append(point)
+        
+        # 添加最后一个点
+        smoothed.append(points[-1])
+        
+        return smoothed
+    
+    def _flatten_catmull_rom_segment(self, p0, p1, p2, p3, tolerance, output, max_depth=10):
+        """
+        将一段Catmull-Rom样条（p1到p2）自适应细分为折线，追加到 output（不含终点）
+        区间的 1/4、1/2、3/4 处到弦的距离都小于 tolerance 时停止细分
+        """
+        start = self._catmull_rom_interpolate(p0, p1, p2, p3, 0.0)
+        end = self._catmull_rom_interpolate(p0, p1, p2, p3, 1.0)
+        # 栈中为待处理区间 (t0, t1, 起点, 终点, 深度)，后进先出，按顺序输出
+        stack = [(0.0, 1.0, start, end, 0)]
+        while stack:
+            t0, t1, a, b, depth = stack.pop()
+            mid_t = (t0 + t1) * 0.5
+            mid = self._catmull_rom_interpolate(p0, p1, p2, p3, mid_t)
+            if depth < max_depth:
+                error = max(
+                    self._distance_to_chord(self._catmull_rom_interpolate(p0, p1, p2, p3, t0 + (t1 - t0) * k), a, b)
+                    for k in (0.25, 0.75)
+                )
+                error = max(error, self._distance_to_chord(mid, a, b))
+                if error > tolerance:
+                    stack.append((mid_t, t1, mid, b, depth + 1))
+                    stack.append((t0, mid_t, a, mid, depth + 1))
+                    continue
+            output.append(a)
+    
+    def _distance_to_chord(self, point, a, b):
+        """点到线段 ab 的距离"""
+        dx = b['x'] - a['x']
+        dy = b['y'] - a['y']
+        length_sq = dx * dx + dy * dy
+        if length_sq <= 1e-12:
+            return math.hypot(point['x'] - a['x'], point['y'] - a['y'])
+        t = ((point['x'] - a['x']) * dx + (point['y'] - a['y']) * dy) / length_sq
+        t = max(0.0, min(1.0, t))
+        return math.hypot(point['x'] - (a['x'] + t * dx), point['y'] - (a['y'] + t * dy))
+    
+    def _calculate_path_length(self, points):
+        """
+        计算路径总长度
+        points: 路径点列表
+        返回总长度
+        """
+        if len(points) < 2:
+            return 0.0
+        
+        total_length = 0.0
+        for i in range(len(points) - 1):
+            dx = points[i + 1]['x'] - points[i]['x']
+            dy = points[i + 1]['y'] - points[i]['y']
+            total_length += math.sqrt(dx * dx + dy * dy)
+        
+        return total_length
+    
+    def _interpolate_along_path_by_length(self, prev_points, next_points, t):
+        """
+        方案A：路径长度归一化插值
+        在prev_points和next_points组成的路径上，根据插值比例t找到对应位置
+        t: 插值比例 (0-1)
+        返回路径上的点坐标
+        """
+        # 连接两个关键帧的路径点
+        if len(prev_points) == 0 and len(next_points) == 0:
+            return None
+        
+        if len(prev_points) == 0:
+            full_path = next_points
+        elif len(next_points) == 0:
+            full_path = prev_points
+        else:
+            # 连接路径：prev_points + next_points
+            # 如果prev_points的最后一个点和next_points的第一个点相同，去重
+            if (len(prev_points) > 0 and len(next_points) > 0 and
+                abs(prev_points[-1]['x'] - next_points[0]['x']) < 0.01 and
+                abs(prev_points[-1]['y'] - next_points[0]['y']) < 0.01):
+                # 去重：只保留一个点
+                full_path = prev_points + next_points[1:]
+            else:
+                full_path = prev_points + next_points
+        
+        if len(full_path) < 2:
+            return full_path[0] if full_path else None
+        
+        # 计算路径总长度
+        total_length = self._calculate_path_length(full_path)
+        
+        if total_length == 0:
+            return full_path[0]
+        
+        # 根据t计算目标长度
+        target_length = total_length * t
+        
+        # 沿着路径找到对应位置
+        current_length = 0.0
+        for i in range(len(full_path) - 1):
+            dx = full_path[i + 1]['x'] - full_path[i]['x']
+            dy = full_path[i + 1]['y'] - full_path[i]['y']
+            segment_length = math.sqrt(dx * dx + dy * dy)
+            
+            if current_length + segment_length >= target_length:
+                # 在这个线段上插值
+                if segment_length > 0:
+                    local_t = (target_length - current_length) / segment_length
+                else:
+                    local_t = 0.0
+                
+                x = full_path[i]['x'] * (1 - local_t) + full_path[i + 1]['x'] * local_t
+                y = full_path[i]['y'] * (1 - local_t) + full_path[i + 1]['y'] * local_t
+                return {'x': x, 'y': y}
+            
+            current_length += segment_length
+        
+        # 如果t=1.0，返回最后一个点
+        return full_path[-1]
+    
+    def interpolate_position(self, keyframes, current_frame, total_frames, smooth_path=True, spline_tolerance=0.0):
+        """
+        在关键帧之间插值计算当前位置
+        使用方案3A：样条平滑 + 路径长度归一化插值
+        返回路径上的一个点坐标 (x, y) 和路径关键帧信息
+        """
+        path_kf_info = {
+            'prev_kf_frame': None,
+            'next_kf_frame': None,
+            't': 0.0
+        }
+        
+        if len(keyframes) == 0:
+            return None, path_kf_info
+        
+        # 如果只有一個關鍵幀，返回該關鍵幀的第一個點
+        if len(keyframes) == 1:
+            kf = keyframes[0]
+            if len(kf['points']) > 0:
+                path_kf_info['prev_kf_frame'] = kf['frame']
+                path_kf_info['next_kf_frame'] = kf['frame']
+                path_kf_info['t'] = 0.0
+                return kf['points'][0].copy(), path_kf_info
+            return None, path_kf_info
+        
+        # 找到当前帧所在的关键帧区间
+        prev_kf = None
+        next_kf = None
+        
+        for i, kf in enumerate(keyframes):
+            if kf['frame'] <= current_frame:
+                prev_kf = kf
+                if i + 1 < len(keyframes):
+                    next_kf = keyframes[i + 1]
+            else:
+                break
+        
+        # 如果当前帧在所有关键帧之前，使用第一个关键帧
+        if prev_kf is None:
+            prev_kf = keyframes[0]
+            if len(keyframes) > 1:
+                next_kf = keyframes[1]
+        
+        # 如果当前帧在所有关键帧之后，停留在最后一个关键帧的终点位置
+        # 不循环回到起点，避免动画循环
+        if next_kf is None:
+            # 使用最后一个关键帧，停留在终点位置
+            prev_kf = keyframes[-1]
+            next_kf = keyframes[-1]  # 设置为同一个关键帧，t=1.0时返回终点
+        
+        # 保存路径关键帧信息
+        path_kf_info['prev_kf_frame'] = prev_kf['frame']
+        path_kf_info['next_kf_frame'] = next_kf['frame']
+        
+        # 计算插值比例
+        if prev_kf['frame'] == next_kf['frame']:
+            t = 0.0
+        else:
+            t = (current_frame - prev_kf['frame']) / (next_kf['frame'] - prev_kf['frame'])
+        t = max(0.0, min(1.0, t))  # 限制在0-1之间
+        path_kf_info['t'] = t
+        
+        # 贝塞尔关键帧：沿曲线按弧长解析求值
+        if prev_kf.get('bezier') or next_kf.get('bezier'):
+            return self._interpolate_bezier_position(
+                keyframes, prev_kf, next_kf, t, smooth_path, spline_tolerance
+            ), path_kf_info
+        
+        # 获取路径点
+        prev_points = prev_kf['points']
+        next_points = next_kf['points']
+        
+        if len(prev_points) == 0 and len(next_points) == 0:
+            return None, path_kf_info
+        
+        # 如果某个关键帧没有点，使用另一个关键帧的点
+        if len(prev_points) == 0:
+            if len(next_points) > 0:
+                return next_points[0].copy(), path_kf_info
+            return None, path_kf_info
+        
+        if len(next_points) == 0:
+            if len(prev_points) > 0:
+                # 如果只有prev_points，使用最后一个点（终点位置）
+                # 这样当超过最后一个关键帧时，会停留在终点，而不是循环
+                if smooth_path and len(prev_points) > 1:
+                    # 平滑路径后使用最后一个点（终点）
+                    smoothed = self._smooth_path_with_spline(prev_points, tolerance=spline_tolerance)
+                    return smoothed[-1].copy(), path_kf_info
+                return prev_points[-1].copy(), path_kf_info
+            return None, path_kf_info
+        
+        # 检查两个关键帧是否使用相同的路径（路径点数量相同且起点终点相同）
+        # 如果使用相同路径，应该沿着同一个路径插值，根据关键帧编号的比例计算路径上的位置
+        same_path = False
+        if (len(prev_points) == len(next_points) and len(prev_points) > 0):
+            # 检查起点和终点是否相同（允许小的误差）
+            start_same = (abs(prev_points[0]['x'] - next_points[0]['x']) < 0.01 and
+                         abs(prev_points[0]['y'] - next_points[0]['y']) < 0.01)
+            end_same = (abs(prev_points[-1]['x'] - next_points[-1]['x']) < 0.01 and
+                       abs(prev_points[-1]['y'] - next_points[-1]['y']) < 0.01)
+            if start_same and end_same:
+                same_path = True
+        
+        # 方案3A：样条平滑 + 路径长度归一化插值
+        if smooth_path:
+            # 1. 路径平滑（样条插值）
+            prev_points_smooth = self._smooth_path_with_spline(prev_points, tolerance=spline_tolerance) if len(prev_points) > 1 else prev_points
+            next_points_smooth = self._smooth_path_with_spline(next_points, tolerance=spline_tolerance) if len(next_points) > 1 else next_points
+            
+            if same_path:
+                # 如果两个关键帧使用相同路径，沿着同一个路径插值
+                # 根据关键帧编号的比例计算路径上的位置
+                # 例如：KF0在起点(t=0)，KF25在25/45位置(t=25/45)，KF45在终点(t=1)
+                # 需要找到整个路径的起点和终点关键帧（所有关键帧中的最小和最大帧号）
+                prev_frame = prev_kf['frame']
+                next_frame = next_kf['frame']
+                
+                # 找到所有关键帧中的最小和最大帧号（整个路径的起点和终点）
+                first_frame = min(kf['frame'] for kf in keyframes)
+                last_frame = max(kf['frame'] for kf in keyframes)
+                
+                if prev_frame == next_frame:
+                    # 如果关键帧相同，根据关键帧在整个路径上的位置计算
+                    if last_frame > first_frame:
+                        path_t = (prev_frame - first_frame) / (last_frame - first_frame)
+                        path_t = max(0.0, min(1.0, path_t))
+                    else:
+                        path_t = 0.0
+                else:
+                    # 计算当前帧在整个路径上的位置
+                    if last_frame > first_frame:
+                        # 当前帧在整个路径上的位置
+                        current_frame_pos = prev_frame + (next_frame - prev_frame) * t
+                        # 转换为路径上的t值（0-1）
+                        path_t = (current_frame_pos - first_frame) / (last_frame - first_frame)
+                        path_t = max(0.0, min(1.0, path_t))  # 限制在0-1之间
+                    else:
+                        path_t = t
+                
+                # 沿着完整路径从起点到终点插值
+                position = self._interpolate_along_path_by_length(prev_points_smooth, [], path_t)
+            else:
+                # 2. 方案A：在平滑后的路径上按长度插值
+                position = self._interpolate_along_path_by_length(prev_points_smooth, next_points_smooth, t)
+        else:
+            # 向后兼容：使用原来的直线插值方法
+            if len(prev_points) > 0 and len(next_points) > 0:
+                if same_path:
+                    # 如果使用相同路径，沿着路径插值
+                    # 根据关键帧编号的比例计算路径上的位置
+                    prev_frame = prev_kf['frame']
+                    next_frame = next_kf['frame']
+                    
+                    # 找到所有关键帧中的最小和最大帧号（整个路径的起点和终点）
+                    first_frame = min(kf['frame'] for kf in keyframes)
+                    last_frame = max(kf['frame'] for kf in keyframes)
+                    
+                    if prev_frame == next_frame:
+                        # 如果关键帧相同，根据关键帧在整个路径上的位置计算
+                        if last_frame > first_frame:
+                            path_t = (prev_frame - first_frame) / (last_frame - first_frame)
+                            path_t = max(0.0, min(1.0, path_t))
+                        else:
+                            path_t = 0.0
+                    else:
+                        # 计算当前帧在整个路径上的位置
+                        if last_frame > first_frame:
+                            current_frame_pos = prev_frame + (next_frame - prev_frame) * t
+                            path_t = (current_frame_pos - first_frame) / (last_frame - first_frame)
+                            path_t = max(0.0, min(1.0, path_t))
+                        else:
+                            path_t = t
+                    
+                    position = self._interpolate_along_path_by_length(prev_points, [], path_t)
+                else:
+                    prev_pos = prev_points[0]
+                    next_pos = next_points[0]
+                    x = prev_pos['x'] * (1 - t) + next_pos['x'] * t
+                    y = prev_pos['y'] * (1 - t) + next_pos['y'] * t
+                    position = {'x': x, 'y': y}
+            elif len(prev_points) > 0:
+                position = prev_points[0].copy()
+            elif len(next_points) > 0:
+                position = next_points[0].copy()
+            else:
+                position = None
+        
+        if position is None:
+            return None, path_kf_info
+        
+        return position, path_kf_info
+    
+    def _interpolate_bezier_position(self, keyframes, prev_kf, next_kf, t, smooth_path=True, spline_tolerance=0.0):
+        """
+        含贝塞尔关键帧的区间插值（规则与点序列路径相同：相同路径沿整条路径按帧比例取点，
+        不同路径首尾拼接后按长度比例取点），曲线段按弧长解析求值，不经过采样和样条平滑
+        """
+        prev_path = self._keyframe_bezier_path(prev_kf, smooth_path, spline_tolerance)
+        next_path = self._keyframe_bezier_path(next_kf, smooth_path, spline_tolerance)
+        if prev_path is None and next_path is None:
+            return None
+        if prev_path is None:
+            return {'x': next_path.start[0], 'y': next_path.start[1]}
+        if next_path is None:
+            return {'x': prev_path.end[0], 'y': prev_path.end[1]}
+        
+        same_path = (
+            len(prev_kf['points']) == len(next_kf['points']) and
+            abs(prev_path.start[0] - next_path.start[0]) < 0.01 and
+            abs(prev_path.start[1] - next_path.start[1]) < 0.01 and
+            abs(prev_path.end[0] - next_path.end[0]) < 0.01 and
+            abs(prev_path.end[1] - next_path.end[1]) < 0.01
+        )
+        if not same_path:
+            return prev_path.joined(next_path).point_at_fraction(t)
+        
+        # 相同路径：按当前帧在所有关键帧范围内的位置取点
+        first_frame = min(kf['frame'] for kf in keyframes)
+        last_frame = max(kf['frame'] for kf in keyframes)
+        if last_frame <= first_frame:
+            path_t = 0.0 if prev_kf['frame'] == next_kf['frame'] else t
+        else:
+            current_frame_pos = prev_kf['frame'] + (next_kf['frame'] - prev_kf['frame']) * t
+            path_t = (current_frame_pos - first_frame) / (last_frame - first_frame)
+        return prev_path.point_at_fraction(path_t)
+    
+    def _keyframe_bezier_path(self, kf, smooth_path=True, spline_tolerance=0.0):
+        """关键帧的路径对象：贝塞尔锚点直接使用，点序列按原有规则平滑后作为折线"""
+        if kf.get('bezier_path') is not None:
+            return kf['bezier_path']
+        if kf.get('bezier'):
+            return BezierPath.from_anchors(kf['bezier'])
+        points = kf['points']
+        if smooth_path and len(points) > 1:
+            points = self._smooth_path_with_spline(points, tolerance=spline_tolerance)
+        return BezierPath.from_points(points)
+    
+    def parse_keyframe_image_map(self, keyframe_image_map):
+        """解析关键帧图片映射字符串"""
+        image_map_dict = {}
+        if not keyframe_image_map or not keyframe_image_map.strip():
+            return image_map_dict
+        
+        try:
+            # 格式：keyframe:image_index|keyframe:image_index
+            # 例如：0:0|10:1|20:2
+            map_strings = keyframe_image_map.split('|')
+            for map_str in map_strings:
+                if not map_str.strip():
+                    continue
+                
+                parts = map_str.split(':')
+                if len(parts) >= 2:
+                    keyframe = int(parts[0])
+                    image_index = int(parts[1])
+                    image_map_dict[keyframe] = image_index
+        except Exception as e:
+            print(f"Error parsing keyframe image map: {e}")
+            import traceback
+            traceback.print_exc()
+        
+        return image_map_dict
+    
+    def _get_foreground_index_for_frame(self, frame_idx, keyframe_image_map_dict):
+        """根据关键帧图片映射返回当前帧对应的图片索引（未做范围检查）"""
+        # 找到当前帧对应的关键帧图片索引
+        image_index = 0  # 默认使用第一个图片
+        
+        if len(keyframe_image_map_dict) > 0:
+            # 找到小于等于当前帧的最大关键帧
+            matching_keyframes = [kf for kf in keyframe_image_map_dict.keys() if kf <= frame_idx]
+            if matching_keyframes:
+                # 使用最大的关键帧对应的图片索引
+                max_keyframe = max(matching_keyframes)
+                image_index = keyframe_image_map_dict[max_keyframe]
+            else:
+                # 如果当前帧小于所有映射的关键帧，使用最小的关键帧对应的图片
+                min_keyframe = min(keyframe_image_map_dict.keys())
+                image_index = keyframe_image_map_dict[min_keyframe]
+        
+        return image_index
+    
+    def parse_effects_data(self, effects_data):
+        """解析效果数据字符串（使用EffectsDataParser）"""
+        return EffectsDataParser.parse(effects_data)
+    
+    def _get_effect_for_path_keyframe(self, path_kf_frame, effects_dict):
+        """
+        获取路径关键帧对应的效果
+        如果路径关键帧有定义效果，直接返回；否则返回默认值
+        （不在这个函数中查找最近的效果，避免所有未定义的关键帧都使用同一个效果）
+        """
+        default_effects = {
+            'scale_x': 1.0,
+            'scale_y': 1.0,
+            'rotation': 0.0,
+            'flip_x': False,
+            'flip_y': False,
+            'opacity': 1.0
+        }
+        
+        # 如果路径关键帧有定义效果，直接返回
+        if path_kf_frame in effects_dict:
+            return effects_dict[path_kf_frame].copy()
+        
+        # 如果路径关键帧没有定义效果，返回默认值
+        # 这样在插值时，未定义的关键帧会使用默认值，已定义的关键帧会使用定义的值
+        # 插值会在默认值和定义值之间进行
+        return default_effects
+    
+    def _interpolate_effects_based_on_path(self, effects_dict, current_frame, total_frames, 
+                                          path_keyframes, path_kf_info):
+        """
+        基于路径关键帧插值计算当前效果参数
+        这是核心方法：效果插值与路径关键帧同步
+        """
+        # 默认效果
+        default_effects = {
+            'scale_x': 1.0,
+            'scale_y': 1.0,
+            'rotation': 0.0,
+            'flip_x': False,
+            'flip_y': False,
+            'opacity': 1.0
+        }
+        
+        if len(effects_dict) == 0:
+            return default_effects
+        
+        # 如果没有路径关键帧信息，使用旧方法（向后兼容）
+        if path_kf_info['prev_kf_frame'] is None:
+            return self._interpolate_effects_legacy(effects_dict, current_frame, total_frames)
+        
+        # 获取路径关键帧对应的效果
+        prev_path_kf_frame = path_kf_info['prev_kf_frame']
+        next_path_kf_frame = path_kf_info['next_kf_frame']
+        t = path_kf_info['t']
+        
+        # 获取路径关键帧对应的效果
+        prev_effects = self._get_effect_for_path_keyframe(prev_path_kf_frame, effects_dict)
+        next_effects = self._get_effect_for_path_keyframe(next_path_kf_frame, effects_dict)
+        
+        # 如果当前帧正好是某个路径关键帧，直接返回该关键帧的效果
+        if current_frame == prev_path_kf_frame:
+            return prev_effects
+        if current_frame == next_path_kf_frame:
+            return next_effects
+        
+        # 在路径关键帧之间插值效果
+        # 插值数值参数
+        scale_x = prev_effects['scale_x'] * (1 - t) + next_effects['scale_x'] * t
+        scale_y = prev_effects['scale_y'] * (1 - t) + next_effects['scale_y'] * t
+        
+        # 旋转角度插值（处理360度循环）
+        prev_rot = prev_effects['rotation']
+        next_rot = next_effects['rotation']
+        # 找到最短路径
+        diff = next_rot - prev_rot
+        if abs(diff) > 180:
+            if diff > 0:
+                diff -= 360
+            else:
+                diff += 360
+        rotation = prev_rot + diff * t
+        
+        # 布尔值：在中间帧时，如果t<0.5使用前一个，否则使用后一个
+        flip_x = prev_effects['flip_x'] if t < 0.5 else next_effects['flip_x']
+        flip_y = prev_effects['flip_y'] if t < 0.5 else next_effects['flip_y']
+        
+        # 透明度插值
+        opacity = prev_effects['opacity'] * (1 - t) + next_effects['opacity'] * t
+        
+        return {
+            'scale_x': scale_x,
+            'scale_y': scale_y,
+            'rotation': rotation,
+            'flip_x': flip_x,
+            'flip_y': flip_y,
+            'opacity': opacity
+        }
+    
+    def _interpolate_effects_legacy(self, effects_dict, current_frame, total_frames):
+        """
+        旧的效果插值方法（向后兼容）
+        在效果关键帧之间插值
+        """
+        default_effects = {
+            'scale_x': 1.0,
+            'scale_y': 1.0,
+            'rotation': 0.0,
+            'flip_x': False,
+            'flip_y': False,
+            'opacity': 1.0
+        }
+        
+        if len(effects_dict) == 0:
+            return default_effects
+        
+        if len(effects_dict) == 1:
+            return list(effects_dict.values())[0]
+        
+        sorted_frames = sorted(effects_dict.keys())
+        prev_frame = None
+        next_frame = None
+        
+        for frame in sorted_frames:
+            if frame <= current_frame:
+                prev_frame = frame
+            else:
+                next_frame = frame
+                break
+        
+        if prev_frame is None:
+            prev_frame = sorted_frames[0]
+            if len(sorted_frames) > 1:
+                next_frame = sorted_frames[1]
+        
+        if next_frame is None:
+            if len(sorted_frames) > 1:
+                prev_frame = sorted_frames[-2]
+            next_frame = sorted_frames[-1]
+        
+        if current_frame == prev_frame:
+            return effects_dict[prev_frame].copy()
+        if current_frame == next_frame:
+            return effects_dict[next_frame].copy()
+        
+        if prev_frame == next_frame:
+            t = 0.0
+        else:
+            t = (current_frame - prev_frame) / (next_frame - prev_frame)
+        t = max(0.0, min(1.0, t))
+        
+        prev_effects = effects_dict[prev_frame]
+        next_effects = effects_dict[next_frame]
+        
+        scale_x = prev_effects['scale_x'] * (1 - t) + next_effects['scale_x'] * t
+        scale_y = prev_effects['scale_y'] * (1 - t) + next_effects['scale_y'] * t
+        
+        prev_rot = prev_effects['rotation']
+        next_rot = next_effects['rotation']
+        diff = next_rot - prev_rot
+        if abs(diff) > 180:
+            if diff > 0:
+                diff -= 360
+            else:
+                diff += 360
+        rotation = prev_rot + diff * t
+        
+        flip_x = prev_effects['flip_x'] if t < 0.5 else next_effects['flip_x']
+        flip_y = prev_effects['flip_y'] if t < 0.5 else next_effects['flip_y']
+        opacity = prev_effects['opacity'] * (1 - t) + next_effects['opacity'] * t
+        
+        return {
+            'scale_x': scale_x,
+            'scale_y': scale_y,
+            'rotation': rotation,
+            'flip_x': flip_x,
+            'flip_y': flip_y,
+            'opacity': opacity
+        }
+    
+    def frame_transforms(self, timeline, base_w, base_h, center_anchor):
+        """
+        逐帧变换参数（与渲染节点 _apply_effects + 粘贴坐标的计算完全一致）
+        返回 (transforms: (frames, 10) float64 [缩放后宽, 缩放后高, cos, sin, 旋转后宽, 旋转后高, 翻转x, 翻转y, 粘贴x, 粘贴y],
+              frame_visible: (frames,) bool)
+        """
+        rows = []
+        frame_visible = []
+        for entry in timeline:
+            position = entry['position']
+            effects = entry['effects']
+            width, height = base_w, base_h
+            if effects['scale_x'] != 1.0 or effects['scale_y'] != 1.0:
+                new_width = int(width * effects['scale_x'])
+                new_height = int(height * effects['scale_y'])
+                if new_width > 0 and new_height > 0:
+                    width, height = new_width, new_height
+    
+            cos_a, sin_a = 1.0, 0.0
+            rotated_w, rotated_h = width, height
+            if abs(effects['rotation']) > 0.01:
+                radians = math.radians(effects['rotation'])
+                cos_a, sin_a = math.cos(radians), math.sin(radians)
+                rotated_w, rotated_h = self.rotated_size(width, height, effects['rotation'])
+    
+            if position is None:
+                paste_x = paste_y = 0
+            elif center_anchor:
+                paste_x = int(position['x'] - rotated_w / 2)
+                paste_y = int(position['y'] - rotated_h / 2)
+            else:
+                paste_x = int(position['x'])
+                paste_y = int(position['y'])
+    
+            rows.append((width, height, cos_a, sin_a, rotated_w, rotated_h,
+                         float(bool(effects['flip_x'])), float(bool(effects['flip_y'])), paste_x, paste_y))
+            frame_visible.append(position is not None and int(255 * effects['opacity']) > 0)
+        return (torch.tensor(rows, dtype=torch.float64).reshape(-1, 10),
+                torch.tensor(frame_visible, dtype=torch.bool))
+    
+    def rotated_size(self, width, height, rotation):
+        """PIL rotate(-rotation, expand=True) 的输出尺寸"""
+        angle = (-rotation) % 360.0
+        if angle == 0:
+            return width, height
+        if angle == 180:
+            return width, height
+        if angle in (90, 270):
+            return height, width
+        radians = -math.radians(angle)
+        cos_a = round(math.cos(radians), 15)
+        sin_a = round(math.sin(radians), 15)
+        xs = []
+        ys = []
+        for x, y in ((0, 0), (width, 0), (width, height), (0, height)):
+            dx, dy = x - width / 2, y - height / 2
+            xs.append(cos_a * dx + sin_a * dy)
+            ys.append(-sin_a * dx + cos_a * dy)
+        return (math.ceil(max(xs)) - math.floor(min(xs)),
+                math.ceil(max(ys)) - math.floor(min(ys)))
+    
+    def affine_matrices(self, transforms, sprite_w, sprite_h):
+        """
+        逐帧仿射变换：前景图原图坐标 (u, v) -> 画布坐标 = M @ (u, v) + b
+        顺序为缩放 -> 绕中心旋转（扩展画布） -> 翻转 -> 平移到粘贴坐标
+        返回 (M: (frames, 2, 2), b: (frames, 2))，float64
+        """
+        (width, height, cos_a, sin_a, rotated_w, rotated_h,
+         flip_x, flip_y, paste_x, paste_y) = transforms.unbind(dim=1)
+        scale_x = width / sprite_w
+        scale_y = height / sprite_h
+    
+        # 屏幕坐标系（y向下）中顺时针旋转 rotation 度，与 PIL rotate(-rotation) 一致
+        matrices = torch.stack([
+            torch.stack([cos_a * scale_x, -sin_a * scale_y], dim=1),
+            torch.stack([sin_a * scale_x, cos_a * scale_y], dim=1),
+        ], dim=1)
+        offsets = torch.stack([
+            -cos_a * width / 2 + sin_a * height / 2 + rotated_w / 2,
+            -sin_a * width / 2 - cos_a * height / 2 + rotated_h / 2,
+        ], dim=1)
+    
+        # 翻转：x -> rotated_w - x，y -> rotated_h - y
+        sign = torch.stack([1 - 2 * flip_x, 1 - 2 * flip_y], dim=1)
+        matrices = matrices * sign[:, :, None]
+        offsets = offsets * sign + torch.stack([flip_x * rotated_w, flip_y * rotated_h], dim=1)
+        offsets = offsets + torch.stack([paste_x, paste_y], dim=1)
+        return matrices, offsets
+    
+    def sprite_affines(self, timeline, sprite_w, sprite_h, foreground_scale, center_anchor):
+        """
+        前景图原图坐标 -> 画布坐标的逐帧变换（Point Tracks 与 Optical Flow 共用）
+        基础缩放与渲染节点的单个前景图模式一致（尺寸取整）
+        返回 (transforms, frame_visible, matrices, offsets)
+        """
+        base_w, base_h = sprite_w, sprite_h
+        if foreground_scale != 1.0:
+            base_w, base_h = int(sprite_w * foreground_scale), int(sprite_h * foreground_scale)
+        transforms, frame_visible = self.frame_transforms(timeline, base_w, base_h, center_anchor)
+        matrices, offsets = self.affine_matrices(transforms, sprite_w, sprite_h)
+        return transforms, frame_visible, matrices, offsets
+    
+    def apply_affines(self, points, matrices, offsets):
+        """所有点 × 所有帧一次性变换，返回 (frames, N, 2)"""
+        tracks = torch.einsum("fij,nj->fni", matrices, points.double()) + offsets[:, None, :]
+        return tracks.float()
+
+# author.yichengup.AnimationTimeline 2025.01.XX
@@ -1,4 +1,14 @@
-import nodes
+import sys
+import os
+
+# 导入EffectsDataParser（支持相对导入和绝对导入）
+try:
+    from .EffectsDataParser import EffectsDataParser
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from EffectsDataParser import EffectsDataParser
 
 class ycAnimationEffects:
     """
@@ -1,10 +1,42 @@
-import nodes
+import re
+import sys
+import os
+
+# 导入EffectsDataParser（支持相对导入和绝对导入）
+try:
+    from .EffectsDataParser import EffectsDataParser
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from EffectsDataParser import EffectsDataParser
+
+# 动态输入名：effects_1, effects_2, ...（第8个之后由前端按需添加）
+_EFFECTS_INPUT_PATTERN = re.compile(r"^effects_(\d+)$")
+
+
+class _DynamicEffectsInputs(dict):
+    """
+    可选输入表：除声明的输入外，还接受任意 effects_N
+    ComfyUI 按 `name in optional` 校验输入，因此动态添加的输入也能传入节点
+    """
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or bool(_EFFECTS_INPUT_PATTERN.match(str(key)))
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if _EFFECTS_INPUT_PATTERN.match(str(key)):
+            return ("STRING", {"forceInput": True})
+        raise KeyError(key)
+
 
 class ycAnimationEffectsMerge:
     """
     动画效果合并节点：
-    - 合并多个关键帧的效果数据
-    - 支持连接多个Animation Effects节点的输出
+    - 合并任意数量的效果数据（effects_8 之后连接时自动添加新输入）
+    - 只解析一次，重复关键帧按 duplicate_policy 确定性处理
+    - 输出按关键帧排序的效果表（可直接连接到Image Animate Path，无需再次解析）和兼容的字符串
     """
     @classmethod
     def INPUT_TYPES(s):
@@ -12,7 +44,7 @@ class ycAnimationEffectsMerge:
             "required": {
                 "effects_1": ("STRING", {"default": "", "tooltip": "效果数据1"}),
             },
-            "optional": {
+            "optional": _DynamicEffectsInputs({
                 "effects_2": ("STRING", {"default": ""}),
                 "effects_3": ("STRING", {"default": ""}),
                 "effects_4": ("STRING", {"default": ""}),
@@ -20,28 +52,30 @@ class ycAnimationEffectsMerge:
                 "effects_6": ("STRING", {"default": ""}),
                 "effects_7": ("STRING", {"default": ""}),
                 "effects_8": ("STRING", {"default": ""}),
-            },
+                "duplicate_policy": (list(EffectsDataParser.DUPLICATE_POLICIES), {"default": "last", "tooltip": "多个输入定义同一关键帧时：last=编号大的输入优先，first=编号小的输入优先，error=报错"}),
+            }),
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("merged_effects",)
+    RETURN_TYPES = ("STRING", EffectsDataParser.TABLE_TYPE)
+    RETURN_NAMES = ("merged_effects", "effects_table")
 
     FUNCTION = "merge"
     CATEGORY = 'YCNode/Animation'
 
-    def merge(self, effects_1, effects_2="", effects_3="", effects_4="", 
-              effects_5="", effects_6="", effects_7="", effects_8=""):
-        # 收集所有非空的效果数据
-        all_effects = []
-        for eff in [effects_1, effects_2, effects_3, effects_4, 
-                    effects_5, effects_6, effects_7, effects_8]:
-            if eff and eff.strip():
-                all_effects.append(eff.strip())
+    def merge(self, effects_1, duplicate_policy="last", **kwargs):
+        # 按输入编号排序收集所有非空的效果数据（与连接顺序无关）
+        numbered = [(1, effects_1)]
+        for name, value in kwargs.items():
+            match = _EFFECTS_INPUT_PATTERN.match(name)
+            if match and isinstance(value, str):
+                numbered.append((int(match.group(1)), value))
+        all_effects = [eff.strip() for _, eff in sorted(numbered, key=lambda item: item[0]) if eff and eff.strip()]
         
-        # 合并所有效果数据，用|分隔
-        merged = '|'.join(all_effects)
+        # 解析一次，得到排序后的效果表；字符串输出由效果表序列化得到
+        effects_table = EffectsDataParser.merge(all_effects, duplicate_policy)
+        merged = EffectsDataParser.serialize(effects_table)
         
-        return (merged,)
+        return (merged, effects_table)
 
 # author.yichengup.AnimationEffectsMerge 2025.01.XX
 
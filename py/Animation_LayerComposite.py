@@ -0,0 +1,179 @@
+import torch
+import json
+import numpy as np
+from PIL import Image
+import sys
+import os
+
+# 导入AnimatedLayer（支持相对导入和绝对导入）
+try:
+    from .AnimatedLayer import AnimatedLayer
+    from .DeviceTransfers import TransferLog
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from AnimatedLayer import AnimatedLayer
+    from DeviceTransfers import TransferLog
+
+
+class ycAnimatedLayerComposite:
+    """
+    动画图层合成节点：
+    - 把 Image Animate Path 输出的动画图层铺到任意背景上，无需重新渲染前景变换
+    - 多个图层按编号从下到上叠加（layer_1 在最底层），可以随意调换顺序
+    - 只在每帧图块所在区域做混合；放置信息与背景都不变的帧直接复制
+    - 合成在 background_image 所在的设备上、以其浮点类型进行；图块在逐帧循环之前一次性上传，
+      transfer_report 列出实际发生的主机/设备传输（背景在CPU上时为空）
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "background_image": ("IMAGE", {"tooltip": "背景图：单帧（所有帧共用）或与图层帧数相同的批次"}),
+                "layer_1": (AnimatedLayer.LAYER_TYPE, {"tooltip": "最底层的动画图层"}),
+            },
+            "optional": {
+                "layer_2": (AnimatedLayer.LAYER_TYPE,),
+                "layer_3": (AnimatedLayer.LAYER_TYPE,),
+                "layer_4": (AnimatedLayer.LAYER_TYPE,),
+                "placement": (["integer", "subpixel"], {"default": "integer", "tooltip": "integer=与渲染节点相同的整数坐标（结果一致）；subpixel=按精确坐标双线性放置，运动更平滑"}),
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK", "STRING")
+    RETURN_NAMES = ("frames", "masks", "transfer_report")
+    FUNCTION = "composite"
+    CATEGORY = 'YCNode/Animation'
+
+    def composite(self, background_image, layer_1, layer_2=None, layer_3=None, layer_4=None, placement="integer"):
+        layers = [layer for layer in (layer_1, layer_2, layer_3, layer_4) if layer is not None]
+        width, height = layer_1.canvas_width, layer_1.canvas_height
+        total_frames = layer_1.frame_count
+        for number, layer in enumerate(layers, start=1):
+            if (layer.canvas_width, layer.canvas_height) != (width, height):
+                raise ValueError(f"图层{number}的画布尺寸（{layer.canvas_width}x{layer.canvas_height}）与图层1（{width}x{height}）不一致")
+            if layer.frame_count != total_frames:
+                raise ValueError(f"图层{number}的帧数（{layer.frame_count}）与图层1（{total_frames}）不一致")
+
+        subpixel = placement == "subpixel"
+        device = background_image.device
+        dtype = background_image.dtype if background_image.is_floating_point() else torch.float32
+        transfers = TransferLog()
+        backgrounds = self._prepare_backgrounds(background_image, width, height, dtype, transfers)
+        single_background = backgrounds.shape[0] == 1
+
+        output_batch = torch.empty((total_frames, height, width, 3), dtype=dtype, device=device)
+        mask_batch = torch.empty((total_frames, height, width), dtype=dtype, device=device)
+
+        # 预乘alpha的图块：在逐帧循环之前一次性转换并上传到合成设备（只处理实际用到的图块）
+        tile_cache = {}
+        for layer_number, layer in enumerate(layers):
+            for tile_index in sorted(set(int(index) for index in layer.tile_index if index >= 0)):
+                tile = self._premultiplied_tile(layer.tiles[tile_index])
+                tile_cache[(layer_number, tile_index)] = transfers.to_device(tile, device, "layer_tiles", dtype)
+
+        frame_sources = []
+        previous_key = None
+        for frame_idx in range(total_frames):
+            bg_index = 0 if single_background else min(frame_idx, backgrounds.shape[0] - 1)
+            placements = [
+                (int(layer.tile_index[frame_idx]),) + (layer.placement(frame_idx, subpixel) if layer.tile_index[frame_idx] >= 0 else ())
+                for layer in layers
+            ]
+            key = (bg_index, tuple(placements))
+            if frame_idx > 0 and key == previous_key:
+                # 放置信息和背景都不变：复制上一帧
+                frame_sources.append(frame_sources[-1])
+                continue
+            previous_key = key
+            frame_sources.append(frame_idx)
+
+            frame_out = output_batch[frame_idx]
+            mask_out = mask_batch[frame_idx]
+            frame_out.copy_(backgrounds[bg_index])
+            mask_out.zero_()
+
+            for layer_number, (layer, placed) in enumerate(zip(layers, placements)):
+                tile_index = placed[0]
+                if tile_index < 0:
+                    continue
+                tile = tile_cache[(layer_number, tile_index)]
+                x, y, frac_x, frac_y = placed[1:]
+                if frac_x or frac_y:
+                    tile = self._shift_tile(tile, frac_x, frac_y)
+                self._blend_tile(frame_out, mask_out, tile, x, y)
+
+        # 复制帧：整段一次性复制
+        start = None
+        for frame_idx in range(total_frames + 1):
+            is_copy = frame_idx < total_frames and frame_sources[frame_idx] != frame_idx
+            if is_copy and start is None:
+                start = frame_idx
+            elif not is_copy and start is not None:
+                source = frame_sources[start]
+                output_batch[start:frame_idx] = output_batch[source]
+                mask_batch[start:frame_idx] = mask_batch[source]
+                start = None
+
+        transfers.report("ycAnimatedLayerComposite")
+        return (output_batch, mask_batch, json.dumps(transfers.summary()))
+
+    def _prepare_backgrounds(self, background_image, width, height, dtype, transfers):
+        """
+        背景转换为 (B, H, W, 3)，留在原设备上；尺寸不一致时按渲染节点的方式（LANCZOS）缩放到画布
+        （PIL缩放在主机上进行，这时背景下载、上传各一次并记录）
+        """
+        backgrounds = background_image[..., :3].to(dtype)
+        if backgrounds.shape[1] == height and backgrounds.shape[2] == width:
+            return backgrounds
+        host_backgrounds = transfers.to_host(backgrounds, "background_download").float()
+        resized = torch.empty((backgrounds.shape[0], height, width, 3), dtype=torch.float32)
+        for index in range(backgrounds.shape[0]):
+            array = (host_backgrounds[index].numpy() * 255).clip(0, 255).astype(np.uint8)
+            bg_pil = Image.fromarray(array, 'RGB').resize((width, height), Image.LANCZOS)
+            resized[index].copy_(torch.from_numpy(np.array(bg_pil)))
+        return transfers.to_device(resized.div_(255.0), background_image.device, "background_upload", dtype)
+
+    def _premultiplied_tile(self, tile_array):
+        """(h, w, 4) uint8 RGBA -> 预乘alpha的 (h, w, 4) float32"""
+        tile = torch.from_numpy(tile_array).float().div_(255.0)
+        tile[..., :3].mul_(tile[..., 3:4])
+        return tile
+
+    def _shift_tile(self, tile, frac_x, frac_y):
+        """按小数偏移双线性平移图块（预乘alpha下插值），尺寸各增加1像素"""
+        h, w = tile.shape[:2]
+        shifted = torch.zeros((h + 1, w + 1, 4), dtype=tile.dtype, device=tile.device)
+        shifted[:h, :w].add_(tile, alpha=(1 - frac_x) * (1 - frac_y))
+        shifted[:h, 1:].add_(tile, alpha=frac_x * (1 - frac_y))
+        shifted[1:, :w].add_(tile, alpha=(1 - frac_x) * frac_y)
+        shifted[1:, 1:].add_(tile, alpha=frac_x * frac_y)
+        return shifted
+
+    def _blend_tile(self, frame_out, mask_out, tile, x, y):
+        """把预乘alpha图块叠加到帧上（只处理与画布相交的区域），遮罩按覆盖度累积"""
+        height, width = frame_out.shape[:2]
+        left, top = max(0, -x), max(0, -y)
+        right = min(tile.shape[1], width - x)
+        bottom = min(tile.shape[0], height - y)
+        if right <= left or bottom <= top:
+            return
+        region = tile[top:bottom, left:right]
+        alpha = region[..., 3]
+        x0, y0 = x + left, y + top
+        x1, y1 = x + right, y + bottom
+
+        frame_region = frame_out[y0:y1, x0:x1]
+        frame_region.mul_((1 - alpha).unsqueeze(-1)).add_(region[..., :3])
+        mask_region = mask_out[y0:y1, x0:x1]
+        mask_region.mul_(1 - alpha).add_(alpha)
+
+# author.yichengup.AnimatedLayerComposite 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycAnimatedLayerComposite": ycAnimatedLayerComposite,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycAnimatedLayerComposite": "Animated Layer Composite"
+}
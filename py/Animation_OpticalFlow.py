@@ -0,0 +1,176 @@
+import torch
+import json
+import os
+import sys
+
+# 导入时间轴（支持相对导入和绝对导入）
+try:
+    from .AnimationTimeline import AnimationTimeline
+    from .PathDataParser import PathDataParser
+    from .EffectsDataParser import EffectsDataParser
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from AnimationTimeline import AnimationTimeline
+    from PathDataParser import PathDataParser
+    from EffectsDataParser import EffectsDataParser
+
+
+class ycAnimationOpticalFlow:
+    """
+    解析光流节点：
+    - 由相邻两帧的仿射变换直接计算前景图像素的前向光流（第 t 帧 -> 第 t+1 帧），无需从图像估计
+    - 只计算前景图包围盒内、遮罩覆盖的像素，其余像素光流为0
+    - full：输出整幅画布 (frames, H, W, 2)；bbox：输出按包围盒裁剪的紧凑张量，包围盒坐标在 flow_info 中
+    """
+
+    # 光流张量类型（float32，最后一维为 dx, dy，单位为像素）
+    FLOW_TYPE = "YC_FLOW"
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "path_data": ("STRING", {"default": "", "multiline": True}),
+                "canvas_width": ("INT", {"default": 512}),
+                "canvas_height": ("INT", {"default": 512}),
+                "total_frames": ("INT", {"default": 60, "min": 1, "max": 10000}),
+                "foreground_scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 5.0, "step": 0.1}),
+                "center_anchor": ("BOOLEAN", {"default": True, "tooltip": "前景图是否以中心为锚点"}),
+                "smooth_path": ("BOOLEAN", {"default": True, "tooltip": "是否启用路径平滑（样条插值），与Image Animate Path一致"}),
+            },
+            "optional": {
+                "foreground_image": ("IMAGE", {"tooltip": "前景图（只使用尺寸）；未连接时使用foreground_mask的尺寸"}),
+                "foreground_mask": ("MASK", {"tooltip": "前景图遮罩：只有遮罩覆盖的像素有光流"}),
+                "effects_data": ("STRING", {"default": "", "multiline": True, "tooltip": "动画效果数据，格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|..."}),
+                "effects_table": (EffectsDataParser.TABLE_TYPE, {"tooltip": "来自Animation Effects Merge的效果表（已解析），连接后忽略effects_data"}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05}),
+                "mask_threshold": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01}),
+                "flow_layout": (["full", "bbox"], {"default": "full", "tooltip": "full=整幅画布 (frames, H, W, 2)；bbox=按每帧包围盒裁剪（统一为最大包围盒尺寸）"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点；loop=循环；ping_pong=往返播放（与Image Animate Path一致）"}),
+            },
+        }
+
+    RETURN_TYPES = (FLOW_TYPE, "MASK", "STRING")
+    RETURN_NAMES = ("flow", "flow_mask", "flow_info")
+    FUNCTION = "optical_flow"
+    CATEGORY = 'YCNode/Animation'
+
+    def optical_flow(self, path_data, canvas_width, canvas_height, total_frames, foreground_scale,
+                     center_anchor, smooth_path=True, foreground_image=None, foreground_mask=None,
+                     effects_data="", effects_table=None, spline_tolerance=0.0, mask_threshold=0.5,
+                     flow_layout="full", end_behavior="hold"):
+        """
+        flow[t] 为第 t 帧像素到第 t+1 帧的位移；最后一帧以及前后任一帧不可见时为0
+        flow_mask[t] 标记第 t 帧中有光流的像素
+        flow_info 为JSON：{"layout", "canvas_width", "canvas_height", "total_frames",
+                           "boxes": [[x0, y0, x1, y1] 或 null, ...]}（bbox 模式下 flow[t][:y1-y0, :x1-x0] 对应画布区域）
+        """
+        if foreground_image is not None and len(foreground_image) > 0:
+            sprite_h, sprite_w = int(foreground_image.shape[1]), int(foreground_image.shape[2])
+        elif foreground_mask is not None:
+            sprite_h, sprite_w = int(foreground_mask.shape[-2]), int(foreground_mask.shape[-1])
+        else:
+            raise ValueError("必须提供 foreground_image 或 foreground_mask（用于确定前景图尺寸）")
+
+        mask = None
+        if foreground_mask is not None:
+            mask = foreground_mask[0] if foreground_mask.dim() == 3 else foreground_mask
+            mask = mask.float().cpu()
+            if mask.shape != (sprite_h, sprite_w):
+                mask = torch.nn.functional.interpolate(
+                    mask[None, None], size=(sprite_h, sprite_w), mode="bilinear", align_corners=False
+                )[0, 0]
+
+        keyframes = PathDataParser.extract_keyframes_for_animation(PathDataParser.parse(path_data))
+        if len(keyframes) == 0:
+            print("Warning: No keyframes found in path data, flow is zero")
+        engine = AnimationTimeline()
+        effects_dict = effects_table if effects_table is not None else engine.parse_effects_data(effects_data)
+        timeline = engine.build_render_timeline(
+            keyframes, effects_dict, total_frames, smooth_path, None, spline_tolerance, end_behavior
+        )
+
+        transforms, frame_visible, matrices, offsets = engine.sprite_affines(
+            timeline, sprite_w, sprite_h, foreground_scale, center_anchor
+        )
+
+        # 每帧包围盒：旋转扩展后的前景图粘贴区域与画布的交集
+        boxes = []
+        for frame_idx in range(total_frames):
+            box = None
+            if frame_idx + 1 < total_frames and frame_visible[frame_idx] and frame_visible[frame_idx + 1]:
+                paste_x, paste_y = int(transforms[frame_idx, 8]), int(transforms[frame_idx, 9])
+                x0 = max(0, paste_x)
+                y0 = max(0, paste_y)
+                x1 = min(canvas_width, paste_x + int(transforms[frame_idx, 4]))
+                y1 = min(canvas_height, paste_y + int(transforms[frame_idx, 5]))
+                if x1 > x0 and y1 > y0:
+                    box = (x0, y0, x1, y1)
+            boxes.append(box)
+
+        if flow_layout == "bbox":
+            out_w = max([box[2] - box[0] for box in boxes if box is not None], default=1)
+            out_h = max([box[3] - box[1] for box in boxes if box is not None], default=1)
+        else:
+            out_w, out_h = canvas_width, canvas_height
+        flow = torch.zeros((total_frames, out_h, out_w, 2), dtype=torch.float32)
+        flow_mask = torch.zeros((total_frames, out_h, out_w), dtype=torch.float32)
+
+        for frame_idx, box in enumerate(boxes):
+            if box is None:
+                continue
+            region_flow, region_valid = self._region_flow(
+                box, matrices[frame_idx], offsets[frame_idx], matrices[frame_idx + 1], offsets[frame_idx + 1],
+                sprite_w, sprite_h, mask, mask_threshold
+            )
+            x0, y0, x1, y1 = box
+            if flow_layout == "bbox":
+                x1, y1 = x1 - x0, y1 - y0
+                x0 = y0 = 0
+            flow[frame_idx, y0:y1, x0:x1] = region_flow
+            flow_mask[frame_idx, y0:y1, x0:x1] = region_valid
+
+        flow_info = json.dumps({
+            "layout": flow_layout,
+            "canvas_width": canvas_width,
+            "canvas_height": canvas_height,
+            "total_frames": total_frames,
+            "boxes": [list(box) if box is not None else None for box in boxes],
+        })
+        return (flow, flow_mask, flow_info)
+
+    def _region_flow(self, box, matrix, offset, next_matrix, next_offset, sprite_w, sprite_h, mask, threshold):
+        """
+        包围盒内每个像素中心 p 的光流：
+        先反变换到前景图坐标 s = M⁻¹(p - b)，再用下一帧变换得到 p' = M'·s + b'，光流 = p' - p
+        返回 (flow: (h, w, 2) float32, valid: (h, w) float32)
+        """
+        x0, y0, x1, y1 = box
+        ys = torch.arange(y0, y1, dtype=torch.float64) + 0.5
+        xs = torch.arange(x0, x1, dtype=torch.float64) + 0.5
+        grid_y, grid_x = torch.meshgrid(ys, xs, indexing="ij")
+        pixels = torch.stack([grid_x, grid_y], dim=-1)
+
+        source = (pixels - offset) @ torch.linalg.inv(matrix).T
+        moved = source @ next_matrix.T + next_offset
+        flow = moved - pixels
+
+        u, v = source[..., 0], source[..., 1]
+        valid = (u >= 0) & (u < sprite_w) & (v >= 0) & (v < sprite_h)
+        if mask is not None:
+            columns = u.floor().long().clamp(0, sprite_w - 1)
+            rows = v.floor().long().clamp(0, sprite_h - 1)
+            valid &= mask[rows, columns] > threshold
+        flow = flow * valid.unsqueeze(-1)
+        return flow.float(), valid.float()
+
+# author.yichengup.AnimationOpticalFlow 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycAnimationOpticalFlow": ycAnimationOpticalFlow,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycAnimationOpticalFlow": "Animation Optical Flow"
+}
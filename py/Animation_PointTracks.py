@@ -0,0 +1,161 @@
+import torch
+import json
+import math
+import os
+import sys
+
+# 导入轨迹导出节点（支持相对导入和绝对导入）
+try:
+    from .Animation_TrajectoryExport import ycAnimationTrajectoryExport
+    from .AnimationTimeline import AnimationTimeline
+    from .PathDataParser import PathDataParser
+    from .EffectsDataParser import EffectsDataParser
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from Animation_TrajectoryExport import ycAnimationTrajectoryExport
+    from AnimationTimeline import AnimationTimeline
+    from PathDataParser import PathDataParser
+    from EffectsDataParser import EffectsDataParser
+
+
+class ycAnimationPointTracks:
+    """
+    前景图密集点轨迹节点：
+    - 在前景图内按网格（或按遮罩权重随机）采样点
+    - 每帧的变换（缩放、旋转、翻转、位置）与 Image Animate Path 的渲染完全一致，
+      所有点所有帧一次性向量化计算
+    - 输出 (frames, N, 2) 轨迹和 (frames, N) 可见性（遮罩内、不透明、在画布内）
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "path_data": ("STRING", {"default": "", "multiline": True}),
+                "canvas_width": ("INT", {"default": 512}),
+                "canvas_height": ("INT", {"default": 512}),
+                "total_frames": ("INT", {"default": 60, "min": 1, "max": 10000}),
+                "foreground_scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 5.0, "step": 0.1}),
+                "center_anchor": ("BOOLEAN", {"default": True, "tooltip": "前景图是否以中心为锚点"}),
+                "smooth_path": ("BOOLEAN", {"default": True, "tooltip": "是否启用路径平滑（样条插值），与Image Animate Path一致"}),
+            },
+            "optional": {
+                "foreground_image": ("IMAGE", {"tooltip": "前景图（只使用尺寸）；未连接时使用foreground_mask的尺寸"}),
+                "foreground_mask": ("MASK", {"tooltip": "前景图遮罩：决定采样权重和点的可见性"}),
+                "effects_data": ("STRING", {"default": "", "multiline": True, "tooltip": "动画效果数据，格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|..."}),
+                "effects_table": (EffectsDataParser.TABLE_TYPE, {"tooltip": "来自Animation Effects Merge的效果表（已解析），连接后忽略effects_data"}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05}),
+                "sampling": (["grid", "mask_weighted"], {"default": "grid", "tooltip": "grid=均匀网格（遮罩外的点标记为不可见）；mask_weighted=按遮罩值加权随机采样"}),
+                "num_points": ("INT", {"default": 256, "min": 1, "max": 65536, "tooltip": "采样点数（网格模式取不少于该值的完整网格）"}),
+                "mask_threshold": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01, "tooltip": "遮罩值大于该阈值的点才算可见"}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffff}),
+                "coordinate_space": (["pixel", "normalized"], {"default": "pixel"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点；loop=循环；ping_pong=往返播放（与Image Animate Path一致）"}),
+            },
+        }
+
+    RETURN_TYPES = (ycAnimationTrajectoryExport.TRACK_TYPE, ycAnimationTrajectoryExport.VISIBILITY_TYPE, "STRING")
+    RETURN_NAMES = ("tracks", "visibility", "track_info")
+    FUNCTION = "point_tracks"
+    CATEGORY = 'YCNode/Animation'
+
+    def point_tracks(self, path_data, canvas_width, canvas_height, total_frames, foreground_scale,
+                     center_anchor, smooth_path=True, foreground_image=None, foreground_mask=None,
+                     effects_data="", effects_table=None, spline_tolerance=0.0, sampling="grid",
+                     num_points=256, mask_threshold=0.5, seed=0, coordinate_space="pixel", end_behavior="hold"):
+        """
+        track_info 为JSON：{"total_frames", "canvas_width", "canvas_height", "num_points", "sampling",
+                            "sprite_size", "source_points": [[u, v], ...]}（source_points 为前景图原图坐标）
+        """
+        if foreground_image is not None and len(foreground_image) > 0:
+            sprite_h, sprite_w = int(foreground_image.shape[1]), int(foreground_image.shape[2])
+        elif foreground_mask is not None:
+            sprite_h, sprite_w = int(foreground_mask.shape[-2]), int(foreground_mask.shape[-1])
+        else:
+            raise ValueError("必须提供 foreground_image 或 foreground_mask（用于确定前景图尺寸）")
+
+        mask = None
+        if foreground_mask is not None:
+            mask = foreground_mask[0] if foreground_mask.dim() == 3 else foreground_mask
+            mask = mask.float().cpu()
+            if mask.shape != (sprite_h, sprite_w):
+                mask = torch.nn.functional.interpolate(
+                    mask[None, None], size=(sprite_h, sprite_w), mode="bilinear", align_corners=False
+                )[0, 0]
+
+        points = self._sample_sprite_points(sprite_w, sprite_h, mask, sampling, num_points, seed)
+        point_visible = self._mask_visibility(points, mask, mask_threshold)
+
+        keyframes = PathDataParser.extract_keyframes_for_animation(PathDataParser.parse(path_data))
+        if len(keyframes) == 0:
+            print("Warning: No keyframes found in path data, all points are invisible")
+        engine = AnimationTimeline()
+        effects_dict = effects_table if effects_table is not None else engine.parse_effects_data(effects_data)
+        timeline = engine.build_render_timeline(
+            keyframes, effects_dict, total_frames, smooth_path, None, spline_tolerance, end_behavior
+        )
+
+        _, frame_visible, matrices, offsets = engine.sprite_affines(
+            timeline, sprite_w, sprite_h, foreground_scale, center_anchor
+        )
+        tracks = engine.apply_affines(points, matrices, offsets)
+
+        inside = (
+            (tracks[..., 0] >= 0) & (tracks[..., 0] < canvas_width) &
+            (tracks[..., 1] >= 0) & (tracks[..., 1] < canvas_height)
+        )
+        visibility = inside & frame_visible[:, None] & point_visible[None, :]
+
+        if coordinate_space == "normalized":
+            tracks[..., 0] /= max(1, canvas_width)
+            tracks[..., 1] /= max(1, canvas_height)
+
+        track_info = json.dumps({
+            "total_frames": total_frames,
+            "canvas_width": canvas_width,
+            "canvas_height": canvas_height,
+            "coordinate_space": coordinate_space,
+            "num_points": int(points.shape[0]),
+            "sampling": sampling,
+            "sprite_size": [sprite_w, sprite_h],
+            "source_points": [[round(u, 3), round(v, 3)] for u, v in points.tolist()],
+        })
+        return (tracks, visibility, track_info)
+
+    def _sample_sprite_points(self, width, height, mask, sampling, num_points, seed):
+        """在前景图原图坐标系中采样点（像素连续坐标，像素中心为 i + 0.5），返回 (N, 2)"""
+        if sampling == "mask_weighted" and mask is not None and float(mask.sum()) > 0:
+            generator = torch.Generator().manual_seed(int(seed))
+            weights = mask.clamp(min=0).flatten()
+            index = torch.multinomial(weights, num_points, replacement=True, generator=generator)
+            jitter = torch.rand((num_points, 2), generator=generator)
+            u = (index % width).float() + jitter[:, 0]
+            v = torch.div(index, width, rounding_mode="floor").float() + jitter[:, 1]
+            return torch.stack([u, v], dim=1)
+
+        # 网格：列数与行数按前景图宽高比分配
+        columns = max(1, round(math.sqrt(num_points * width / max(1, height))))
+        rows = max(1, math.ceil(num_points / columns))
+        u = (torch.arange(columns, dtype=torch.float32) + 0.5) * (width / columns)
+        v = (torch.arange(rows, dtype=torch.float32) + 0.5) * (height / rows)
+        grid_v, grid_u = torch.meshgrid(v, u, indexing="ij")
+        return torch.stack([grid_u.flatten(), grid_v.flatten()], dim=1)
+
+    def _mask_visibility(self, points, mask, threshold):
+        """点所在像素的遮罩值大于阈值时可见；没有遮罩时全部可见"""
+        if mask is None:
+            return torch.ones((points.shape[0],), dtype=torch.bool)
+        height, width = mask.shape
+        columns = points[:, 0].long().clamp(0, width - 1)
+        rows = points[:, 1].long().clamp(0, height - 1)
+        return mask[rows, columns] > threshold
+
+# author.yichengup.AnimationPointTracks 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycAnimationPointTracks": ycAnimationPointTracks,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycAnimationPointTracks": "Animation Point Tracks"
+}
@@ -0,0 +1,132 @@
+import torch
+import json
+import os
+import sys
+
+# 导入时间轴（支持相对导入和绝对导入）
+try:
+    from .AnimationTimeline import AnimationTimeline
+    from .PathDataParser import PathDataParser
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from AnimationTimeline import AnimationTimeline
+    from PathDataParser import PathDataParser
+
+
+class ycAnimationTrajectoryExport:
+    """
+    轨迹导出节点（用于TTM/WanVideo等运动控制）：
+    - 只运行与 Image Animate Path 相同的路径插值，不做任何图像处理
+    - 输出逐帧坐标张量 (frames, 2)，多条路径时为 (frames, K, 2)
+    - 同时输出包含路径数据、帧数、画布尺寸和坐标的JSON
+    """
+
+    # 节点间传递的轨迹张量类型（float32，最后一维为 x, y）
+    TRACK_TYPE = "YC_TRACKS"
+    # 轨迹点可见性（bool，形状与轨迹去掉最后一维相同）
+    VISIBILITY_TYPE = "YC_TRACK_VISIBILITY"
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "path_data": ("STRING", {"default": "", "multiline": True}),
+                "canvas_width": ("INT", {"default": 512}),
+                "canvas_height": ("INT", {"default": 512}),
+                "total_frames": ("INT", {"default": 60, "min": 1, "max": 10000}),
+                "smooth_path": ("BOOLEAN", {"default": True, "tooltip": "是否启用路径平滑（样条插值），与Image Animate Path一致"}),
+            },
+            "optional": {
+                "extra_path_data": ("STRING", {"default": "", "multiline": True, "tooltip": "更多路径（JSON数组，或每行一组），每组输出一条轨迹，排在path_data之后"}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05, "tooltip": "路径平滑的自适应细分容差（像素），0表示每段固定插入10个点"}),
+                "coordinate_space": (["pixel", "normalized"], {"default": "pixel", "tooltip": "pixel=画布像素坐标；normalized=除以画布宽高（0-1）"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点；loop=循环；ping_pong=往返播放（与Image Animate Path一致）"}),
+                "track_layout": (["auto", "frames_k_2"], {"default": "auto", "tooltip": "auto=只有一条轨迹时输出 (frames, 2)；frames_k_2=始终输出 (frames, K, 2)"}),
+            },
+        }
+
+    RETURN_TYPES = (TRACK_TYPE, "STRING")
+    RETURN_NAMES = ("tracks", "track_json")
+    FUNCTION = "export"
+    CATEGORY = 'YCNode/Animation'
+
+    def export(self, path_data, canvas_width, canvas_height, total_frames, smooth_path=True,
+               extra_path_data="", spline_tolerance=0.0, coordinate_space="pixel", track_layout="auto",
+               end_behavior="hold"):
+        """
+        track_json 格式：
+        {"path_data", "total_frames", "canvas_width", "canvas_height", "coordinate_space", "end_behavior",
+         "tracks": [[{"x", "y"}, ...每帧], ...每条轨迹], "visible": [[bool, ...], ...]}
+        路径没有可用的点时，不可见帧沿用最近的可见位置（没有可见帧时为画布原点）
+        """
+        path_sources = [path_data] + AnimationTimeline().parse_variant_list(extra_path_data)
+        tracks, visible = self._compute_tracks(path_sources, total_frames, smooth_path, spline_tolerance, end_behavior)
+
+        if coordinate_space == "normalized":
+            tracks[..., 0] /= max(1, canvas_width)
+            tracks[..., 1] /= max(1, canvas_height)
+
+        track_json = json.dumps({
+            "path_data": path_data if len(path_sources) == 1 else path_sources,
+            "total_frames": total_frames,
+            "canvas_width": canvas_width,
+            "canvas_height": canvas_height,
+            "coordinate_space": coordinate_space,
+            "end_behavior": end_behavior,
+            "tracks": [
+                [{"x": round(float(x), 3), "y": round(float(y), 3)} for x, y in tracks[:, k].tolist()]
+                for k in range(tracks.shape[1])
+            ],
+            "visible": visible.t().tolist(),
+        })
+
+        if track_layout == "auto" and tracks.shape[1] == 1:
+            tracks = tracks[:, 0]
+        return (tracks, track_json)
+
+    def _compute_tracks(self, path_sources, total_frames, smooth_path=True, spline_tolerance=0.0, end_behavior="hold"):
+        """
+        计算每条路径的逐帧位置（循环/往返播放时周期之后的帧沿用周期内对应帧的位置）
+        返回 (tracks: (frames, K, 2) float32, visible: (frames, K) bool)
+        """
+        engine = AnimationTimeline()
+        tracks = torch.zeros((total_frames, len(path_sources), 2), dtype=torch.float32)
+        visible = torch.zeros((total_frames, len(path_sources)), dtype=torch.bool)
+        for track_idx, source in enumerate(path_sources):
+            keyframes = engine.prepare_timeline_keyframes(
+                PathDataParser.extract_keyframes_for_animation(PathDataParser.parse(source))
+            )
+            if len(keyframes) == 0:
+                print(f"Warning: Track {track_idx} has no keyframes, exporting zeros")
+            cycle_sources = engine.plan_cycle_frames(keyframes, total_frames, end_behavior)
+            points = []
+            for frame_idx in range(total_frames):
+                if cycle_sources is not None and cycle_sources[frame_idx] != frame_idx:
+                    points.append(points[cycle_sources[frame_idx]])
+                    continue
+                position, _ = engine.interpolate_position(
+                    keyframes, frame_idx, total_frames, smooth_path, spline_tolerance
+                )
+                points.append(None if position is None else (position['x'], position['y']))
+
+            # 不可见帧沿用最近的可见位置
+            last = next((p for p in points if p is not None), (0.0, 0.0))
+            filled = []
+            for point in points:
+                if point is not None:
+                    last = point
+                filled.append(last)
+            tracks[:, track_idx] = torch.tensor(filled, dtype=torch.float32)
+            visible[:, track_idx] = torch.tensor([p is not None for p in points], dtype=torch.bool)
+        return tracks, visible
+
+# author.yichengup.AnimationTrajectoryExport 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycAnimationTrajectoryExport": ycAnimationTrajectoryExport,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycAnimationTrajectoryExport": "Animation Trajectory Export"
+}
@@ -0,0 +1,183 @@
+"""
+三次贝塞尔路径（解析求值）
+由锚点（可带控制柄 cp1/cp2）组成，与前端钢笔工具的路径格式一致：
+相邻两个锚点中，前一个有 cp2 且后一个有 cp1 时为三次贝塞尔曲线段，否则为直线段
+弧长参数化：每段预先用 Gauss-Legendre 积分建立分段弧长表，按弧长取点时用牛顿迭代求参数 t，
+精度不依赖采样密度
+"""
+import math
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+# 5点 Gauss-Legendre 积分节点和权重（区间 [-1, 1]）
+_GL_NODES = (0.0, -0.5384693101056831, 0.5384693101056831, -0.9061798459386640, 0.9061798459386640)
+_GL_WEIGHTS = (0.5688888888888889, 0.4786286704993665, 0.4786286704993665, 0.2369268850561891, 0.2369268850561891)
+
+# 每个曲线段的弧长表分段数
+_ARC_TABLE_INTERVALS = 8
+
+# 端点重合判定阈值（与路径拼接时的去重阈值一致）
+_JOIN_EPSILON = 0.01
+
+
+class _Segment:
+    """单个路径段：直线（c1/c2 为 None）或三次贝塞尔曲线"""
+    __slots__ = ("p0", "c1", "c2", "p3", "knots", "lengths", "length")
+
+    def __init__(self, p0: Point, c1: Optional[Point], c2: Optional[Point], p3: Point):
+        self.p0 = p0
+        self.c1 = c1
+        self.c2 = c2
+        self.p3 = p3
+        if self.is_line:
+            self.knots = [0.0, 1.0]
+            self.lengths = [0.0, math.hypot(p3[0] - p0[0], p3[1] - p0[1])]
+        else:
+            # 分段弧长表：knots[k] 处的累计弧长为 lengths[k]
+            self.knots = [k / _ARC_TABLE_INTERVALS for k in range(_ARC_TABLE_INTERVALS + 1)]
+            self.lengths = [0.0]
+            for k in range(_ARC_TABLE_INTERVALS):
+                self.lengths.append(self.lengths[-1] + self._integrate(self.knots[k], self.knots[k + 1]))
+        self.length = self.lengths[-1]
+
+    @property
+    def is_line(self) -> bool:
+        return self.c1 is None or self.c2 is None
+
+    def point(self, t: float) -> Point:
+        p0, p3 = self.p0, self.p3
+        if self.is_line:
+            return (p0[0] + (p3[0] - p0[0]) * t, p0[1] + (p3[1] - p0[1]) * t)
+        c1, c2 = self.c1, self.c2
+        mt = 1.0 - t
+        a = mt * mt * mt
+        b = 3.0 * mt * mt * t
+        c = 3.0 * mt * t * t
+        d = t * t * t
+        return (a * p0[0] + b * c1[0] + c * c2[0] + d * p3[0],
+                a * p0[1] + b * c1[1] + c * c2[1] + d * p3[1])
+
+    def speed(self, t: float) -> float:
+        """|B'(t)|"""
+        p0, p3 = self.p0, self.p3
+        if self.is_line:
+            return self.length
+        c1, c2 = self.c1, self.c2
+        mt = 1.0 - t
+        a = 3.0 * mt * mt
+        b = 6.0 * mt * t
+        c = 3.0 * t * t
+        dx = a * (c1[0] - p0[0]) + b * (c2[0] - c1[0]) + c * (p3[0] - c2[0])
+        dy = a * (c1[1] - p0[1]) + b * (c2[1] - c1[1]) + c * (p3[1] - c2[1])
+        return math.hypot(dx, dy)
+
+    def _integrate(self, t0: float, t1: float) -> float:
+        """[t0, t1] 区间的弧长（Gauss-Legendre 积分）"""
+        half = (t1 - t0) * 0.5
+        mid = (t1 + t0) * 0.5
+        return half * sum(w * self.speed(mid + half * x) for x, w in zip(_GL_NODES, _GL_WEIGHTS))
+
+    def point_at_length(self, distance: float) -> Point:
+        """段内按弧长取点（distance 为从段起点开始的弧长）"""
+        if self.length <= 0.0:
+            return self.p0
+        distance = max(0.0, min(self.length, distance))
+        if self.is_line:
+            return self.point(distance / self.length)
+
+        k = min(bisect_right(self.lengths, distance) - 1, _ARC_TABLE_INTERVALS - 1)
+        t_lo, t_hi = self.knots[k], self.knots[k + 1]
+        base = self.lengths[k]
+        interval = self.lengths[k + 1] - base
+        target = distance - base
+        t = t_lo + (t_hi - t_lo) * (target / interval if interval > 0 else 0.0)
+
+        # 牛顿迭代：s(t) - target = 0，s'(t) = |B'(t)|
+        for _ in range(4):
+            error = self._integrate(t_lo, t) - target
+            if abs(error) < 1e-6:
+                break
+            speed = self.speed(t)
+            if speed <= 1e-12:
+                break
+            t = max(t_lo, min(t_hi, t - error / speed))
+        return self.point(t)
+
+
+class BezierPath:
+    """由直线段和三次贝塞尔曲线段组成的路径，支持按弧长解析取点"""
+
+    def __init__(self, segments: List[_Segment], start: Optional[Point] = None):
+        self.segments = segments
+        self._start = start if start is not None else (segments[0].p0 if segments else None)
+        # 每段起点处的累计弧长
+        self.offsets = []
+        total = 0.0
+        for segment in segments:
+            self.offsets.append(total)
+            total += segment.length
+        self.length = total
+
+    @staticmethod
+    def from_anchors(anchors: List[Dict[str, Any]]) -> Optional["BezierPath"]:
+        """
+        从锚点列表创建路径
+        anchors: [{"x", "y", "cp1": {"x", "y"} 或 None, "cp2": {"x", "y"} 或 None}, ...]
+        """
+        if not anchors:
+            return None
+        points = [(float(a["x"]), float(a["y"])) for a in anchors]
+        segments = []
+        for i in range(len(anchors) - 1):
+            cp2 = anchors[i].get("cp2")
+            cp1 = anchors[i + 1].get("cp1")
+            if cp2 and cp1:
+                segments.append(_Segment(points[i], (float(cp2["x"]), float(cp2["y"])),
+                                         (float(cp1["x"]), float(cp1["y"])), points[i + 1]))
+            else:
+                segments.append(_Segment(points[i], None, None, points[i + 1]))
+        return BezierPath(segments, points[0])
+
+    @staticmethod
+    def from_points(points: List[Dict[str, float]]) -> Optional["BezierPath"]:
+        """从点序列创建折线路径"""
+        if not points:
+            return None
+        return BezierPath.from_anchors(points)
+
+    @property
+    def start(self) -> Point:
+        return self._start
+
+    @property
+    def end(self) -> Point:
+        return self.segments[-1].p3 if self.segments else self._start
+
+    def joined(self, other: "BezierPath") -> "BezierPath":
+        """
+        拼接两条路径（复用各段已计算的弧长表）
+        端点重合时直接相接，否则用直线段连接（与点序列拼接的行为一致）
+        """
+        segments = list(self.segments)
+        end, start = self.end, other.start
+        if abs(end[0] - start[0]) >= _JOIN_EPSILON or abs(end[1] - start[1]) >= _JOIN_EPSILON:
+            segments.append(_Segment(end, None, None, start))
+        segments.extend(other.segments)
+        return BezierPath(segments, self.start)
+
+    def point_at_length(self, distance: float) -> Dict[str, float]:
+        """按从起点开始的弧长取点"""
+        if not self.segments or self.length <= 0.0:
+            return {'x': self._start[0], 'y': self._start[1]}
+        distance = max(0.0, min(self.length, distance))
+        index = max(0, bisect_right(self.offsets, distance) - 1)
+        x, y = self.segments[index].point_at_length(distance - self.offsets[index])
+        return {'x': x, 'y': y}
+
+    def point_at_fraction(self, t: float) -> Dict[str, float]:
+        """按弧长比例（0-1）取点"""
+        return self.point_at_length(self.length * max(0.0, min(1.0, t)))
+
+# author.yichengup.BezierPath 2025.01.XX
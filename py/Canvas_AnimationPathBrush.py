@@ -1,9 +1,4 @@
 import torch
-import numpy as np
-from PIL import Image
-import io
-import base64
-import nodes
 import sys
 import os
 
@@ -109,45 +104,9 @@ class ycCanvasAnimationPathBrush:
         normalized_keyframes = []
         
         for kf in parsed_data.get("keyframes", []):
-            points = kf.get("points", [])
-            if not points:
-                continue
-            
-            # 去除重复点（距离小于阈值的点）
-            normalized_points = []
-            min_distance = 0.5  # 最小点间距
-            
-            for point in points:
-                x = max(0, min(float(point.get("x", 0)), canvas_width - 1))
-                y = max(0, min(float(point.get("y", 0)), canvas_height - 1))
-                
-                # 检查是否与上一个点太近
-                if normalized_points:
-                    last_point = normalized_points[-1]
-                    dx = x - last_point["x"]
-                    dy = y - last_point["y"]
-                    distance = (dx * dx + dy * dy) ** 0.5
-                    
-                    if distance < min_distance:
-                        continue  # 跳过太近的点
-                
-                normalized_points.append({"x": x, "y": y})
-            
-            # 至少保留起点和终点
-            if len(normalized_points) == 0 and points:
-                first_point = points[0]
-                normalized_points.append({
-                    "x": max(0, min(float(first_point.get("x", 0)), canvas_width - 1)),
-                    "y": max(0, min(float(first_point.get("y", 0)), canvas_height - 1))
-                })
-            
-            if normalized_points:
-                normalized_keyframes.append({
-                    "frame": kf.get("frame", 0),
-                    "points": normalized_points,
-                    "direction": kf.get("direction", 1),
-                    "metadata": kf.get("metadata", {})
-                })
+            normalized_kf = self._normalize_keyframe(kf, canvas_width, canvas_height)
+            if normalized_kf is not None:
+                normalized_keyframes.append(normalized_kf)
         
         return {
             "version": parsed_data.get("version", PathDataParser.CURRENT_VERSION),
@@ -155,6 +114,51 @@ class ycCanvasAnimationPathBrush:
             "metadata": parsed_data.get("metadata", {})
         }
     
+    def _normalize_keyframe(self, kf: dict, canvas_width: int, canvas_height: int):
+        """规范化单个关键帧，没有路径点时返回 None"""
+        points = kf.get("points", [])
+        if not points:
+            return None
+        
+        # 去除重复点（距离小于阈值的点）
+        normalized_points = []
+        min_distance = 0.5  # 最小点间距
+        
+        for point in points:
+            x = max(0, min(float(point.get("x", 0)), canvas_width - 1))
+            y = max(0, min(float(point.get("y", 0)), canvas_height - 1))
+            
+            # 检查是否与上一个点太近
+            if normalized_points:
+                last_point = normalized_points[-1]
+                dx = x - last_point["x"]
+                dy = y - last_point["y"]
+                distance = (dx * dx + dy * dy) ** 0.5
+                
+                if distance < min_distance:
+                    continue  # 跳过太近的点
+            
+            normalized_points.append({"x": x, "y": y})
+        
+        # 至少保留起点和终点
+        if len(normalized_points) == 0 and points:
+            first_point = points[0]
+            normalized_points.append({
+                "x": max(0, min(float(first_point.get("x", 0)), canvas_width - 1)),
+                "y": max(0, min(float(first_point.get("y", 0)), canvas_height - 1))
+            })
+        
+        normalized_kf = {
+            "frame": kf.get("frame", 0),
+            "points": normalized_points,
+            "direction": kf.get("direction", 1),
+            "metadata": kf.get("metadata", {})
+        }
+        # 贝塞尔锚点原样保留（控制柄决定曲线形状，不做去重和裁剪）
+        if kf.get("bezier"):
+            normalized_kf["bezier"] = kf["bezier"]
+        return normalized_kf
+    
     def _create_preview_image(self, parsed_data: dict, canvas_width: int, canvas_height: int) -> torch.Tensor:
         """
         创建预览图像（在画布上绘制路径）
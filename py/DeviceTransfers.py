@@ -0,0 +1,66 @@
+"""
+设备传输记录
+输入张量在加速器（GPU等）上时，主机与设备之间的每一次拷贝都通过这里显式进行并登记，
+渲染报告中可以看到发生了哪些传输、传输了多少字节；输入在CPU上时不产生任何记录
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import torch
+
+
+class TransferLog:
+    """主机 <-> 设备张量传输记录（按标签汇总；多个渲染线程可共用同一个记录）"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, label: str, direction: str, tensor: torch.Tensor, device: torch.device):
+        with self._lock:
+            record = self._records.setdefault(label, {"direction": direction, "device": str(device), "count": 0, "bytes": 0})
+            record["count"] += 1
+            record["bytes"] += tensor.element_size() * tensor.nelement()
+
+    def to_host(self, tensor: Optional[torch.Tensor], label: str) -> Optional[torch.Tensor]:
+        """拷贝到主机内存（已在CPU上时原样返回，不记录）"""
+        if tensor is None or tensor.device.type == "cpu":
+            return tensor
+        self._record(label, "device_to_host", tensor, tensor.device)
+        return tensor.cpu()
+
+    def to_device(self, tensor: Optional[torch.Tensor], device: torch.device, label: str,
+                  dtype: Optional[torch.dtype] = None) -> Optional[torch.Tensor]:
+        """拷贝到指定设备（已在该设备上时只做类型转换，不记录）"""
+        if tensor is None:
+            return tensor
+        device = torch.device(device)
+        if tensor.device != device:
+            self._record(label, "host_to_device" if device.type != "cpu" else "device_to_host", tensor, device)
+        return tensor.to(device=device, dtype=dtype)
+
+    @property
+    def count(self) -> int:
+        return sum(record["count"] for record in self._records.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(record["bytes"] for record in self._records.values())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "bytes": self.total_bytes,
+            "transfers": {label: dict(record) for label, record in self._records.items()},
+        }
+
+    def report(self, owner: str):
+        """发生过传输时打印一行日志"""
+        if self._records:
+            details = ", ".join(
+                f"{label}: {record['count']}x {record['bytes'] / 1048576:.1f}MB {record['direction']}"
+                for label, record in self._records.items()
+            )
+            print(f"[{owner}] host/device transfers: {details}")
+
+# author.yichengup.DeviceTransfers 2025.01.XX
@@ -0,0 +1,129 @@
+"""
+效果数据解析和序列化工具类
+格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|keyframe:...
+"""
+from typing import Dict, Any, List
+
+
+class EffectsDataParser:
+    """
+    效果数据解析器
+    与 PathDataParser 对应，供动画合成节点和效果节点共用
+    """
+
+    # 效果参数顺序（与字符串格式中的字段顺序一致）
+    FIELDS = ("scale_x", "scale_y", "rotation", "flip_x", "flip_y", "opacity")
+
+    # 节点间传递的效果表类型：按关键帧排序的 {keyframe: {字段: 值}}，值已转换为 float/bool
+    TABLE_TYPE = "YC_EFFECTS_TABLE"
+
+    # 重复关键帧的处理方式
+    DUPLICATE_POLICIES = ("last", "first", "error")
+
+    @staticmethod
+    def default_effects() -> Dict[str, Any]:
+        """默认效果（无变换）"""
+        return {
+            'scale_x': 1.0,
+            'scale_y': 1.0,
+            'rotation': 0.0,
+            'flip_x': False,
+            'flip_y': False,
+            'opacity': 1.0
+        }
+
+    @staticmethod
+    def parse(effects_data: str) -> Dict[int, Dict[str, Any]]:
+        """
+        解析效果数据字符串
+
+        Returns:
+            {keyframe: {'scale_x', 'scale_y', 'rotation', 'flip_x', 'flip_y', 'opacity'}, ...}
+            同一关键帧出现多次时，后出现的覆盖先出现的
+        """
+        effects_dict = {}
+        if not effects_data or not effects_data.strip():
+            return effects_dict
+
+        try:
+            effect_strings = effects_data.split('|')
+            for eff_str in effect_strings:
+                if not eff_str.strip():
+                    continue
+
+                parts = eff_str.split(':')
+                if len(parts) >= 2:
+                    keyframe = int(parts[0])
+                    params_str = ':'.join(parts[1:])
+                    params = params_str.split(',')
+
+                    if len(params) >= 6:
+                        effects_dict[keyframe] = {
+                            'scale_x': float(params[0]),
+                            'scale_y': float(params[1]),
+                            'rotation': float(params[2]),
+                            'flip_x': bool(int(params[3])),
+                            'flip_y': bool(int(params[4])),
+                            'opacity': float(params[5])
+                        }
+        except Exception as e:
+            print(f"Error parsing effects data: {e}")
+            import traceback
+            traceback.print_exc()
+
+        return effects_dict
+
+    @staticmethod
+    def serialize(effects_dict: Dict[int, Dict[str, Any]]) -> str:
+        """序列化为效果数据字符串（按关键帧排序）"""
+        effect_strings = []
+        for keyframe in sorted(effects_dict):
+            eff = effects_dict[keyframe]
+            effect_strings.append(
+                f"{keyframe}:{eff['scale_x']},{eff['scale_y']},{eff['rotation']},"
+                f"{1 if eff['flip_x'] else 0},{1 if eff['flip_y'] else 0},{eff['opacity']}"
+            )
+        return '|'.join(effect_strings)
+
+    @staticmethod
+    def merge(effects_data_list: List[str], duplicate_policy: str = "last") -> Dict[int, Dict[str, Any]]:
+        """
+        按顺序解析并合并多段效果数据，返回按关键帧排序的效果表
+
+        duplicate_policy（不同输入中出现同一关键帧时）：
+            last: 后面的输入覆盖前面的（与直接用|拼接后解析的结果一致）
+            first: 保留最先出现的
+            error: 抛出异常
+        同一段输入内部的重复关键帧仍按 parse 的规则处理（后出现的覆盖）
+        """
+        if duplicate_policy not in EffectsDataParser.DUPLICATE_POLICIES:
+            raise ValueError(f"未知的重复关键帧处理方式：{duplicate_policy}")
+
+        merged = {}
+        sources = {}
+        for input_index, effects_data in enumerate(effects_data_list):
+            for keyframe, effects in EffectsDataParser.parse(effects_data).items():
+                if keyframe in merged:
+                    if duplicate_policy == "first":
+                        continue
+                    if duplicate_policy == "error":
+                        raise ValueError(
+                            f"关键帧 {keyframe} 的效果重复定义（第 {sources[keyframe] + 1} 个和第 {input_index + 1} 个输入）"
+                        )
+                merged[keyframe] = effects
+                sources[keyframe] = input_index
+
+        return {
+            keyframe: {
+                'scale_x': float(merged[keyframe]['scale_x']),
+                'scale_y': float(merged[keyframe]['scale_y']),
+                'rotation': float(merged[keyframe]['rotation']),
+                'flip_x': bool(merged[keyframe]['flip_x']),
+                'flip_y': bool(merged[keyframe]['flip_y']),
+                'opacity': float(merged[keyframe]['opacity']),
+            }
+            for keyframe in sorted(merged)
+        }
+
+
+# author.yichengup.EffectsDataParser 2025.01.XX
@@ -1,7 +1,7 @@
 import torch
+import torch.nn.functional as F
 import numpy as np
 from PIL import Image
-import nodes
 import math
 import sys
 import os
@@ -16,7 +16,27 @@ except ImportError:
         sys.path.insert(0, current_dir)
     from PathDataParser import PathDataParser
 
-class ycImageAnimatePath:
+try:
+    from .EffectsDataParser import EffectsDataParser
+    from .RenderCache import get_render_cache
+except ImportError:
+    from EffectsDataParser import EffectsDataParser
+    from RenderCache import get_render_cache
+
+try:
+    from .RenderProfiler import create_profiler
+    from .RenderMemoryPlanner import RenderMemoryPlanner
+    from .AnimationTimeline import AnimationTimeline
+    from .AnimatedLayer import AnimatedLayer
+    from .DeviceTransfers import TransferLog
+except ImportError:
+    from RenderProfiler import create_profiler
+    from RenderMemoryPlanner import RenderMemoryPlanner
+    from AnimationTimeline import AnimationTimeline
+    from AnimatedLayer import AnimatedLayer
+    from DeviceTransfers import TransferLog
+
+class ycImageAnimatePath(AnimationTimeline):
     """
     动画路径合成节点：
     - 接收路径数据和前景/背景图像
@@ -40,16 +60,32 @@ class ycImageAnimatePath:
                 "foreground_image": ("IMAGE", {"tooltip": "单个前景图。如果提供了foreground_images，此参数将被忽略"}),
                 "foreground_images": ("IMAGE", {"tooltip": "批次前景图，支持多个不同尺寸的图片。如果提供，将优先使用批次模式，并根据keyframe_image_map在不同关键帧使用不同的前景图"}),
                 "effects_data": ("STRING", {"default": "", "multiline": True, "tooltip": "动画效果数据，格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|..."}),
+                "effects_table": (EffectsDataParser.TABLE_TYPE, {"tooltip": "来自Animation Effects Merge的效果表（已解析），连接后忽略effects_data"}),
                 "foreground_mask": ("MASK", {"tooltip": "单个前景图遮罩，白色区域保留，黑色区域透明。遮罩会在应用动画效果之前应用到前景图（仅在单个前景图模式下使用）"}),
                 "foreground_masks": ("MASK", {"tooltip": "批次遮罩，可选。如果提供，每个遮罩对应foreground_images中的一个图片（仅在批次模式下使用）"}),
                 "keyframe_image_map": ("STRING", {"default": "", "multiline": True, "tooltip": "关键帧图片映射，格式：keyframe:image_index|keyframe:image_index。例如：0:0|10:1|20:2 表示KF0使用第0个图片，KF10使用第1个图片，KF20使用第2个图片（仅在批次模式下使用）"}),
                 "normalize_image_size": (["max", "first", "custom", "original"], {"default": "max", "tooltip": "统一尺寸模式：max=最大尺寸，first=第一个图片尺寸，custom=自定义，original=保持原始尺寸（仅在批次模式下使用）"}),
                 "custom_image_size": ("INT", {"default": 512, "min": 64, "max": 4096, "tooltip": "自定义统一尺寸（当normalize_image_size=custom时使用，仅在批次模式下使用）"}),
+                "disk_cache": ("BOOLEAN", {"default": False, "tooltip": "启用磁盘渲染缓存：输入未变化时直接从磁盘加载帧序列（内存映射），服务重启后依然有效"}),
+                "disk_cache_dir": ("STRING", {"default": "", "tooltip": "磁盘缓存目录，留空使用默认目录（插件目录下的cache/render，或环境变量YC_ANIMATION_CACHE_DIR）"}),
+                "disk_cache_max_mb": ("INT", {"default": 4096, "min": 0, "max": 1048576, "tooltip": "磁盘缓存容量上限（MB），超出后按最近最少使用淘汰；0表示不限制"}),
+                "output_dtype": (["float32", "float16"], {"default": "float32", "tooltip": "输出帧和遮罩的数据类型：float16 内存减半，适合直接送入会降精度的节点（如VAE编码）"}),
+                "memory_budget_mb": ("INT", {"default": 0, "min": 0, "max": 1048576, "tooltip": "渲染内存预算（MB），渲染前预估峰值内存；0表示不限制"}),
+                "memory_policy": (["auto", "refuse"], {"default": "auto", "tooltip": "超出内存预算时：auto=自动切换为紧凑输出（float16），仍超出则拒绝；refuse=直接拒绝"}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05, "tooltip": "路径平滑的自适应细分容差（像素）：每段样条细分到弦误差小于该值；0表示每段固定插入10个点（原有行为）"}),
+                "quality": (["final", "draft"], {"default": "final", "tooltip": "渲染质量：final=原有的完整质量；draft=按代理比例低分辨率快速预览（轨迹与final完全相同）"}),
+                "draft_scale": ("FLOAT", {"default": 0.5, "min": 0.1, "max": 1.0, "step": 0.05, "tooltip": "草稿模式的代理渲染比例（画布和前景图同比缩小）"}),
+                "draft_filter": (["bilinear", "nearest"], {"default": "bilinear", "tooltip": "草稿模式的缩放滤波（final固定使用LANCZOS）"}),
+                "draft_frame_step": ("INT", {"default": 1, "min": 1, "max": 30, "tooltip": "草稿模式每N帧渲染一帧，其余帧复制前一个渲染帧；1表示逐帧渲染"}),
+                "draft_upscale": ("BOOLEAN", {"default": True, "tooltip": "草稿结果放大回画布尺寸；关闭时直接输出代理分辨率"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点（原有行为）；loop=从第一个关键帧开始循环；ping_pong=往返播放。循环时只渲染一个周期，其余帧按索引复制"}),
+                "output_layer": ("BOOLEAN", {"default": False, "tooltip": "同时输出动画图层（变换后的前景图块 + 每帧放置坐标），可用Animated Layer Composite节点重新合成到任意背景；启用时不使用磁盘缓存"}),
+                "profile": ("BOOLEAN", {"default": False, "tooltip": "输出各阶段耗时/调用次数/像素数/峰值内存的JSON报告（也可通过环境变量YC_ANIMATION_PROFILE=1开启）"}),
             },
         }
 
-    RETURN_TYPES = ("IMAGE", "MASK")
-    RETURN_NAMES = ("animated_frames", "animated_masks")
+    RETURN_TYPES = ("IMAGE", "MASK", "STRING", "INT", AnimatedLayer.LAYER_TYPE)
+    RETURN_NAMES = ("animated_frames", "animated_masks", "render_report", "estimated_memory_mb", "animated_layer")
     FUNCTION = "animate"
     CATEGORY = 'YCNode/Animation'
 
@@ -57,7 +93,12 @@ class ycImageAnimatePath:
                 total_frames, foreground_scale, center_anchor, smooth_path=True, 
                 foreground_image=None, foreground_images=None, effects_data="", 
                 foreground_mask=None, foreground_masks=None, keyframe_image_map="", 
-                normalize_image_size="max", custom_image_size=512):
+                normalize_image_size="max", custom_image_size=512,
+                disk_cache=False, disk_cache_dir="", disk_cache_max_mb=4096,
+                output_dtype="float32", memory_budget_mb=0, memory_policy="auto", profile=False,
+                effects_table=None, spline_tolerance=0.0, quality="final", draft_scale=0.5,
+                draft_filter="bilinear", draft_frame_step=1, draft_upscale=True, output_layer=False,
+                end_behavior="hold"):
         """
         动画路径合成
         
@@ -65,6 +106,16 @@ class ycImageAnimatePath:
         1. 批次模式（优先）：如果提供了foreground_images，使用批次模式
         2. 单个模式：如果只提供了foreground_image，使用单个前景图
         3. 错误：如果两者都未提供，抛出异常
+        
+        效果输入：effects_table（已解析的效果表）优先于 effects_data 字符串
+        磁盘缓存（disk_cache=True）：输入完全相同时跳过渲染，直接加载上次的结果
+        内存预算（memory_budget_mb>0）：渲染前预估峰值内存，超出时自动切换紧凑输出或拒绝
+        性能统计（profile=True 或 YC_ANIMATION_PROFILE=1）：render_report 输出JSON报告，未启用时为空字符串
+        草稿模式（quality=draft）：时间轴按原画布尺寸计算，只在代理分辨率下合成，可跳帧，结果放大回画布尺寸
+        动画图层（output_layer=True）：额外输出前景图块和每帧放置信息，未启用时 animated_layer 为 None
+        结束行为（end_behavior=loop/ping_pong）：周期为第一个到最后一个关键帧，只渲染一个周期，之后的帧复制周期内对应的帧
+        设备：输出批次直接分配在 background_image 所在的设备上；PIL合成在主机上进行，素材准备时下载一次，
+        每个渲染帧以8位数据上传一次，所有传输记录在报告的 device_transfers 中
         """
         # 验证前景图输入
         use_batch_images = foreground_images is not None and len(foreground_images) > 0
@@ -73,55 +124,204 @@ class ycImageAnimatePath:
         if not use_batch_images and not use_single_image:
             raise ValueError("必须提供至少一个前景图：foreground_image 或 foreground_images")
         
-        # 解析路径数据（使用新的PathDataParser，支持新旧格式）
-        parsed_data = PathDataParser.parse(path_data)
-        keyframes = PathDataParser.extract_keyframes_for_animation(parsed_data)
-        
-        # 解析效果数据
-        effects_dict = self._parse_effects_data(effects_data)
+        profiler = create_profiler(profile)
+        transfers = TransferLog()
+        device = background_image.device
         
-        # 解析关键帧图片映射（仅在批次模式下使用）
-        keyframe_image_map_dict = {}
-        if use_batch_images:
-            keyframe_image_map_dict = self._parse_keyframe_image_map(keyframe_image_map)
+        with profiler.stage("parse"):
+            # 解析路径数据（使用新的PathDataParser，支持新旧格式）
+            parsed_data = PathDataParser.parse(path_data)
+            keyframes = PathDataParser.extract_keyframes_for_animation(parsed_data)
+            
+            # 解析效果数据（已连接效果表时直接使用，不再解析字符串）
+            if effects_table is not None:
+                effects_dict = effects_table
+            else:
+                effects_dict = self.parse_effects_data(effects_data)
+            
+            # 解析关键帧图片映射（仅在批次模式下使用）
+            keyframe_image_map_dict = {}
+            if use_batch_images:
+                keyframe_image_map_dict = self.parse_keyframe_image_map(keyframe_image_map)
+        
+        # 渲染前预估峰值内存，并按预算选择输出模式
+        with profiler.stage("plan"):
+            memory_plan = self._plan_memory(
+                total_frames, canvas_width, canvas_height, foreground_scale, effects_dict,
+                foreground_images if use_batch_images else foreground_image,
+                normalize_image_size if use_batch_images else "original", custom_image_size,
+                memory_budget_mb, memory_policy, output_dtype
+            )
+        output_dtype = torch.float16 if memory_plan["output_dtype"] == "float16" else torch.float32
+        estimated_memory_mb = int(math.ceil(memory_plan["estimated_bytes"] / 1048576))
+        profiler.note("memory_plan", memory_plan)
+        
+        # 磁盘缓存查询
+        render_cache = None
+        cache_key = None
+        if disk_cache and output_layer:
+            # 磁盘缓存只保存帧和遮罩，图层需要重新渲染
+            print("Disk cache skipped: output_layer requires rendering the sprite tiles")
+        elif disk_cache:
+            with profiler.stage("cache_lookup"):
+                render_cache = get_render_cache(disk_cache_dir, disk_cache_max_mb * 1024 * 1024)
+                cache_key = render_cache.make_key(
+                    transfers=transfers,
+                    path_data=path_data, effects_data=effects_data, effects_table=effects_table,
+                    keyframe_image_map=keyframe_image_map,
+                    background_image=background_image,
+                    foreground_image=None if use_batch_images else foreground_image,
+                    foreground_images=foreground_images if use_batch_images else None,
+                    foreground_mask=None if use_batch_images else foreground_mask,
+                    foreground_masks=foreground_masks if use_batch_images else None,
+                    canvas_width=canvas_width, canvas_height=canvas_height, total_frames=total_frames,
+                    foreground_scale=foreground_scale, center_anchor=center_anchor, smooth_path=smooth_path,
+                    spline_tolerance=spline_tolerance,
+                    normalize_image_size=normalize_image_size, custom_image_size=custom_image_size,
+                    output_dtype=memory_plan["output_dtype"],
+                    quality=quality, draft_scale=draft_scale, draft_filter=draft_filter,
+                    draft_frame_step=draft_frame_step, draft_upscale=draft_upscale,
+                    end_behavior=end_behavior,
+                )
+                cached = render_cache.get(cache_key)
+            print(render_cache.format_stats())
+            if cached is not None:
+                frames_np, masks_np = cached
+                profiler.note("disk_cache", "hit")
+                frames = transfers.to_device(torch.from_numpy(frames_np), device, "animated_frames")
+                masks = transfers.to_device(torch.from_numpy(masks_np), device, "animated_masks")
+                profiler.note("device_transfers", transfers.summary())
+                return (frames, masks, self._finish_report(profiler), estimated_memory_mb, None)
+            profiler.note("disk_cache", "miss")
         
         if len(keyframes) == 0:
             print("Warning: No keyframes found in path data, returning static image")
-            # 如果没有关键帧，返回静态图像
-            return (background_image,)
+            # 如果没有关键帧，返回静态图像和空遮罩
+            empty_masks = torch.zeros(background_image.shape[:3], dtype=torch.float32, device=device)
+            empty_layer = None
+            if output_layer:
+                empty_layer = AnimatedLayer(total_frames, canvas_width, canvas_height)
+            return (background_image, empty_masks, self._finish_report(profiler), estimated_memory_mb, empty_layer)
+        
+        # 草稿模式：画布和前景图按代理比例缩小，使用快速滤波
+        draft = self._plan_draft(
+            quality, canvas_width, canvas_height, draft_scale, draft_filter, draft_frame_step, draft_upscale
+        )
+        if draft is not None:
+            profiler.note("quality", draft["report"])
+            print(f"Draft render: {draft['width']}x{draft['height']} proxy, every {draft['frame_step']} frame(s), "
+                  f"{'upscaled to canvas' if draft['upscale'] else 'proxy resolution output'}")
+        render_width = draft["width"] if draft is not None else canvas_width
+        render_height = draft["height"] if draft is not None else canvas_height
+        
+        with profiler.stage("prepare"):
+            assets = self._prepare_assets(
+                background_image, render_width, render_height,
+                foreground_scale * draft["scale"] if draft is not None else foreground_scale,
+                foreground_image, foreground_images, foreground_mask, foreground_masks,
+                normalize_image_size, custom_image_size, use_batch_images,
+                resample=draft["resample"] if draft is not None else Image.LANCZOS, transfers=transfers
+            )
+        
+        with profiler.stage("timeline"):
+            # 预先计算整条时间轴（每帧位置、效果、前景图索引），再据此检测静止帧
+            timeline = self.build_render_timeline(
+                keyframes, effects_dict, total_frames, smooth_path,
+                keyframe_image_map_dict if use_batch_images else None, spline_tolerance, end_behavior
+            )
+            frame_sources = self._plan_hold_frames(timeline)
+            if any('cycle_source' in entry for entry in timeline):
+                profiler.note("end_behavior", {
+                    "mode": end_behavior,
+                    "start": keyframes[0]['frame'],
+                    "period": keyframes[-1]['frame'] - keyframes[0]['frame'],
+                })
+            if draft is not None:
+                # 位置换算到代理画布；跳帧的帧复制前一个渲染帧
+                timeline = self._scale_timeline(timeline, draft["scale"])
+                frame_sources = self._plan_frame_step(frame_sources, draft["frame_step"])
+        
+        # 草稿模式放大输出时，输出批次为画布尺寸，每个渲染帧合成后再放大
+        output_size = (render_width, render_height)
+        if draft is not None and draft["upscale"]:
+            output_size = (canvas_width, canvas_height)
+        
+        # 预分配输出批次，避免逐帧列表 + torch.cat 带来的双倍内存
+        # 批次直接分配在输入所在的设备上：每帧以8位数据上传一次，归一化和静止帧复制都在设备上进行
+        output_batch = torch.empty((total_frames, output_size[1], output_size[0], 3), dtype=output_dtype, device=device)
+        mask_batch = torch.empty((total_frames, output_size[1], output_size[0]), dtype=output_dtype, device=device)
+        profiler.alloc(output_batch.nbytes + mask_batch.nbytes)
+        
+        # 动画图层的坐标与渲染画布一致（草稿模式为代理画布）
+        layer = AnimatedLayer(total_frames, render_width, render_height) if output_layer else None
+        
+        # 生成所有帧（静止帧只渲染每段的第一帧）
+        self._render_frames(
+            assets, timeline, frame_sources, output_batch, mask_batch,
+            render_width, render_height, center_anchor, keyframe_image_map_dict, profiler, output_size, layer,
+            transfers
+        )
+        
+        with profiler.stage("hold_fill"):
+            # 静止帧：整段一次性复制
+            self._fill_hold_frames(output_batch, mask_batch, frame_sources)
+            if layer is not None:
+                layer.fill_from_sources(frame_sources)
+                profiler.note("animated_layer", layer.describe())
+        profiler.count("frames_total", total_frames)
+        profiler.count("frames_copied", sum(1 for i, src in enumerate(frame_sources) if src != i))
+        
+        # 写入磁盘缓存
+        if render_cache is not None:
+            with profiler.stage("cache_write"):
+                render_cache.put(
+                    cache_key,
+                    transfers.to_host(output_batch, "cache_write").numpy(),
+                    transfers.to_host(mask_batch, "cache_write").numpy()
+                )
+        
+        transfers.report("ycImageAnimatePath")
+        profiler.note("device_transfers", transfers.summary())
+        return (output_batch, mask_batch, self._finish_report(profiler), estimated_memory_mb, layer)
+    
+    def _prepare_assets(self, background_image, canvas_width, canvas_height, foreground_scale,
+                        foreground_image, foreground_images, foreground_mask, foreground_masks,
+                        normalize_image_size, custom_image_size, use_batch_images, resample=Image.LANCZOS,
+                        transfers=None):
+        """
+        准备渲染所需的共享素材（与路径/效果无关，可在多次渲染间复用）
+        返回 {'bg_pil', 'use_batch_images', 'foreground_image_list', 'original_fg_pil', 'foreground_scale', 'resample'}
+        resample 为背景/前景缩放使用的滤波（草稿模式使用快速滤波）
+        素材在主机上用PIL处理：输入在加速器上时，在这里一次性拷贝到主机（记录到 transfers），渲染循环中不再有任何传输
+        """
+        if transfers is None:
+            transfers = TransferLog()
+        background_image = transfers.to_host(background_image[:1], "background_image")
+        if use_batch_images:
+            foreground_images = transfers.to_host(foreground_images, "foreground_images")
+            foreground_masks = transfers.to_host(foreground_masks, "foreground_masks")
+        else:
+            foreground_image = transfers.to_host(foreground_image[:1], "foreground_image")
+            foreground_mask = transfers.to_host(foreground_mask, "foreground_mask")
         
         # 转换为PIL图像进行处理
         bg_pil = self._tensor_to_pil(background_image[0])
         
         # 处理前景图
         foreground_image_list = None
-        foreground_mask_list = None
         original_fg_pil = None  # 单个前景图模式使用
         
         if use_batch_images:
-            # 转换批次前景图为PIL图像列表
-            foreground_image_list = []
-            for i in range(len(foreground_images)):
-                fg_pil_item = self._tensor_to_pil(foreground_images[i])
-                foreground_image_list.append(fg_pil_item)
-            
-            # 处理批次遮罩（如果提供）
+            # 批量应用遮罩（一次张量运算，只缩放尺寸不一致的遮罩）
+            fg_batch = foreground_images
             if foreground_masks is not None and len(foreground_masks) > 0:
-                foreground_mask_list = []
-                for i in range(len(foreground_masks)):
-                    mask_tensor = foreground_masks[i]
-                    foreground_mask_list.append(mask_tensor)
+                fg_batch = self._apply_mask_batch(foreground_images, foreground_masks)
             
-            # 统一尺寸处理
-            foreground_image_list, foreground_mask_list = self._normalize_images_to_same_size(
-                foreground_image_list, foreground_mask_list, normalize_image_size, custom_image_size
+            # 统一尺寸处理（张量批量路径；遮罩已写入alpha通道，随图片一起缩放/填充）
+            fg_batch, _ = self._normalize_images_to_same_size(
+                fg_batch, None, normalize_image_size, custom_image_size
             )
-            
-            # 应用遮罩到每个前景图
-            if foreground_mask_list is not None:
-                for i in range(len(foreground_image_list)):
-                    if i < len(foreground_mask_list):
-                        foreground_image_list[i] = self._apply_mask(foreground_image_list[i], foreground_mask_list[i])
+            foreground_image_list = self._batch_to_pil_list(fg_batch)
         else:
             # 使用单个前景图模式
             fg_pil = self._tensor_to_pil(foreground_image[0])
@@ -137,48 +337,87 @@ class ycImageAnimatePath:
             if foreground_scale != 1.0:
                 new_width = int(fg_pil.width * foreground_scale)
                 new_height = int(fg_pil.height * foreground_scale)
-                fg_pil = fg_pil.resize((new_width, new_height), Image.LANCZOS)
+                fg_pil = fg_pil.resize((new_width, new_height), resample)
                 original_fg_pil = fg_pil.copy()
         
         # 确保背景图尺寸匹配画布
         if bg_pil.size != (canvas_width, canvas_height):
-            bg_pil = bg_pil.resize((canvas_width, canvas_height), Image.LANCZOS)
-        
-        # 生成所有帧
-        output_frames = []
-        output_masks = []
-        for frame_idx in range(total_frames):
-            # 计算当前帧的位置（使用方案3A：样条平滑 + 路径长度插值）
-            position, path_kf_info = self._interpolate_position(keyframes, frame_idx, total_frames, smooth_path)
+            bg_pil = bg_pil.resize((canvas_width, canvas_height), resample)
+        
+        return {
+            'bg_pil': bg_pil,
+            'use_batch_images': use_batch_images,
+            'foreground_image_list': foreground_image_list,
+            'original_fg_pil': original_fg_pil,
+            'foreground_scale': foreground_scale,
+            'resample': resample,
+        }
+    
+    def _render_frames(self, assets, timeline, frame_sources, output_batch, mask_batch,
+                       canvas_width, canvas_height, center_anchor, keyframe_image_map_dict, profiler,
+                       output_size=None, layer=None, transfers=None):
+        """
+        渲染时间轴中需要实际渲染的帧（frame_sources[i] == i），写入输出批次
+        output_batch/mask_batch 可以是更大批次的切片视图（多个动画共用同一个批次）；
+        批次不在CPU上时，每帧合成结果以8位数据上传一次（记录到 transfers）
+        output_size 与画布尺寸不同时（草稿模式），每帧合成后放大到 output_size 再写入
+        layer 不为 None 时记录每帧的前景图块和放置坐标（相同效果的图块只变换一次）
+        """
+        bg_pil = assets['bg_pil']
+        resample = assets.get('resample', Image.LANCZOS)
+        if output_size == (canvas_width, canvas_height):
+            output_size = None
+        if transfers is None:
+            transfers = TransferLog()
+        bg_frame = None  # 仅背景的帧（uint8，已在输出设备上），第一次遇到不可见帧时生成
+        frame_bytes = canvas_width * canvas_height * 5  # 每帧临时RGBA画布 + L遮罩
+        
+        for frame_idx in range(len(timeline)):
+            if frame_sources[frame_idx] != frame_idx:
+                continue
             
-            # 计算当前帧的效果参数（基于路径关键帧）
-            effects = self._interpolate_effects_based_on_path(
-                effects_dict, frame_idx, total_frames, keyframes, path_kf_info
-            )
+            entry = timeline[frame_idx]
+            position = entry['position']
+            effects = entry['effects']
+            
+            # 像素处理之前先用解析包围盒判断可见性：完全在画布外或完全透明的帧只输出背景和空遮罩
+            if position is None or not self._is_sprite_visible(
+                assets, entry, canvas_width, canvas_height, center_anchor
+            ):
+                if bg_frame is None:
+                    bg_frame = self._background_frame(bg_pil, output_size, resample, output_batch.device, transfers)
+                with profiler.stage("convert"):
+                    self._write_background_frame(output_batch, mask_batch, frame_idx, bg_frame)
+                profiler.count("frames_invisible")
+                profiler.count("frames_rendered")
+                continue
             
             # 选择当前帧使用的前景图
-            if use_batch_images:
-                # 根据关键帧图片映射选择前景图
-                current_fg_pil = self._get_foreground_image_for_frame(
-                    frame_idx, keyframe_image_map_dict, foreground_image_list, foreground_scale
+            if assets['use_batch_images']:
+                # 时间轴中已按关键帧图片映射确定前景图索引（与帧号无关，时间轴切片也能直接渲染）
+                current_fg_pil = self._get_foreground_image_by_index(
+                    entry['fg_index'], assets['foreground_image_list'], assets['foreground_scale'], resample
                 )
             else:
                 # 使用单个前景图
-                current_fg_pil = original_fg_pil.copy()
+                current_fg_pil = assets['original_fg_pil'].copy()
             
-            # 调试输出：打印关键帧和效果信息（仅在特定帧打印，避免输出过多）
-            # if frame_idx in [0, 27, 30, 32, 35, 50, 59]:
-            #     print(f"Frame {frame_idx}: path_kf={path_kf_info.get('prev_kf_frame')}->{path_kf_info.get('next_kf_frame')}, "
-            #           f"t={path_kf_info.get('t', 0):.2f}, rotation={effects['rotation']:.1f}")
+            profiler.alloc(frame_bytes)
+            # 图块键：效果 + 前景图索引（与位置无关）
+            tile_key = entry['key'][1:]
+            tile_index = layer.tile_for_key(tile_key) if layer is not None else None
+            with profiler.stage("effects"):
+                if tile_index is not None:
+                    # 图层中已有相同效果的图块，直接复用
+                    fg_rgba = Image.fromarray(layer.tiles[tile_index], 'RGBA')
+                else:
+                    # 预先变换前景图（缩放、旋转、翻转、透明度）
+                    fg_rgba = self._transform_fg_with_effects(current_fg_pil, effects, resample)
+                    if layer is not None:
+                        tile_index = layer.add_tile(tile_key, fg_rgba)
+            profiler.count("sprite_pixels", fg_rgba.width * fg_rgba.height)
             
-            if position is None:
-                # 如果无法计算位置，使用背景图和空遮罩
-                frame_pil = bg_pil.copy()
-                mask_pil = Image.new('L', (canvas_width, canvas_height), 0)
-            else:
-                # 预先变换前景图（缩放、旋转、翻转、透明度）
-                fg_rgba = self._transform_fg_with_effects(current_fg_pil, effects)
-                
+            with profiler.stage("composite"):
                 # 计算粘贴位置
                 if center_anchor:
                     paste_x = int(position['x'] - fg_rgba.width / 2)
@@ -187,410 +426,282 @@ class ycImageAnimatePath:
                     paste_x = int(position['x'])
                     paste_y = int(position['y'])
                 
-                # 合成图像
-                frame_pil = bg_pil.copy().convert("RGBA")
-                frame_pil.paste(fg_rgba, (paste_x, paste_y), fg_rgba)
-                frame_pil = frame_pil.convert("RGB")
+                if layer is not None:
+                    exact_x = position['x'] - fg_rgba.width / 2 if center_anchor else position['x']
+                    exact_y = position['y'] - fg_rgba.height / 2 if center_anchor else position['y']
+                    layer.place(frame_idx, tile_index, exact_x, exact_y, paste_x, paste_y)
                 
-                # 生成遮罩（白色可见）
-                mask_pil = Image.new('L', (canvas_width, canvas_height), 0)
-                fg_alpha = fg_rgba.split()[3]
-                mask_pil.paste(fg_alpha, (paste_x, paste_y))
+                # 显式裁剪到画布范围内，粘贴坐标始终非负
+                left = max(0, -paste_x)
+                top = max(0, -paste_y)
+                right = min(fg_rgba.width, canvas_width - paste_x)
+                bottom = min(fg_rgba.height, canvas_height - paste_y)
+                if right <= left or bottom <= top:
+                    frame_pil = None
+                else:
+                    if (left, top, right, bottom) != (0, 0, fg_rgba.width, fg_rgba.height):
+                        fg_rgba = fg_rgba.crop((left, top, right, bottom))
+                    paste_x += left
+                    paste_y += top
+                    
+                    # 合成图像
+                    frame_pil = bg_pil.copy().convert("RGBA")
+                    frame_pil.paste(fg_rgba, (paste_x, paste_y), fg_rgba)
+                    frame_pil = frame_pil.convert("RGB")
+                    
+                    # 生成遮罩（白色可见）
+                    mask_pil = Image.new('L', (canvas_width, canvas_height), 0)
+                    fg_alpha = fg_rgba.split()[3]
+                    mask_pil.paste(fg_alpha, (paste_x, paste_y))
             
-            # 转换为tensor
-            frame_tensor = self._pil_to_tensor(frame_pil)
-            mask_tensor = torch.from_numpy(np.array(mask_pil).astype(np.float32) / 255.0).unsqueeze(0)
-            output_frames.append(frame_tensor)
-            output_masks.append(mask_tensor)
-        
-        # 堆叠成批次
-        output_batch = torch.cat(output_frames, dim=0)
-        mask_batch = torch.cat(output_masks, dim=0)
-        return (output_batch, mask_batch)
+            if frame_pil is not None and output_size is not None:
+                with profiler.stage("upscale"):
+                    frame_pil = frame_pil.resize(output_size, resample)
+                    mask_pil = mask_pil.resize(output_size, resample)
+            
+            with profiler.stage("convert"):
+                if frame_pil is None:
+                    # 包围盒估计偏保守，实际变换后才确定完全在画布外
+                    if layer is not None:
+                        layer.hide(frame_idx)
+                    if bg_frame is None:
+                        bg_frame = self._background_frame(bg_pil, output_size, resample, output_batch.device, transfers)
+                    self._write_background_frame(output_batch, mask_batch, frame_idx, bg_frame)
+                    profiler.count("frames_invisible")
+                else:
+                    self._write_frame(output_batch, mask_batch, frame_idx, frame_pil, mask_pil, transfers)
+                    profiler.count("composited_pixels", canvas_width * canvas_height)
+            profiler.free(frame_bytes)
+            profiler.count("frames_rendered")
+    
+    def _background_frame(self, bg_pil, output_size, resample, device, transfers):
+        """只有背景的帧（uint8 RGB张量，上传到 device 一次），需要时放大到 output_size"""
+        bg_rgb = bg_pil.convert('RGB')
+        if output_size is not None:
+            bg_rgb = bg_rgb.resize(output_size, resample)
+        return transfers.to_device(torch.from_numpy(np.array(bg_rgb)), device, "background_frame")
     
-    def _parse_path_data(self, path_data):
+    def _is_sprite_visible(self, assets, entry, canvas_width, canvas_height, center_anchor):
         """
-        解析路径数据字符串（向后兼容方法）
-        注意：新代码应直接使用 PathDataParser.parse()
+        根据位置、缩放、旋转解析计算前景图包围盒（留出取整余量），判断该帧前景是否可能可见
+        透明度量化后为0（所有像素alpha为0）时不可见
         """
-        # 使用新的PathDataParser解析
-        parsed_data = PathDataParser.parse(path_data)
-        return PathDataParser.extract_keyframes_for_animation(parsed_data)
+        effects = entry['effects']
+        if int(255 * effects['opacity']) <= 0:
+            return False
+        
+        # 前景图基础尺寸（批次模式按该帧使用的图片）
+        if assets['use_batch_images']:
+            image_list = assets['foreground_image_list']
+            fg_index = entry['fg_index']
+            if fg_index < 0 or fg_index >= len(image_list):
+                fg_index = 0
+            width, height = image_list[fg_index].size
+            if assets['foreground_scale'] != 1.0:
+                width = int(width * assets['foreground_scale'])
+                height = int(height * assets['foreground_scale'])
+        else:
+            width, height = assets['original_fg_pil'].size
+        
+        # 经过 _apply_effects 缩放和旋转后的尺寸（旋转尺寸与 frame_transforms 共用 rotated_size）
+        if effects['scale_x'] != 1.0 or effects['scale_y'] != 1.0:
+            new_width = int(width * effects['scale_x'])
+            new_height = int(height * effects['scale_y'])
+            if new_width > 0 and new_height > 0:
+                width, height = new_width, new_height
+        if abs(effects['rotation']) > 0.01:
+            width, height = self.rotated_size(width, height, effects['rotation'])
+        
+        # 粘贴坐标取整误差留出余量
+        margin = 2
+        x = entry['position']['x']
+        y = entry['position']['y']
+        if center_anchor:
+            x0, x1 = x - width / 2 - margin, x + width / 2 + margin
+            y0, y1 = y - height / 2 - margin, y + height / 2 + margin
+        else:
+            x0, x1 = x - margin, x + width + margin
+            y0, y1 = y - margin, y + height + margin
+        return x1 > 0 and y1 > 0 and x0 < canvas_width and y0 < canvas_height
+    
+    def _plan_draft(self, quality, canvas_width, canvas_height, draft_scale, draft_filter, draft_frame_step,
+                    draft_upscale):
+        """生成草稿渲染参数；quality=final 时返回 None"""
+        if quality != "draft":
+            return None
+        scale = max(0.01, min(1.0, float(draft_scale)))
+        width = max(1, int(round(canvas_width * scale)))
+        height = max(1, int(round(canvas_height * scale)))
+        frame_step = max(1, int(draft_frame_step))
+        resample = Image.NEAREST if draft_filter == "nearest" else Image.BILINEAR
+        return {
+            'scale': scale,
+            'width': width,
+            'height': height,
+            'frame_step': frame_step,
+            'resample': resample,
+            'upscale': bool(draft_upscale),
+            'report': {
+                'mode': "draft",
+                'scale': scale,
+                'render_size': [width, height],
+                'filter': draft_filter,
+                'frame_step': frame_step,
+                'upscaled': bool(draft_upscale),
+            },
+        }
+    
+    def _scale_timeline(self, timeline, scale):
+        """时间轴位置换算到代理画布（只缩放坐标，轨迹本身不变）"""
+        scaled = []
+        for entry in timeline:
+            position = entry['position']
+            if position is not None:
+                position = {'x': position['x'] * scale, 'y': position['y'] * scale}
+            scaled.append(dict(entry, position=position))
+        return scaled
     
-    def _catmull_rom_interpolate(self, p0, p1, p2, p3, t):
+    def _plan_frame_step(self, frame_sources, frame_step):
         """
-        Catmull-Rom样条插值
-        p0, p1, p2, p3: 四个控制点
-        t: 插值参数 (0-1)
-        返回插值点
+        跳帧：每 frame_step 帧只渲染一帧，其余帧复制所在步的第一帧
+        来源帧按新的计划传递解析（来源帧本身被跳过时改为复制它的来源），保证每个来源帧都会被渲染
         """
-        # Catmull-Rom样条公式
-        t2 = t * t
-        t3 = t2 * t
-        
-        x = 0.5 * (
-            (2 * p1['x']) +
-            (-p0['x'] + p2['x']) * t +
-            (2 * p0['x'] - 5 * p1['x'] + 4 * p2['x'] - p3['x']) * t2 +
-            (-p0['x'] + 3 * p1['x'] - 3 * p2['x'] + p3['x']) * t3
-        )
-        
-        y = 0.5 * (
-            (2 * p1['y']) +
-            (-p0['y'] + p2['y']) * t +
-            (2 * p0['y'] - 5 * p1['y'] + 4 * p2['y'] - p3['y']) * t2 +
-            (-p0['y'] + 3 * p1['y'] - 3 * p2['y'] + p3['y']) * t3
+        if frame_step <= 1:
+            return frame_sources
+        stepped = []
+        for frame_idx in range(len(frame_sources)):
+            source = frame_sources[frame_idx - frame_idx % frame_step]
+            stepped.append(frame_idx if source == frame_idx else stepped[source])
+        return stepped
+    
+    def _plan_memory(self, total_frames, canvas_width, canvas_height, foreground_scale, effects_dict,
+                     foreground_tensor, normalize_image_size, custom_image_size,
+                     memory_budget_mb, memory_policy, output_dtype="float32"):
+        """根据输入张量尺寸（不做任何转换）预估内存并生成渲染计划"""
+        # 前景图尺寸（ComfyUI IMAGE 格式：(B, H, W, C)）
+        sprite_count = int(foreground_tensor.shape[0]) if len(foreground_tensor.shape) == 4 else 1
+        sprite_h = int(foreground_tensor.shape[-3])
+        sprite_w = int(foreground_tensor.shape[-2])
+        if normalize_image_size == "custom":
+            sprite_w = sprite_h = int(custom_image_size)
+        sprite_sizes = [(sprite_w, sprite_h)] * sprite_count
+        
+        transformed_size = RenderMemoryPlanner.max_sprite_size(sprite_sizes, foreground_scale, effects_dict)
+        return RenderMemoryPlanner.plan(
+            total_frames, canvas_width, canvas_height, sprite_sizes, transformed_size,
+            budget_bytes=int(memory_budget_mb) * 1048576, policy=memory_policy, output_dtype=output_dtype
         )
-        
-        return {'x': x, 'y': y}
     
-    def _smooth_path_with_spline(self, points, samples_per_segment=10):
+    def _finish_report(self, profiler):
+        """生成性能报告：未启用时返回空字符串，启用时同时打印一行日志"""
+        if not profiler.enabled:
+            return ""
+        report = profiler.to_json()
+        print(f"[ycImageAnimatePath profile] {report}")
+        return report
+    
+    def _plan_hold_frames(self, timeline):
         """
-        使用Catmull-Rom样条平滑路径点
-        points: 原始路径点列表
-        samples_per_segment: 每两个原始点之间插入的平滑点数量
-        返回平滑后的路径点列表
+        静止帧检测：
+        渲染键与前一帧相同的连续帧组成一段，整段只渲染第一帧
+        循环播放时，周期之后的帧（带 'cycle_source'）复制周期内对应帧的来源帧
+        返回 frame_sources 列表，frame_sources[i] 为第 i 帧实际渲染的来源帧
         """
-        if len(points) < 2:
-            return points
-        
-        if len(points) == 2:
-            # 只有两个点，直接返回
-            return points
-        
-        smoothed = []
-        
-        # 对于每两个相邻点之间的线段进行样条插值
-        for i in range(len(points) - 1):
-            # 获取四个控制点（用于Catmull-Rom样条）
-            # 使用边界处理：如果超出范围，使用端点
-            p0 = points[max(0, i - 1)]
-            p1 = points[i]
-            p2 = points[i + 1]
-            p3 = points[min(len(points) - 1, i + 2)]
-            
-            # 在p1和p2之间插入平滑点
-            for j in range(samples_per_segment):
-                t = j / samples_per_segment
-                point = self._catmull_rom_interpolate(p0, p1, p2, p3, t)
-                smoothed.append(point)
-        
-        # 添加最后一个点
-        smoothed.append(points[-1])
-        
-        return smoothed
+        frame_sources = []
+        for frame_idx, entry in enumerate(timeline):
+            if 'cycle_source' in entry:
+                frame_sources.append(frame_sources[entry['cycle_source']])
+            elif frame_idx > 0 and entry['key'] == timeline[frame_idx - 1]['key']:
+                frame_sources.append(frame_sources[frame_idx - 1])
+            else:
+                frame_sources.append(frame_idx)
+        return frame_sources
     
-    def _calculate_path_length(self, points):
+    def _iter_copy_runs(self, frame_sources):
         """
-        计算路径总长度
-        points: 路径点列表
-        返回总长度
+        将 frame_sources 中的复制帧合并为连续区间
+        生成 (start, end, source, step)：[start, end) 区间内第 k 帧复制自 source + step * k 帧
+        step 为 0（静止帧）、1（循环播放）或 -1（往返播放的反向段）
         """
-        if len(points) < 2:
-            return 0.0
-        
-        total_length = 0.0
-        for i in range(len(points) - 1):
-            dx = points[i + 1]['x'] - points[i]['x']
-            dy = points[i + 1]['y'] - points[i]['y']
-            total_length += math.sqrt(dx * dx + dy * dy)
-        
-        return total_length
+        start = None
+        step = 0
+        for frame_idx, source in enumerate(frame_sources):
+            if start is not None and source != frame_idx:
+                delta = source - frame_sources[frame_idx - 1]
+                if frame_idx - start == 1 and delta in (0, 1, -1):
+                    step = delta
+                    continue
+                if delta == step:
+                    continue
+            if start is not None:
+                yield start, frame_idx, frame_sources[start], step
+                start = None
+            if source != frame_idx:
+                start = frame_idx
+                step = 0
+        if start is not None:
+            yield start, len(frame_sources), frame_sources[start], step
     
-    def _interpolate_along_path_by_length(self, prev_points, next_points, t):
+    def _fill_hold_frames(self, output_batch, mask_batch, frame_sources):
         """
-        方案A：路径长度归一化插值
-        在prev_points和next_points组成的路径上，根据插值比例t找到对应位置
-        t: 插值比例 (0-1)
-        返回路径上的点坐标
+        填充复制帧：静止帧一次批量复制（广播），循环段一次切片复制，反向段逐帧按索引复制
+        来源帧必须是渲染帧（frame_sources[source] == source）；来源区间与复制区间重叠时先复制一份再写入
         """
-        # 连接两个关键帧的路径点
-        if len(prev_points) == 0 and len(next_points) == 0:
-            return None
-        
-        if len(prev_points) == 0:
-            full_path = next_points
-        elif len(next_points) == 0:
-            full_path = prev_points
-        else:
-            # 连接路径：prev_points + next_points
-            # 如果prev_points的最后一个点和next_points的第一个点相同，去重
-            if (len(prev_points) > 0 and len(next_points) > 0 and
-                abs(prev_points[-1]['x'] - next_points[0]['x']) < 0.01 and
-                abs(prev_points[-1]['y'] - next_points[0]['y']) < 0.01):
-                # 去重：只保留一个点
-                full_path = prev_points + next_points[1:]
+        assert all(frame_sources[source] == source for source in frame_sources), \
+            "frame_sources 中的来源帧必须是渲染帧"
+        for start, end, source, step in self._iter_copy_runs(frame_sources):
+            if step == 0:
+                frames, masks = output_batch[source], mask_batch[source]
+                if start <= source < end:
+                    frames, masks = frames.clone(), masks.clone()
+            elif step == 1:
+                frames = output_batch[source:source + end - start]
+                masks = mask_batch[source:source + end - start]
+                if source < end and start < source + end - start:
+                    frames, masks = frames.clone(), masks.clone()
             else:
-                full_path = prev_points + next_points
-        
-        if len(full_path) < 2:
-            return full_path[0] if full_path else None
-        
-        # 计算路径总长度
-        total_length = self._calculate_path_length(full_path)
-        
-        if total_length == 0:
-            return full_path[0]
-        
-        # 根据t计算目标长度
-        target_length = total_length * t
-        
-        # 沿着路径找到对应位置
-        current_length = 0.0
-        for i in range(len(full_path) - 1):
-            dx = full_path[i + 1]['x'] - full_path[i]['x']
-            dy = full_path[i + 1]['y'] - full_path[i]['y']
-            segment_length = math.sqrt(dx * dx + dy * dy)
-            
-            if current_length + segment_length >= target_length:
-                # 在这个线段上插值
-                if segment_length > 0:
-                    local_t = (target_length - current_length) / segment_length
-                else:
-                    local_t = 0.0
-                
-                x = full_path[i]['x'] * (1 - local_t) + full_path[i + 1]['x'] * local_t
-                y = full_path[i]['y'] * (1 - local_t) + full_path[i + 1]['y'] * local_t
-                return {'x': x, 'y': y}
-            
-            current_length += segment_length
-        
-        # 如果t=1.0，返回最后一个点
-        return full_path[-1]
+                for offset in range(end - start):
+                    output_batch[start + offset] = output_batch[source - offset]
+                    mask_batch[start + offset] = mask_batch[source - offset]
+                continue
+            output_batch[start:end] = frames
+            mask_batch[start:end] = masks
     
-    def _interpolate_position(self, keyframes, current_frame, total_frames, smooth_path=True):
+    def _write_frame(self, output_batch, mask_batch, frame_idx, frame_pil, mask_pil, transfers):
         """
-        在关键帧之间插值计算当前位置
-        使用方案3A：样条平滑 + 路径长度归一化插值
-        返回路径上的一个点坐标 (x, y) 和路径关键帧信息
+        将渲染好的帧和遮罩写入预分配的输出批次
+        8位数据直接拷贝进输出类型（float32/float16）后原地归一化，不产生中间float32数组；
+        批次在加速器上时上传的是8位数据（记录到 transfers）
         """
-        path_kf_info = {
-            'prev_kf_frame': None,
-            'next_kf_frame': None,
-            't': 0.0
-        }
-        
-        if len(keyframes) == 0:
-            return None, path_kf_info
-        
-        # 如果只有一個關鍵幀，返回該關鍵幀的第一個點
-        if len(keyframes) == 1:
-            kf = keyframes[0]
-            if len(kf['points']) > 0:
-                path_kf_info['prev_kf_frame'] = kf['frame']
-                path_kf_info['next_kf_frame'] = kf['frame']
-                path_kf_info['t'] = 0.0
-                return kf['points'][0].copy(), path_kf_info
-            return None, path_kf_info
-        
-        # 找到当前帧所在的关键帧区间
-        prev_kf = None
-        next_kf = None
-        
-        for i, kf in enumerate(keyframes):
-            if kf['frame'] <= current_frame:
-                prev_kf = kf
-                if i + 1 < len(keyframes):
-                    next_kf = keyframes[i + 1]
-            else:
-                break
-        
-        # 如果当前帧在所有关键帧之前，使用第一个关键帧
-        if prev_kf is None:
-            prev_kf = keyframes[0]
-            if len(keyframes) > 1:
-                next_kf = keyframes[1]
-        
-        # 如果当前帧在所有关键帧之后，停留在最后一个关键帧的终点位置
-        # 不循环回到起点，避免动画循环
-        if next_kf is None:
-            # 使用最后一个关键帧，停留在终点位置
-            prev_kf = keyframes[-1]
-            next_kf = keyframes[-1]  # 设置为同一个关键帧，t=1.0时返回终点
-        
-        # 保存路径关键帧信息
-        path_kf_info['prev_kf_frame'] = prev_kf['frame']
-        path_kf_info['next_kf_frame'] = next_kf['frame']
-        
-        # 计算插值比例
-        if prev_kf['frame'] == next_kf['frame']:
-            t = 0.0
-        else:
-            t = (current_frame - prev_kf['frame']) / (next_kf['frame'] - prev_kf['frame'])
-        t = max(0.0, min(1.0, t))  # 限制在0-1之间
-        path_kf_info['t'] = t
-        
-        # 获取路径点
-        prev_points = prev_kf['points']
-        next_points = next_kf['points']
-        
-        if len(prev_points) == 0 and len(next_points) == 0:
-            return None, path_kf_info
-        
-        # 如果某个关键帧没有点，使用另一个关键帧的点
-        if len(prev_points) == 0:
-            if len(next_points) > 0:
-                return next_points[0].copy(), path_kf_info
-            return None, path_kf_info
-        
-        if len(next_points) == 0:
-            if len(prev_points) > 0:
-                # 如果只有prev_points，使用最后一个点（终点位置）
-                # 这样当超过最后一个关键帧时，会停留在终点，而不是循环
-                if smooth_path and len(prev_points) > 1:
-                    # 平滑路径后使用最后一个点（终点）
-                    smoothed = self._smooth_path_with_spline(prev_points)
-                    return smoothed[-1].copy(), path_kf_info
-                return prev_points[-1].copy(), path_kf_info
-            return None, path_kf_info
-        
-        # 检查两个关键帧是否使用相同的路径（路径点数量相同且起点终点相同）
-        # 如果使用相同路径，应该沿着同一个路径插值，根据关键帧编号的比例计算路径上的位置
-        same_path = False
-        if (len(prev_points) == len(next_points) and len(prev_points) > 0):
-            # 检查起点和终点是否相同（允许小的误差）
-            start_same = (abs(prev_points[0]['x'] - next_points[0]['x']) < 0.01 and
-                         abs(prev_points[0]['y'] - next_points[0]['y']) < 0.01)
-            end_same = (abs(prev_points[-1]['x'] - next_points[-1]['x']) < 0.01 and
-                       abs(prev_points[-1]['y'] - next_points[-1]['y']) < 0.01)
-            if start_same and end_same:
-                same_path = True
-        
-        # 方案3A：样条平滑 + 路径长度归一化插值
-        if smooth_path:
-            # 1. 路径平滑（样条插值）
-            prev_points_smooth = self._smooth_path_with_spline(prev_points) if len(prev_points) > 1 else prev_points
-            next_points_smooth = self._smooth_path_with_spline(next_points) if len(next_points) > 1 else next_points
-            
-            if same_path:
-                # 如果两个关键帧使用相同路径，沿着同一个路径插值
-                # 根据关键帧编号的比例计算路径上的位置
-                # 例如：KF0在起点(t=0)，KF25在25/45位置(t=25/45)，KF45在终点(t=1)
-                # 需要找到整个路径的起点和终点关键帧（所有关键帧中的最小和最大帧号）
-                prev_frame = prev_kf['frame']
-                next_frame = next_kf['frame']
-                
-                # 找到所有关键帧中的最小和最大帧号（整个路径的起点和终点）
-                first_frame = min(kf['frame'] for kf in keyframes)
-                last_frame = max(kf['frame'] for kf in keyframes)
-                
-                if prev_frame == next_frame:
-                    # 如果关键帧相同，根据关键帧在整个路径上的位置计算
-                    if last_frame > first_frame:
-                        path_t = (prev_frame - first_frame) / (last_frame - first_frame)
-                        path_t = max(0.0, min(1.0, path_t))
-                    else:
-                        path_t = 0.0
-                else:
-                    # 计算当前帧在整个路径上的位置
-                    if last_frame > first_frame:
-                        # 当前帧在整个路径上的位置
-                        current_frame_pos = prev_frame + (next_frame - prev_frame) * t
-                        # 转换为路径上的t值（0-1）
-                        path_t = (current_frame_pos - first_frame) / (last_frame - first_frame)
-                        path_t = max(0.0, min(1.0, path_t))  # 限制在0-1之间
-                    else:
-                        path_t = t
-                
-                # 沿着完整路径从起点到终点插值
-                position = self._interpolate_along_path_by_length(prev_points_smooth, [], path_t)
-            else:
-                # 2. 方案A：在平滑后的路径上按长度插值
-                position = self._interpolate_along_path_by_length(prev_points_smooth, next_points_smooth, t)
-        else:
-            # 向后兼容：使用原来的直线插值方法
-            if len(prev_points) > 0 and len(next_points) > 0:
-                if same_path:
-                    # 如果使用相同路径，沿着路径插值
-                    # 根据关键帧编号的比例计算路径上的位置
-                    prev_frame = prev_kf['frame']
-                    next_frame = next_kf['frame']
-                    
-                    # 找到所有关键帧中的最小和最大帧号（整个路径的起点和终点）
-                    first_frame = min(kf['frame'] for kf in keyframes)
-                    last_frame = max(kf['frame'] for kf in keyframes)
-                    
-                    if prev_frame == next_frame:
-                        # 如果关键帧相同，根据关键帧在整个路径上的位置计算
-                        if last_frame > first_frame:
-                            path_t = (prev_frame - first_frame) / (last_frame - first_frame)
-                            path_t = max(0.0, min(1.0, path_t))
-                        else:
-                            path_t = 0.0
-                    else:
-                        # 计算当前帧在整个路径上的位置
-                        if last_frame > first_frame:
-                            current_frame_pos = prev_frame + (next_frame - prev_frame) * t
-                            path_t = (current_frame_pos - first_frame) / (last_frame - first_frame)
-                            path_t = max(0.0, min(1.0, path_t))
-                        else:
-                            path_t = t
-                    
-                    position = self._interpolate_along_path_by_length(prev_points, [], path_t)
-                else:
-                    prev_pos = prev_points[0]
-                    next_pos = next_points[0]
-                    x = prev_pos['x'] * (1 - t) + next_pos['x'] * t
-                    y = prev_pos['y'] * (1 - t) + next_pos['y'] * t
-                    position = {'x': x, 'y': y}
-            elif len(prev_points) > 0:
-                position = prev_points[0].copy()
-            elif len(next_points) > 0:
-                position = next_points[0].copy()
-            else:
-                position = None
-        
-        if position is None:
-            return None, path_kf_info
-        
-        return position, path_kf_info
+        if frame_pil.mode != 'RGB':
+            frame_pil = frame_pil.convert('RGB')
+        frame_out = output_batch[frame_idx]
+        frame_out.copy_(transfers.to_device(torch.from_numpy(np.array(frame_pil)), frame_out.device, "frame_upload"))
+        frame_out.div_(255.0)
+        
+        mask_out = mask_batch[frame_idx]
+        mask_out.copy_(transfers.to_device(torch.from_numpy(np.array(mask_pil)), mask_out.device, "mask_upload"))
+        mask_out.div_(255.0)
     
-    def _parse_keyframe_image_map(self, keyframe_image_map):
-        """解析关键帧图片映射字符串"""
-        image_map_dict = {}
-        if not keyframe_image_map or not keyframe_image_map.strip():
-            return image_map_dict
-        
-        try:
-            # 格式：keyframe:image_index|keyframe:image_index
-            # 例如：0:0|10:1|20:2
-            map_strings = keyframe_image_map.split('|')
-            for map_str in map_strings:
-                if not map_str.strip():
-                    continue
-                
-                parts = map_str.split(':')
-                if len(parts) >= 2:
-                    keyframe = int(parts[0])
-                    image_index = int(parts[1])
-                    image_map_dict[keyframe] = image_index
-        except Exception as e:
-            print(f"Error parsing keyframe image map: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        return image_map_dict
+    def _write_background_frame(self, output_batch, mask_batch, frame_idx, bg_frame):
+        """写入只有背景的帧和空遮罩（前景不可见）"""
+        frame_out = output_batch[frame_idx]
+        frame_out.copy_(bg_frame)
+        frame_out.div_(255.0)
+        mask_batch[frame_idx].zero_()
     
-    def _get_foreground_image_for_frame(self, frame_idx, keyframe_image_map_dict, foreground_image_list, foreground_scale):
+    def _get_foreground_image_for_frame(self, frame_idx, keyframe_image_map_dict, foreground_image_list, foreground_scale,
+                                        resample=Image.LANCZOS):
         """
         根据当前帧获取对应的前景图
         如果关键帧有映射，使用映射的图片；否则使用最近的映射图片或第一个图片
         """
-        # 找到当前帧对应的关键帧图片索引
-        image_index = 0  # 默认使用第一个图片
-        
-        if len(keyframe_image_map_dict) > 0:
-            # 找到小于等于当前帧的最大关键帧
-            matching_keyframes = [kf for kf in keyframe_image_map_dict.keys() if kf <= frame_idx]
-            if matching_keyframes:
-                # 使用最大的关键帧对应的图片索引
-                max_keyframe = max(matching_keyframes)
-                image_index = keyframe_image_map_dict[max_keyframe]
-            else:
-                # 如果当前帧小于所有映射的关键帧，使用最小的关键帧对应的图片
-                min_keyframe = min(keyframe_image_map_dict.keys())
-                image_index = keyframe_image_map_dict[min_keyframe]
-        
+        image_index = self._get_foreground_index_for_frame(frame_idx, keyframe_image_map_dict)
+        return self._get_foreground_image_by_index(image_index, foreground_image_list, foreground_scale, resample)
+    
+    def _get_foreground_image_by_index(self, image_index, foreground_image_list, foreground_scale,
+                                       resample=Image.LANCZOS):
+        """按图片索引获取前景图（索引无效时使用第一个图片），并应用前景图缩放"""
         # 确保索引有效
         if image_index < 0 or image_index >= len(foreground_image_list):
             image_index = 0
@@ -602,7 +713,7 @@ class ycImageAnimatePath:
         if foreground_scale != 1.0:
             new_width = int(fg_pil.width * foreground_scale)
             new_height = int(fg_pil.height * foreground_scale)
-            fg_pil = fg_pil.resize((new_width, new_height), Image.LANCZOS)
+            fg_pil = fg_pil.resize((new_width, new_height), resample)
         
         return fg_pil
     
@@ -610,13 +721,18 @@ class ycImageAnimatePath:
         """
         将所有图片统一到相同尺寸
         mode: "max", "first", "custom", "original"
+        images 为PIL图像列表时逐张处理；为张量（(B, H, W, C) 或 (H, W, C) 列表）时走批量路径
         """
-        if not images or len(images) == 0:
+        if images is None or len(images) == 0:
             return images, masks
         
         if mode == "original":
             return images, masks  # 保持原始尺寸
         
+        # 张量输入：按源尺寸分组批量处理
+        if isinstance(images, torch.Tensor) or isinstance(images[0], torch.Tensor):
+            return self._normalize_image_batch(images, masks, mode, custom_size)
+        
         # 确定目标尺寸
         if mode == "max":
             target_width = max(img.width for img in images)
@@ -657,6 +773,82 @@ class ycImageAnimatePath:
         
         return normalized_images, normalized_masks
     
+    def _normalize_image_batch(self, images, masks, mode="max", custom_size=None):
+        """
+        批量等比缩放 + 居中透明填充（_resize_with_padding/_resize_mask_with_padding 的张量版本）
+        images: (B, H, W, C) 张量或 (H, W, C) 张量列表（尺寸可以不同）
+        masks: 可选，(M, h, w) 张量或张量列表，与对应图片一起缩放
+        相同源尺寸的图片（及其遮罩）作为一组，每组一次插值，直接写入预分配的 (B, H, W, 4) 缓冲区
+        返回 (RGBA张量 (B, H, W, 4), 遮罩张量 (min(B, M), H, W) 或 None)
+        """
+        image_list = list(images)
+        sizes = [(int(img.shape[0]), int(img.shape[1])) for img in image_list]
+        
+        # 确定目标尺寸（与PIL路径一致）
+        if mode == "first":
+            target_height, target_width = sizes[0]
+        elif mode == "custom":
+            target_width = target_height = custom_size
+        else:
+            target_height = max(h for h, _ in sizes)
+            target_width = max(w for _, w in sizes)
+        
+        batch_size = len(image_list)
+        mask_list = None
+        if masks is not None and len(masks) > 0:
+            mask_list = list(masks)[:batch_size]
+        mask_count = len(mask_list) if mask_list is not None else 0
+        
+        rgba_out = torch.zeros((batch_size, target_height, target_width, 4), dtype=torch.float32)
+        mask_out = torch.zeros((mask_count, target_height, target_width), dtype=torch.float32) if mask_count else None
+        
+        groups = {}
+        for i, size in enumerate(sizes):
+            groups.setdefault(size, []).append(i)
+        
+        for (height, width), indices in groups.items():
+            group = self._to_unit_float(torch.stack([image_list[i] for i in indices]))
+            channels = [group[..., :3]]
+            if group.shape[-1] >= 4:
+                channels.append(group[..., 3:4])
+            else:
+                channels.append(torch.ones_like(group[..., :1]))
+            
+            # 遮罩作为第5个通道，与图片在同一次插值中缩放
+            mask_indices = [i for i in indices if i < mask_count]
+            resized_masks = None
+            if mask_indices:
+                resized_masks = self._resize_masks_batch(
+                    [mask_list[i] for i in mask_indices], len(mask_indices), height, width
+                )
+            if resized_masks is None:
+                mask_indices = []
+            else:
+                masked_rows = [row for row, i in enumerate(indices) if i < mask_count]
+                group_masks = torch.zeros((len(indices), height, width), dtype=torch.float32)
+                group_masks[masked_rows] = resized_masks
+                channels.append(group_masks.unsqueeze(-1))
+            stacked = torch.cat(channels, dim=-1)
+            
+            # 计算缩放比例（保持宽高比）和居中偏移
+            scale = min(target_width / width, target_height / height)
+            new_width = int(width * scale)
+            new_height = int(height * scale)
+            if (new_width, new_height) != (width, height):
+                stacked = F.interpolate(
+                    stacked.permute(0, 3, 1, 2), size=(new_height, new_width),
+                    mode="bicubic", align_corners=False, antialias=True
+                ).permute(0, 2, 3, 1).clamp_(0.0, 1.0)
+            x_offset = (target_width - new_width) // 2
+            y_offset = (target_height - new_height) // 2
+            
+            rgba_out[indices, y_offset:y_offset + new_height, x_offset:x_offset + new_width] = stacked[..., :4]
+            if mask_indices:
+                mask_out[mask_indices, y_offset:y_offset + new_height, x_offset:x_offset + new_width] = \
+                    stacked[masked_rows, ..., 4]
+        
+        return rgba_out, mask_out
+    
     def _resize_with_padding(self, img, target_width, target_height):
         """调整图片尺寸，保持宽高比，透明填充"""
         # 如果已经是目标尺寸，直接返回
@@ -733,220 +925,9 @@ class ycImageAnimatePath:
         mask_array = np.array(canvas).astype(np.float32) / 255.0
         return torch.from_numpy(mask_array)
     
-    def _parse_effects_data(self, effects_data):
-        """解析效果数据字符串"""
-        effects_dict = {}
-        if not effects_data or not effects_data.strip():
-            return effects_dict
-        
-        try:
-            # 格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|keyframe:...
-            effect_strings = effects_data.split('|')
-            for eff_str in effect_strings:
-                if not eff_str.strip():
-                    continue
-                
-                parts = eff_str.split(':')
-                if len(parts) >= 2:
-                    keyframe = int(parts[0])
-                    params_str = ':'.join(parts[1:])
-                    params = params_str.split(',')
-                    
-                    if len(params) >= 6:
-                        effects_dict[keyframe] = {
-                            'scale_x': float(params[0]),
-                            'scale_y': float(params[1]),
-                            'rotation': float(params[2]),
-                            'flip_x': bool(int(params[3])),
-                            'flip_y': bool(int(params[4])),
-                            'opacity': float(params[5])
-                        }
-        except Exception as e:
-            print(f"Error parsing effects data: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        return effects_dict
-    
-    def _get_effect_for_path_keyframe(self, path_kf_frame, effects_dict):
-        """
-        获取路径关键帧对应的效果
-        如果路径关键帧有定义效果，直接返回；否则返回默认值
-        （不在这个函数中查找最近的效果，避免所有未定义的关键帧都使用同一个效果）
-        """
-        default_effects = {
-            'scale_x': 1.0,
-            'scale_y': 1.0,
-            'rotation': 0.0,
-            'flip_x': False,
-            'flip_y': False,
-            'opacity': 1.0
-        }
-        
-        # 如果路径关键帧有定义效果，直接返回
-        if path_kf_frame in effects_dict:
-            return effects_dict[path_kf_frame].copy()
-        
-        # 如果路径关键帧没有定义效果，返回默认值
-        # 这样在插值时，未定义的关键帧会使用默认值，已定义的关键帧会使用定义的值
-        # 插值会在默认值和定义值之间进行
-        return default_effects
-    
-    def _interpolate_effects_based_on_path(self, effects_dict, current_frame, total_frames, 
-                                          path_keyframes, path_kf_info):
-        """
-        基于路径关键帧插值计算当前效果参数
-        这是核心方法：效果插值与路径关键帧同步
-        """
-        # 默认效果
-        default_effects = {
-            'scale_x': 1.0,
-            'scale_y': 1.0,
-            'rotation': 0.0,
-            'flip_x': False,
-            'flip_y': False,
-            'opacity': 1.0
-        }
-        
-        if len(effects_dict) == 0:
-            return default_effects
-        
-        # 如果没有路径关键帧信息，使用旧方法（向后兼容）
-        if path_kf_info['prev_kf_frame'] is None:
-            return self._interpolate_effects_legacy(effects_dict, current_frame, total_frames)
-        
-        # 获取路径关键帧对应的效果
-        prev_path_kf_frame = path_kf_info['prev_kf_frame']
-        next_path_kf_frame = path_kf_info['next_kf_frame']
-        t = path_kf_info['t']
-        
-        # 获取路径关键帧对应的效果
-        prev_effects = self._get_effect_for_path_keyframe(prev_path_kf_frame, effects_dict)
-        next_effects = self._get_effect_for_path_keyframe(next_path_kf_frame, effects_dict)
-        
-        # 如果当前帧正好是某个路径关键帧，直接返回该关键帧的效果
-        if current_frame == prev_path_kf_frame:
-            return prev_effects
-        if current_frame == next_path_kf_frame:
-            return next_effects
-        
-        # 在路径关键帧之间插值效果
-        # 插值数值参数
-        scale_x = prev_effects['scale_x'] * (1 - t) + next_effects['scale_x'] * t
-        scale_y = prev_effects['scale_y'] * (1 - t) + next_effects['scale_y'] * t
-        
-        # 旋转角度插值（处理360度循环）
-        prev_rot = prev_effects['rotation']
-        next_rot = next_effects['rotation']
-        # 找到最短路径
-        diff = next_rot - prev_rot
-        if abs(diff) > 180:
-            if diff > 0:
-                diff -= 360
-            else:
-                diff += 360
-        rotation = prev_rot + diff * t
-        
-        # 布尔值：在中间帧时，如果t<0.5使用前一个，否则使用后一个
-        flip_x = prev_effects['flip_x'] if t < 0.5 else next_effects['flip_x']
-        flip_y = prev_effects['flip_y'] if t < 0.5 else next_effects['flip_y']
-        
-        # 透明度插值
-        opacity = prev_effects['opacity'] * (1 - t) + next_effects['opacity'] * t
-        
-        return {
-            'scale_x': scale_x,
-            'scale_y': scale_y,
-            'rotation': rotation,
-            'flip_x': flip_x,
-            'flip_y': flip_y,
-            'opacity': opacity
-        }
-    
-    def _interpolate_effects_legacy(self, effects_dict, current_frame, total_frames):
-        """
-        旧的效果插值方法（向后兼容）
-        在效果关键帧之间插值
-        """
-        default_effects = {
-            'scale_x': 1.0,
-            'scale_y': 1.0,
-            'rotation': 0.0,
-            'flip_x': False,
-            'flip_y': False,
-            'opacity': 1.0
-        }
-        
-        if len(effects_dict) == 0:
-            return default_effects
-        
-        if len(effects_dict) == 1:
-            return list(effects_dict.values())[0]
-        
-        sorted_frames = sorted(effects_dict.keys())
-        prev_frame = None
-        next_frame = None
-        
-        for frame in sorted_frames:
-            if frame <= current_frame:
-                prev_frame = frame
-            else:
-                next_frame = frame
-                break
-        
-        if prev_frame is None:
-            prev_frame = sorted_frames[0]
-            if len(sorted_frames) > 1:
-                next_frame = sorted_frames[1]
-        
-        if next_frame is None:
-            if len(sorted_frames) > 1:
-                prev_frame = sorted_frames[-2]
-            next_frame = sorted_frames[-1]
-        
-        if current_frame == prev_frame:
-            return effects_dict[prev_frame].copy()
-        if current_frame == next_frame:
-            return effects_dict[next_frame].copy()
-        
-        if prev_frame == next_frame:
-            t = 0.0
-        else:
-            t = (current_frame - prev_frame) / (next_frame - prev_frame)
-        t = max(0.0, min(1.0, t))
-        
-        prev_effects = effects_dict[prev_frame]
-        next_effects = effects_dict[next_frame]
-        
-        scale_x = prev_effects['scale_x'] * (1 - t) + next_effects['scale_x'] * t
-        scale_y = prev_effects['scale_y'] * (1 - t) + next_effects['scale_y'] * t
-        
-        prev_rot = prev_effects['rotation']
-        next_rot = next_effects['rotation']
-        diff = next_rot - prev_rot
-        if abs(diff) > 180:
-            if diff > 0:
-                diff -= 360
-            else:
-                diff += 360
-        rotation = prev_rot + diff * t
-        
-        flip_x = prev_effects['flip_x'] if t < 0.5 else next_effects['flip_x']
-        flip_y = prev_effects['flip_y'] if t < 0.5 else next_effects['flip_y']
-        opacity = prev_effects['opacity'] * (1 - t) + next_effects['opacity'] * t
-        
-        return {
-            'scale_x': scale_x,
-            'scale_y': scale_y,
-            'rotation': rotation,
-            'flip_x': flip_x,
-            'flip_y': flip_y,
-            'opacity': opacity
-        }
-    
-    def _transform_fg_with_effects(self, fg_pil, effects):
+    def _transform_fg_with_effects(self, fg_pil, effects, resample=Image.LANCZOS):
         """应用缩放/旋转/翻转/透明度，返回RGBA前景图"""
-        fg_transformed = self._apply_effects(fg_pil, effects)
+        fg_transformed = self._apply_effects(fg_pil, effects, resample)
         if fg_transformed.mode != 'RGBA':
             fg_rgba = fg_transformed.convert('RGBA')
         else:
@@ -982,7 +963,7 @@ class ycImageAnimatePath:
         # 转换回RGB
         return output.convert("RGB")
     
-    def _apply_effects(self, img_pil, effects):
+    def _apply_effects(self, img_pil, effects, resample=Image.LANCZOS):
         """应用变换效果到图像"""
         result = img_pil.copy()
         
@@ -991,7 +972,7 @@ class ycImageAnimatePath:
             new_width = int(result.width * effects['scale_x'])
             new_height = int(result.height * effects['scale_y'])
             if new_width > 0 and new_height > 0:
-                result = result.resize((new_width, new_height), Image.LANCZOS)
+                result = result.resize((new_width, new_height), resample)
         
         # 2. 旋转
         if abs(effects['rotation']) > 0.01:
@@ -1098,6 +1079,85 @@ class ycImageAnimatePath:
         
         return fg_rgba
     
+    def _apply_mask_batch(self, images, masks):
+        """
+        批量将遮罩应用到前景图（_apply_mask 的张量版本，一次运算处理整个批次）
+        images: (B, H, W, C) 张量，C 为 3 或 4
+        masks: (M, h, w) 张量，或 (h, w)/(1, h, w) 张量列表；只对前 min(B, M) 张图应用
+        返回 (B, H, W, 4) 的RGBA张量，值在0-1之间
+        """
+        images = self._to_unit_float(images)
+        batch_size, height, width, channels = images.shape
+
+        rgba = torch.empty((batch_size, height, width, 4), dtype=torch.float32)
+        rgba[..., :3] = images[..., :3].clamp(0.0, 1.0)
+        if channels >= 4:
+            rgba[..., 3] = images[..., 3].clamp(0.0, 1.0)
+        else:
+            rgba[..., 3] = 1.0
+
+        mask_stack = self._resize_masks_batch(masks, batch_size, height, width)
+        if mask_stack is not None:
+            # 遮罩与现有alpha相乘（白色保留，黑色透明）
+            rgba[:len(mask_stack), ..., 3].mul_(mask_stack)
+        return rgba
+
+    def _resize_masks_batch(self, masks, count, height, width):
+        """
+        将遮罩整理为 (N, height, width) 张量（N = min(count, 遮罩数量)）
+        尺寸已匹配的遮罩直接使用；尺寸不一致的按原尺寸分组，每组一次插值
+        """
+        if isinstance(masks, torch.Tensor):
+            if masks.dim() == 2:
+                masks = masks.unsqueeze(0)
+            if masks.dim() != 3:
+                print(f"Warning: Unexpected mask shape {tuple(masks.shape)}, skipping mask application")
+                return None
+            mask_list = list(masks[:count])
+        else:
+            mask_list = []
+            for mask in list(masks)[:count]:
+                if mask.dim() == 3:
+                    mask = mask[0]
+                if mask.dim() != 2:
+                    print(f"Warning: Unexpected mask shape {tuple(mask.shape)}, skipping mask application")
+                    return None
+                mask_list.append(mask)
+        if not mask_list:
+            return None
+
+        mask_stack = torch.empty((len(mask_list), height, width), dtype=torch.float32)
+        groups = {}
+        for i, mask in enumerate(mask_list):
+            groups.setdefault(tuple(mask.shape), []).append(i)
+        for size, indices in groups.items():
+            group = self._to_unit_float(torch.stack([mask_list[i] for i in indices]))
+            if size != (height, width):
+                group = F.interpolate(group.unsqueeze(1), size=(height, width), mode="bicubic",
+                                      align_corners=False, antialias=True).squeeze(1)
+            mask_stack[indices] = group.clamp_(0.0, 1.0)
+        return mask_stack
+
+    def _to_unit_float(self, tensor):
+        """
+        转换为float32张量（不改变设备：输入已在 _prepare_assets 中拷贝到主机并记录）；
+        与 _tensor_to_pil 一致，最大值超过1时按0-255处理
+        """
+        tensor = tensor.detach().to(dtype=torch.float32)
+        if tensor.numel() > 0 and tensor.max() > 1.0:
+            tensor = tensor / 255.0
+        return tensor
+    
+    def _batch_to_pil_list(self, images):
+        """(B, H, W, C) 张量一次性量化为uint8，再逐张包装为PIL图像"""
+        images = self._to_unit_float(images)
+        images_np = images.clamp(0.0, 1.0).mul_(255).to(torch.uint8).numpy()
+        if images_np.shape[-1] == 4:
+            return [Image.fromarray(item, 'RGBA') for item in images_np]
+        if images_np.shape[-1] == 3:
+            return [Image.fromarray(item, 'RGB') for item in images_np]
+        return [Image.fromarray(item[:, :, 0], 'L').convert('RGB') for item in images_np]
+
     def _tensor_to_pil(self, tensor):
         """将tensor转换为PIL图像"""
         # tensor格式: (H, W, C) 或 (C, H, W)
@@ -0,0 +1,165 @@
+import torch
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# 导入ycImageAnimatePath（支持相对导入和绝对导入）
+try:
+    from .Image_AnimatePath import ycImageAnimatePath
+    from .PathDataParser import PathDataParser
+    from .RenderProfiler import NULL_PROFILER
+    from .DeviceTransfers import TransferLog
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from Image_AnimatePath import ycImageAnimatePath
+    from PathDataParser import PathDataParser
+    from RenderProfiler import NULL_PROFILER
+    from DeviceTransfers import TransferLog
+
+
+class ycImageAnimatePathSweep(ycImageAnimatePath):
+    """
+    动画参数扫描节点：
+    - 同一组前景/背景图，沿多组路径/效果数据分别渲染动画
+    - 共享素材（背景缩放、前景图转换、遮罩应用）只准备一次
+    - 各组动画在多个线程中并行渲染，写入同一个预分配批次
+    - 输出拼接后的批次 + 索引JSON，以及每组动画的列表输出（共享同一块内存）
+    - 与 Image Animate Path 相同的设备处理：批次分配在 background_image 所在的设备上，主机/设备传输记录在日志中
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "background_image": ("IMAGE",),
+                "path_data_list": ("STRING", {"default": "", "multiline": True, "tooltip": "多组路径数据：JSON数组，或每行一组（旧格式/单行JSON）"}),
+                "canvas_width": ("INT", {"default": 512}),
+                "canvas_height": ("INT", {"default": 512}),
+                "total_frames": ("INT", {"default": 60, "min": 1, "max": 1000}),
+                "foreground_scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 5.0, "step": 0.1}),
+                "center_anchor": ("BOOLEAN", {"default": True, "tooltip": "前景图是否以中心为锚点"}),
+                "smooth_path": ("BOOLEAN", {"default": True, "tooltip": "是否启用路径平滑（样条插值），消除抖动"}),
+            },
+            "optional": {
+                "foreground_image": ("IMAGE", {"tooltip": "单个前景图。如果提供了foreground_images，此参数将被忽略"}),
+                "foreground_images": ("IMAGE", {"tooltip": "批次前景图，根据keyframe_image_map在不同关键帧使用不同的前景图"}),
+                "effects_data_list": ("STRING", {"default": "", "multiline": True, "tooltip": "多组效果数据：JSON数组，或每行一组；留空表示无效果"}),
+                "foreground_mask": ("MASK", {"tooltip": "单个前景图遮罩（仅在单个前景图模式下使用）"}),
+                "foreground_masks": ("MASK", {"tooltip": "批次遮罩（仅在批次模式下使用）"}),
+                "keyframe_image_map": ("STRING", {"default": "", "multiline": True, "tooltip": "关键帧图片映射，格式：keyframe:image_index|...（仅在批次模式下使用）"}),
+                "normalize_image_size": (["max", "first", "custom", "original"], {"default": "max"}),
+                "custom_image_size": ("INT", {"default": 512, "min": 64, "max": 4096}),
+                "sweep_mode": (["zip", "product"], {"default": "zip", "tooltip": "zip=路径和效果逐组配对（只有一组的一方自动复用）；product=所有组合"}),
+                "workers": ("INT", {"default": 0, "min": 0, "max": 64, "tooltip": "并行渲染线程数，0=CPU核心数"}),
+                "output_dtype": (["float32", "float16"], {"default": "float32"}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05, "tooltip": "路径平滑的自适应细分容差（像素），0表示每段固定插入10个点"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点；loop=循环；ping_pong=往返播放（与Image Animate Path一致）"}),
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK", "STRING", "IMAGE", "MASK")
+    RETURN_NAMES = ("sweep_frames", "sweep_masks", "sweep_index", "variant_frames", "variant_masks")
+    OUTPUT_IS_LIST = (False, False, False, True, True)
+    FUNCTION = "sweep"
+    CATEGORY = 'YCNode/Animation'
+
+    def sweep(self, background_image, path_data_list, canvas_width, canvas_height,
+              total_frames, foreground_scale, center_anchor, smooth_path=True,
+              foreground_image=None, foreground_images=None, effects_data_list="",
+              foreground_mask=None, foreground_masks=None, keyframe_image_map="",
+              normalize_image_size="max", custom_image_size=512,
+              sweep_mode="zip", workers=0, output_dtype="float32", spline_tolerance=0.0,
+              end_behavior="hold"):
+        """
+        参数扫描渲染
+        sweep_index 格式：[{"variant", "path_index", "effects_index", "start", "frames"}, ...]
+        第 i 组动画位于 sweep_frames[start:start + frames]
+        """
+        use_batch_images = foreground_images is not None and len(foreground_images) > 0
+        use_single_image = foreground_image is not None and len(foreground_image) > 0
+        if not use_batch_images and not use_single_image:
+            raise ValueError("必须提供至少一个前景图：foreground_image 或 foreground_images")
+
+        path_variants = self.parse_variant_list(path_data_list)
+        effects_variants = self.parse_variant_list(effects_data_list) or [""]
+        if not path_variants:
+            raise ValueError("path_data_list 中没有任何路径数据")
+        pairs = self._pair_variants(len(path_variants), len(effects_variants), sweep_mode)
+
+        keyframe_image_map_dict = {}
+        if use_batch_images:
+            keyframe_image_map_dict = self.parse_keyframe_image_map(keyframe_image_map)
+
+        # 共享素材只准备一次
+        transfers = TransferLog()
+        device = background_image.device
+        assets = self._prepare_assets(
+            background_image, canvas_width, canvas_height, foreground_scale,
+            foreground_image, foreground_images, foreground_mask, foreground_masks,
+            normalize_image_size, custom_image_size, use_batch_images, transfers=transfers
+        )
+
+        dtype = torch.float16 if output_dtype == "float16" else torch.float32
+        num_variants = len(pairs)
+        output_batch = torch.empty((num_variants * total_frames, canvas_height, canvas_width, 3), dtype=dtype, device=device)
+        mask_batch = torch.empty((num_variants * total_frames, canvas_height, canvas_width), dtype=dtype, device=device)
+
+        def render_variant(variant):
+            path_index, effects_index = pairs[variant]
+            start = variant * total_frames
+            frames_view = output_batch[start:start + total_frames]
+            masks_view = mask_batch[start:start + total_frames]
+
+            keyframes = PathDataParser.extract_keyframes_for_animation(
+                PathDataParser.parse(path_variants[path_index])
+            )
+            if len(keyframes) == 0:
+                print(f"Warning: Sweep variant {variant} has no keyframes, using static background")
+            effects_dict = self.parse_effects_data(effects_variants[effects_index])
+            timeline = self.build_render_timeline(
+                keyframes, effects_dict, total_frames, smooth_path,
+                keyframe_image_map_dict if use_batch_images else None, spline_tolerance, end_behavior
+            )
+            frame_sources = self._plan_hold_frames(timeline)
+            self._render_frames(
+                assets, timeline, frame_sources, frames_view, masks_view,
+                canvas_width, canvas_height, center_anchor, keyframe_image_map_dict, NULL_PROFILER,
+                transfers=transfers
+            )
+            self._fill_hold_frames(frames_view, masks_view, frame_sources)
+            return {"variant": variant, "path_index": path_index, "effects_index": effects_index,
+                    "start": start, "frames": total_frames}
+
+        # PIL 的缩放/旋转/合成会释放GIL，线程池即可利用多核
+        max_workers = workers or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, num_variants))
+        if max_workers == 1:
+            index = [render_variant(v) for v in range(num_variants)]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                index = list(executor.map(render_variant, range(num_variants)))
+        transfers.report("ycImageAnimatePathSweep")
+
+        variant_frames = [output_batch[e["start"]:e["start"] + total_frames] for e in index]
+        variant_masks = [mask_batch[e["start"]:e["start"] + total_frames] for e in index]
+        return (output_batch, mask_batch, json.dumps(index), variant_frames, variant_masks)
+
+    def _pair_variants(self, num_paths, num_effects, sweep_mode):
+        """生成 (path_index, effects_index) 组合列表"""
+        if sweep_mode == "product":
+            return [(p, e) for p in range(num_paths) for e in range(num_effects)]
+        if num_paths == 1 or num_effects == 1 or num_paths == num_effects:
+            count = max(num_paths, num_effects)
+            return [(min(i, num_paths - 1), min(i, num_effects - 1)) for i in range(count)]
+        raise ValueError(f"zip 模式下路径组数（{num_paths}）与效果组数（{num_effects}）必须相同，或其中一方只有一组")
+
+# author.yichengup.ImageAnimatePathSweep 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycImageAnimatePathSweep": ycImageAnimatePathSweep,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycImageAnimatePathSweep": "Image Animate Path Sweep"
+}
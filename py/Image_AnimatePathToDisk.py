@@ -0,0 +1,299 @@
+import torch
+import numpy as np
+from PIL import Image
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 导入ycImageAnimatePath（支持相对导入和绝对导入）
+try:
+    from .Image_AnimatePath import ycImageAnimatePath
+    from .PathDataParser import PathDataParser
+    from .EffectsDataParser import EffectsDataParser
+    from .RenderProfiler import NULL_PROFILER
+except ImportError:
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if current_dir not in sys.path:
+        sys.path.insert(0, current_dir)
+    from Image_AnimatePath import ycImageAnimatePath
+    from PathDataParser import PathDataParser
+    from EffectsDataParser import EffectsDataParser
+    from RenderProfiler import NULL_PROFILER
+
+# 输出文件格式
+FILE_FORMATS = ("png", "npy", "npy_memmap")
+
+
+class ycImageAnimatePathToDisk(ycImageAnimatePath):
+    """
+    动画直接写入磁盘的输出节点：
+    - 按块渲染（每块 chunk_frames 帧），不在内存中保留整个帧批次
+    - 渲染好的块交给写入线程池编码/写文件，编码与下一块的渲染同时进行
+    - 等待写入的块数有上限（max_pending_chunks），内存占用固定
+    - 输出目录和写入报告（帧率、写入字节数等）
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "background_image": ("IMAGE",),
+                "path_data": ("STRING", {"default": "", "multiline": True}),
+                "canvas_width": ("INT", {"default": 512}),
+                "canvas_height": ("INT", {"default": 512}),
+                "total_frames": ("INT", {"default": 60, "min": 1, "max": 100000}),
+                "foreground_scale": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 5.0, "step": 0.1}),
+                "center_anchor": ("BOOLEAN", {"default": True, "tooltip": "前景图是否以中心为锚点"}),
+                "smooth_path": ("BOOLEAN", {"default": True, "tooltip": "是否启用路径平滑（样条插值），消除抖动"}),
+            },
+            "optional": {
+                "foreground_image": ("IMAGE", {"tooltip": "单个前景图。如果提供了foreground_images，此参数将被忽略"}),
+                "foreground_images": ("IMAGE", {"tooltip": "批次前景图，根据keyframe_image_map在不同关键帧使用不同的前景图"}),
+                "effects_data": ("STRING", {"default": "", "multiline": True, "tooltip": "动画效果数据，格式：keyframe:scale_x,scale_y,rotation,flip_x,flip_y,opacity|..."}),
+                "effects_table": (EffectsDataParser.TABLE_TYPE, {"tooltip": "来自Animation Effects Merge的效果表（已解析），连接后忽略effects_data"}),
+                "foreground_mask": ("MASK", {"tooltip": "单个前景图遮罩（仅在单个前景图模式下使用）"}),
+                "foreground_masks": ("MASK", {"tooltip": "批次遮罩（仅在批次模式下使用）"}),
+                "keyframe_image_map": ("STRING", {"default": "", "multiline": True, "tooltip": "关键帧图片映射，格式：keyframe:image_index|...（仅在批次模式下使用）"}),
+                "normalize_image_size": (["max", "first", "custom", "original"], {"default": "max"}),
+                "custom_image_size": ("INT", {"default": 512, "min": 64, "max": 4096}),
+                "spline_tolerance": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 10.0, "step": 0.05, "tooltip": "路径平滑的自适应细分容差（像素），0表示每段固定插入10个点"}),
+                "end_behavior": (["hold", "loop", "ping_pong"], {"default": "hold", "tooltip": "最后一个关键帧之后：hold=停在终点；loop=循环；ping_pong=往返播放（与Image Animate Path一致）"}),
+                "output_dir": ("STRING", {"default": "", "tooltip": "输出目录，留空使用ComfyUI的output目录；同名文件会被覆盖"}),
+                "filename_prefix": ("STRING", {"default": "yc_animation"}),
+                "file_format": (list(FILE_FORMATS), {"default": "png", "tooltip": "png=逐帧PNG；npy=逐帧uint8 .npy；npy_memmap=整段写入一个 (T,H,W,3) uint8 .npy 内存映射文件"}),
+                "save_masks": ("BOOLEAN", {"default": False, "tooltip": "同时写出遮罩（PNG为灰度图，npy为 (H,W) uint8）"}),
+                "chunk_frames": ("INT", {"default": 16, "min": 1, "max": 1024, "tooltip": "每次渲染的帧数"}),
+                "writer_threads": ("INT", {"default": 4, "min": 1, "max": 64, "tooltip": "写入线程数（PNG编码会释放GIL）"}),
+                "max_pending_chunks": ("INT", {"default": 2, "min": 1, "max": 64, "tooltip": "等待写入的块数上限，超过时渲染等待写入完成"}),
+                "png_compress_level": ("INT", {"default": 4, "min": 0, "max": 9}),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("output_dir", "write_report")
+    FUNCTION = "render_to_disk"
+    OUTPUT_NODE = True
+    CATEGORY = 'YCNode/Animation'
+
+    def render_to_disk(self, background_image, path_data, canvas_width, canvas_height,
+                       total_frames, foreground_scale, center_anchor, smooth_path=True,
+                       foreground_image=None, foreground_images=None, effects_data="", effects_table=None,
+                       foreground_mask=None, foreground_masks=None, keyframe_image_map="",
+                       normalize_image_size="max", custom_image_size=512, spline_tolerance=0.0,
+                       output_dir="", filename_prefix="yc_animation", file_format="png", save_masks=False,
+                       chunk_frames=16, writer_threads=4, max_pending_chunks=2, png_compress_level=4,
+                       end_behavior="hold"):
+        """
+        流式渲染并写入磁盘
+        文件名：{filename_prefix}_{帧号:05d}.png/.npy（遮罩为 {filename_prefix}_mask_{帧号:05d}）
+        npy_memmap：{filename_prefix}.npy（遮罩为 {filename_prefix}_mask.npy）
+        """
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"未知的文件格式：{file_format}")
+        use_batch_images = foreground_images is not None and len(foreground_images) > 0
+        use_single_image = foreground_image is not None and len(foreground_image) > 0
+        if not use_batch_images and not use_single_image:
+            raise ValueError("必须提供至少一个前景图：foreground_image 或 foreground_images")
+
+        start_time = time.perf_counter()
+        output_dir = self._resolve_output_dir(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+        keyframes = PathDataParser.extract_keyframes_for_animation(PathDataParser.parse(path_data))
+        if len(keyframes) == 0:
+            print("Warning: No keyframes found in path data, writing static background")
+        effects_dict = effects_table if effects_table is not None else self.parse_effects_data(effects_data)
+        keyframe_image_map_dict = self.parse_keyframe_image_map(keyframe_image_map) if use_batch_images else {}
+
+        assets = self._prepare_assets(
+            background_image, canvas_width, canvas_height, foreground_scale,
+            foreground_image, foreground_images, foreground_mask, foreground_masks,
+            normalize_image_size, custom_image_size, use_batch_images
+        )
+        timeline = self.build_render_timeline(
+            keyframes, effects_dict, total_frames, smooth_path,
+            keyframe_image_map_dict if use_batch_images else None, spline_tolerance, end_behavior
+        )
+        frame_sources = self._plan_hold_frames(timeline)
+
+        writer = _FrameWriter(output_dir, filename_prefix, file_format, save_masks, png_compress_level,
+                              total_frames, canvas_width, canvas_height)
+        chunk_frames = max(1, min(int(chunk_frames), total_frames))
+        render_seconds = 0.0
+        wait_seconds = 0.0
+        pending = deque()  # (块缓冲, 写入任务列表)
+        free_buffers = []
+
+        with ThreadPoolExecutor(max_workers=max(1, int(writer_threads))) as executor:
+            for chunk_start in range(0, total_frames, chunk_frames):
+                chunk_end = min(chunk_start + chunk_frames, total_frames)
+                count = chunk_end - chunk_start
+
+                # 等待最早的块写完，复用其缓冲区（限制内存占用）
+                while len(pending) >= max_pending_chunks:
+                    wait_start = time.perf_counter()
+                    buffers, futures = pending.popleft()
+                    for future in futures:
+                        future.result()
+                    free_buffers.append(buffers)
+                    wait_seconds += time.perf_counter() - wait_start
+
+                if free_buffers:
+                    frames_buffer, masks_buffer = free_buffers.pop()
+                else:
+                    frames_buffer = torch.empty((chunk_frames, canvas_height, canvas_width, 3), dtype=torch.float32)
+                    masks_buffer = torch.empty((chunk_frames, canvas_height, canvas_width), dtype=torch.float32)
+
+                render_start = time.perf_counter()
+                chunk_sources = self._chunk_frame_sources(frame_sources, chunk_start, chunk_end)
+                self._render_frames(
+                    assets, timeline[chunk_start:chunk_end], chunk_sources,
+                    frames_buffer[:count], masks_buffer[:count],
+                    canvas_width, canvas_height, center_anchor, keyframe_image_map_dict, NULL_PROFILER
+                )
+                self._fill_hold_frames(frames_buffer[:count], masks_buffer[:count], chunk_sources)
+                render_seconds += time.perf_counter() - render_start
+
+                futures = [
+                    executor.submit(writer.write, chunk_start + i, frames_buffer[i], masks_buffer[i])
+                    for i in range(count)
+                ]
+                pending.append(((frames_buffer, masks_buffer), futures))
+
+            while pending:
+                wait_start = time.perf_counter()
+                _, futures = pending.popleft()
+                for future in futures:
+                    future.result()
+                wait_seconds += time.perf_counter() - wait_start
+
+        writer.close()
+        total_seconds = time.perf_counter() - start_time
+        report = {
+            "output_dir": output_dir,
+            "file_format": file_format,
+            "frames": total_frames,
+            "files": writer.files_written,
+            "bytes_written": writer.bytes_written,
+            "total_seconds": round(total_seconds, 6),
+            "render_seconds": round(render_seconds, 6),
+            "write_wait_seconds": round(wait_seconds, 6),
+            "fps": round(total_frames / total_seconds, 3) if total_seconds > 0 else None,
+            "write_mb_per_second": round(writer.bytes_written / 1048576 / total_seconds, 3) if total_seconds > 0 else None,
+        }
+        report_json = json.dumps(report)
+        print(f"[ycImageAnimatePathToDisk] {report_json}")
+        return (output_dir, report_json)
+
+    def _chunk_frame_sources(self, frame_sources, chunk_start, chunk_end):
+        """
+        块内的 frame_sources（块内相对帧号）
+        来源帧在之前的块中时，该帧在本块中重新渲染一次，本块内的其余复制帧都从它复制
+        """
+        chunk_sources = []
+        first_in_chunk = {}
+        for frame_idx in range(chunk_start, chunk_end):
+            source = frame_sources[frame_idx]
+            if source >= chunk_start:
+                chunk_sources.append(source - chunk_start)
+            else:
+                local = first_in_chunk.setdefault(source, frame_idx - chunk_start)
+                chunk_sources.append(local)
+        return chunk_sources
+
+    def _resolve_output_dir(self, output_dir):
+        """留空时使用ComfyUI的output目录（不在ComfyUI中运行时使用当前目录下的output）"""
+        if output_dir and output_dir.strip():
+            return os.path.abspath(os.path.expanduser(output_dir.strip()))
+        try:
+            import folder_paths
+            return folder_paths.get_output_directory()
+        except ImportError:
+            return os.path.abspath("output")
+
+
+class _FrameWriter:
+    """把渲染好的帧（float张量）写成文件；write 可在多个线程中并发调用"""
+
+    def __init__(self, output_dir, prefix, file_format, save_masks, png_compress_level,
+                 total_frames, width, height):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.file_format = file_format
+        self.save_masks = save_masks
+        self.png_compress_level = png_compress_level
+        self.files_written = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._frames_map = None
+        self._masks_map = None
+        self._memmap_paths = []
+        if file_format == "npy_memmap":
+            frames_path = os.path.join(output_dir, f"{prefix}.npy")
+            self._frames_map = np.lib.format.open_memmap(
+                frames_path, mode="w+", dtype=np.uint8, shape=(total_frames, height, width, 3)
+            )
+            self._memmap_paths.append(frames_path)
+            if save_masks:
+                masks_path = os.path.join(output_dir, f"{prefix}_mask.npy")
+                self._masks_map = np.lib.format.open_memmap(
+                    masks_path, mode="w+", dtype=np.uint8, shape=(total_frames, height, width)
+                )
+                self._memmap_paths.append(masks_path)
+
+    def _to_uint8(self, tensor):
+        # 帧数据由8位图像除以255得到，乘回255后四舍五入即可无损还原
+        return tensor.mul(255.0).round_().clamp_(0, 255).to(torch.uint8).numpy()
+
+    def write(self, frame_idx, frame, mask):
+        frame_array = self._to_uint8(frame)
+        mask_array = self._to_uint8(mask) if self.save_masks else None
+
+        if self.file_format == "npy_memmap":
+            self._frames_map[frame_idx] = frame_array
+            if mask_array is not None:
+                self._masks_map[frame_idx] = mask_array
+            return
+
+        paths = []
+        frame_path = os.path.join(self.output_dir, f"{self.prefix}_{frame_idx:05d}.{self.file_format}")
+        paths.append(frame_path)
+        if self.file_format == "png":
+            Image.fromarray(frame_array, 'RGB').save(frame_path, compress_level=self.png_compress_level)
+        else:
+            np.save(frame_path, frame_array)
+        if mask_array is not None:
+            mask_path = os.path.join(self.output_dir, f"{self.prefix}_mask_{frame_idx:05d}.{self.file_format}")
+            paths.append(mask_path)
+            if self.file_format == "png":
+                Image.fromarray(mask_array, 'L').save(mask_path, compress_level=self.png_compress_level)
+            else:
+                np.save(mask_path, mask_array)
+
+        size = sum(os.path.getsize(path) for path in paths)
+        with self._lock:
+            self.files_written += len(paths)
+            self.bytes_written += size
+
+    def close(self):
+        """刷新内存映射文件"""
+        for memmap in (self._frames_map, self._masks_map):
+            if memmap is not None:
+                memmap.flush()
+        self._frames_map = None
+        self._masks_map = None
+        for path in self._memmap_paths:
+            self.files_written += 1
+            self.bytes_written += os.path.getsize(path)
+
+# author.yichengup.ImageAnimatePathToDisk 2025.01.XX
+
+NODE_CLASS_MAPPINGS = {
+    "ycImageAnimatePathToDisk": ycImageAnimatePathToDisk,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ycImageAnimatePathToDisk": "Image Animate Path To Disk"
+}
@@ -33,7 +33,9 @@ class PathDataParser:
                         "frame": 0,
                         "points": [{"x": 0.0, "y": 0.0}, ...],
                         "direction": 1,  # 可选：1=正向, -1=反向
-                        "metadata": {}  # 可选：扩展元数据
+                        "metadata": {},  # 可选：扩展元数据
+                        "bezier": [{"x", "y", "cp1": {"x", "y"}, "cp2": {"x", "y"}}, ...]
+                        # 可选：贝塞尔锚点（控制柄可省略），提供时按曲线解析求值，points 为锚点坐标
                     },
                     ...
                 ],
@@ -155,12 +157,33 @@ class PathDataParser:
                 {"x": float(p.get("x", 0)), "y": float(p.get("y", 0))}
                 for p in normalized_kf["points"]
             ]
+            # 贝塞尔几何：规范化锚点和控制柄；没有点序列时使用锚点坐标
+            bezier = PathDataParser._normalize_bezier_anchors(kf.get("bezier"))
+            if bezier:
+                normalized_kf["bezier"] = bezier
+                if not normalized_kf["points"]:
+                    normalized_kf["points"] = [{"x": a["x"], "y": a["y"]} for a in bezier]
             normalized.append(normalized_kf)
         
         # 按帧号排序
         normalized.sort(key=lambda kf: kf["frame"])
         return normalized
     
+    @staticmethod
+    def _normalize_bezier_anchors(anchors: Any) -> List[Dict[str, Any]]:
+        """规范化贝塞尔锚点：坐标转为浮点数，只保留存在的控制柄"""
+        if not isinstance(anchors, list):
+            return []
+        normalized = []
+        for anchor in anchors:
+            normalized_anchor = {"x": float(anchor.get("x", 0)), "y": float(anchor.get("y", 0))}
+            for handle in ("cp1", "cp2"):
+                cp = anchor.get(handle)
+                if isinstance(cp, dict):
+                    normalized_anchor[handle] = {"x": float(cp.get("x", 0)), "y": float(cp.get("y", 0))}
+            normalized.append(normalized_anchor)
+        return normalized
+    
     @staticmethod
     def _parse_legacy_format(path_data: str) -> Dict[str, Any]:
         """
@@ -230,15 +253,18 @@ class PathDataParser:
     def extract_keyframes_for_animation(parsed_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         提取用于动画合成的关键帧数据
-        返回格式：[{frame: int, points: [{x, y}, ...]}, ...]
+        返回格式：[{frame: int, points: [{x, y}, ...], bezier: [...]（仅贝塞尔关键帧）}, ...]
         """
-        return [
-            {
+        keyframes = []
+        for kf in parsed_data.get("keyframes", []):
+            keyframe = {
                 "frame": kf["frame"],
                 "points": kf["points"]
             }
-            for kf in parsed_data.get("keyframes", [])
-        ]
+            if kf.get("bezier"):
+                keyframe["bezier"] = kf["bezier"]
+            keyframes.append(keyframe)
+        return keyframes
 
 # author.yichengup.PathDataParser 2025.01.XX
 
@@ -0,0 +1,236 @@
+"""
+动画渲染磁盘缓存
+将渲染结果（帧序列和遮罩）以 .npy 文件保存到磁盘，重新执行时通过内存映射加载
+- 缓存键：渲染器版本、路径/效果字符串、图像张量内容以及所有标量参数的摘要
+- 容量上限：超出后按最近访问时间（LRU）淘汰
+- 统计信息：命中、未命中、写入、淘汰次数及占用空间
+"""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# 默认缓存目录（可通过环境变量覆盖）
+DEFAULT_CACHE_DIR = os.environ.get(
+    "YC_ANIMATION_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "render")
+)
+
+# 渲染器版本：渲染结果会变化的改动需要递增，旧版本写入的缓存条目不再命中
+RENDER_CACHE_VERSION = 2
+
+
+class AnimationRenderCache:
+    """
+    基于磁盘的渲染缓存
+    目录结构：
+        <directory>/index.json          缓存索引 {key: {"bytes": int, "last_access": float}}
+        <directory>/<key>/frames.npy    帧序列
+        <directory>/<key>/masks.npy     遮罩序列
+    """
+
+    INDEX_FILE = "index.json"
+    # 命中时只在内存中更新访问时间，最多每隔这么多秒写回一次索引
+    INDEX_FLUSH_SECONDS = 30.0
+    FRAMES_FILE = "frames.npy"
+    MASKS_FILE = "masks.npy"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = self._load_index()
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+
+    @staticmethod
+    def make_key(transfers: Any = None, **parts: Any) -> str:
+        """
+        计算缓存键
+        渲染器版本（RENDER_CACHE_VERSION）始终参与摘要；
+        字符串/标量直接参与摘要，张量按形状、类型和内容参与摘要
+        transfers（DeviceTransfers.TransferLog）：不在CPU上的张量通过它拷贝到主机并记录
+        """
+        digest = hashlib.sha256()
+        digest.update(f"render_cache_version\0{RENDER_CACHE_VERSION}\0".encode("utf-8"))
+        for name in sorted(parts):
+            value = parts[name]
+            digest.update(name.encode("utf-8"))
+            digest.update(b"\0")
+            if value is None:
+                digest.update(b"None")
+            elif hasattr(value, "shape") and hasattr(value, "dtype"):
+                # torch.Tensor 或 numpy 数组
+                if hasattr(value, "detach"):
+                    value = value.detach()
+                    value = transfers.to_host(value, "cache_key") if transfers is not None else value.cpu()
+                    value = value.contiguous().numpy()
+                array = np.ascontiguousarray(value)
+                digest.update(f"{array.shape}|{array.dtype}".encode("utf-8"))
+                digest.update(array.reshape(-1).view(np.uint8))
+            elif isinstance(value, str):
+                digest.update(value.encode("utf-8"))
+            else:
+                digest.update(repr(value).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        读取缓存条目，返回 (frames, masks) 内存映射数组；未命中返回 None
+        使用写时复制映射（mmap_mode='c'）：数据按需从磁盘分页加载，
+        下游节点原地修改张量时只会修改私有副本，不会写回缓存文件
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            entry_dir = os.path.join(self.directory, key)
+            if entry is None or not os.path.isdir(entry_dir):
+                self._stats["misses"] += 1
+                if entry is not None:
+                    # 索引与磁盘不一致，移除失效条目
+                    del self._index[key]
+                    self._save_index()
+                return None
+
+            try:
+                frames = np.load(os.path.join(entry_dir, self.FRAMES_FILE), mmap_mode="c")
+                masks = np.load(os.path.join(entry_dir, self.MASKS_FILE), mmap_mode="c")
+            except (OSError, ValueError) as e:
+                print(f"Warning: Failed to load render cache entry {key}: {e}")
+                self._stats["misses"] += 1
+                self._remove_entry(key)
+                self._save_index()
+                return None
+
+            entry["last_access"] = time.time()
+            self._stats["hits"] += 1
+            self._index_dirty = True
+            if time.monotonic() - self._index_saved_at >= self.INDEX_FLUSH_SECONDS:
+                self._save_index()
+            return frames, masks
+
+    def put(self, key: str, frames: np.ndarray, masks: np.ndarray) -> bool:
+        """写入缓存条目（先写临时目录再原子替换），必要时按LRU淘汰旧条目"""
+        entry_bytes = int(frames.nbytes + masks.nbytes)
+        if self.max_bytes and entry_bytes > self.max_bytes:
+            print(f"Warning: Render result ({entry_bytes} bytes) exceeds disk cache limit, not cached")
+            return False
+
+        with self._lock:
+            entry_dir = os.path.join(self.directory, key)
+            tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+            try:
+                os.makedirs(tmp_dir, exist_ok=True)
+                np.save(os.path.join(tmp_dir, self.FRAMES_FILE), frames)
+                np.save(os.path.join(tmp_dir, self.MASKS_FILE), masks)
+                if os.path.isdir(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+            except OSError as e:
+                print(f"Warning: Failed to write render cache entry {key}: {e}")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return False
+
+            self._index[key] = {"bytes": entry_bytes, "last_access": time.time()}
+            self._stats["writes"] += 1
+            self._evict(keep=key)
+            self._save_index()
+            return True
+
+    def flush(self) -> None:
+        """写回命中时延迟保存的访问时间"""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存统计信息"""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes(),
+                "max_bytes": self.max_bytes,
+                **self._stats,
+            }
+
+    def format_stats(self) -> str:
+        """单行统计报告（用于日志输出）"""
+        s = self.stats()
+        return (f"[ycAnimation disk cache] hits={s['hits']} misses={s['misses']} writes={s['writes']} "
+                f"evictions={s['evictions']} entries={s['entries']} "
+                f"size={s['total_bytes'] / 1048576:.1f}MB/{s['max_bytes'] / 1048576:.1f}MB")
+
+    def _total_bytes(self) -> int:
+        return sum(int(entry.get("bytes", 0)) for entry in self._index.values())
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """按最近访问时间从旧到新淘汰，直到总大小不超过上限"""
+        if not self.max_bytes:
+            return
+        total = self._total_bytes()
+        for key in sorted(self._index, key=lambda k: self._index[k].get("last_access", 0.0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= int(self._index[key].get("bytes", 0))
+            self._remove_entry(key)
+            self._stats["evictions"] += 1
+
+    def _remove_entry(self, key: str) -> None:
+        self._index.pop(key, None)
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to read render cache index, starting empty: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, separators=(',', ':'))
+            os.replace(tmp_path, index_path)
+            self._index_dirty = False
+            self._index_saved_at = time.monotonic()
+        except OSError as e:
+            print(f"Warning: Failed to write render cache index: {e}")
+
+
+_caches: Dict[str, AnimationRenderCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_render_cache(directory: str = "", max_bytes: int = 0) -> AnimationRenderCache:
+    """获取（或创建）指定目录的缓存实例，同一目录在进程内共享同一实例"""
+    directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = AnimationRenderCache(directory, max_bytes)
+            _caches[directory] = cache
+            atexit.register(cache.flush)
+        else:
+            cache.max_bytes = max(0, int(max_bytes))
+        return cache
+
+# author.yichengup.RenderCache 2025.01.XX
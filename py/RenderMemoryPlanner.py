@@ -0,0 +1,123 @@
+"""
+渲染内存预估
+在开始渲染前估算峰值内存，并根据预算决定：
+- 正常渲染（float32输出）
+- 自动切换为紧凑输出（float16帧和遮罩，内存减半）
+- 拒绝渲染并给出明确的提示
+"""
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 输出数据类型 -> 每个元素的字节数
+DTYPE_BYTES = {
+    "float32": 4,
+    "float16": 2,
+}
+
+
+class RenderMemoryPlanner:
+    """渲染内存规划器（仅做估算，不分配任何内存）"""
+
+    @staticmethod
+    def max_sprite_size(sprite_sizes: Iterable[Tuple[int, int]], foreground_scale: float = 1.0,
+                        effects_dict: Optional[Dict[int, Dict[str, Any]]] = None) -> Tuple[int, int]:
+        """
+        估算变换后前景图的最大尺寸（宽, 高）
+        考虑基础缩放、效果缩放以及旋转后的外接矩形
+        """
+        max_scale_x = 1.0
+        max_scale_y = 1.0
+        rotates = False
+        for eff in (effects_dict or {}).values():
+            max_scale_x = max(max_scale_x, float(eff.get('scale_x', 1.0)))
+            max_scale_y = max(max_scale_y, float(eff.get('scale_y', 1.0)))
+            if abs(float(eff.get('rotation', 0.0))) > 0.01:
+                rotates = True
+
+        max_w = 0
+        max_h = 0
+        for width, height in sprite_sizes:
+            w = width * foreground_scale * max_scale_x
+            h = height * foreground_scale * max_scale_y
+            if rotates:
+                # 任意角度旋转后的外接矩形不超过对角线长度
+                w = h = math.hypot(w, h)
+            max_w = max(max_w, int(math.ceil(w)))
+            max_h = max(max_h, int(math.ceil(h)))
+        return max_w, max_h
+
+    @staticmethod
+    def estimate(total_frames: int, canvas_width: int, canvas_height: int,
+                 sprite_sizes: Iterable[Tuple[int, int]], transformed_sprite_size: Tuple[int, int],
+                 output_dtype: str = "float32") -> Dict[str, int]:
+        """
+        估算峰值内存（字节），返回各部分明细及总量
+
+        - frames: 输出帧批次 (T, H, W, 3)
+        - masks: 输出遮罩批次 (T, H, W)
+        - background: 背景图的PIL副本（原图 + 调整到画布尺寸）
+        - sprites: 前景图缓存（RGBA，含缩放副本）
+        - working: 单帧合成的临时缓冲（RGBA画布、RGB结果、遮罩、变换后的前景图、写入输出前的8位拷贝）
+        """
+        element_bytes = DTYPE_BYTES.get(output_dtype, 4)
+        canvas_pixels = canvas_width * canvas_height
+        sprite_sizes = list(sprite_sizes)
+        tw, th = transformed_sprite_size
+
+        breakdown = {
+            "frames": total_frames * canvas_pixels * 3 * element_bytes,
+            "masks": total_frames * canvas_pixels * element_bytes,
+            "background": canvas_pixels * 3 * 2,
+            "sprites": sum(w * h * 4 * 2 for w, h in sprite_sizes),
+            "working": canvas_pixels * (4 + 3 + 1) + tw * th * 4 * 2 + canvas_pixels * (3 + 1),
+        }
+        breakdown["total"] = sum(breakdown.values())
+        return breakdown
+
+    @staticmethod
+    def plan(total_frames: int, canvas_width: int, canvas_height: int,
+             sprite_sizes: Iterable[Tuple[int, int]], transformed_sprite_size: Tuple[int, int],
+             budget_bytes: int = 0, policy: str = "auto", output_dtype: str = "float32") -> Dict[str, Any]:
+        """
+        根据预算选择输出模式
+
+        Args:
+            budget_bytes: 内存预算（0表示不限制）
+            policy: "auto" = 超出预算时自动切换为紧凑输出（float16），仍超出则拒绝
+                    "refuse" = 超出预算直接拒绝
+            output_dtype: 请求的输出类型（已是 float16 时不再降级）
+
+        Returns:
+            {"output_dtype", "compact", "estimate": 明细, "estimated_bytes"}
+
+        Raises:
+            ValueError: 预计内存超出预算且无法降级
+        """
+        sprite_sizes = list(sprite_sizes)
+        estimate = RenderMemoryPlanner.estimate(
+            total_frames, canvas_width, canvas_height, sprite_sizes, transformed_sprite_size, output_dtype
+        )
+        plan = {"output_dtype": output_dtype, "compact": output_dtype == "float16", "estimate": estimate,
+                "estimated_bytes": estimate["total"]}
+        if not budget_bytes or estimate["total"] <= budget_bytes:
+            return plan
+
+        if policy == "auto" and output_dtype == "float32":
+            compact = RenderMemoryPlanner.estimate(
+                total_frames, canvas_width, canvas_height, sprite_sizes, transformed_sprite_size, "float16"
+            )
+            if compact["total"] <= budget_bytes:
+                print(f"Warning: Estimated render memory {estimate['total'] / 1048576:.0f}MB exceeds budget "
+                      f"{budget_bytes / 1048576:.0f}MB, switching to compact float16 output "
+                      f"({compact['total'] / 1048576:.0f}MB)")
+                return {"output_dtype": "float16", "compact": True, "estimate": compact,
+                        "estimated_bytes": compact["total"]}
+            estimate = compact
+
+        raise ValueError(
+            f"预计渲染内存 {estimate['total'] / 1048576:.0f}MB 超出预算 {budget_bytes / 1048576:.0f}MB"
+            f"（{total_frames}帧 × {canvas_width}x{canvas_height}，其中帧批次 {estimate['frames'] / 1048576:.0f}MB、"
+            f"遮罩 {estimate['masks'] / 1048576:.0f}MB）。请减少帧数或画布尺寸，或提高 memory_budget_mb"
+        )
+
+# author.yichengup.RenderMemoryPlanner 2025.01.XX
@@ -0,0 +1,147 @@
+"""
+渲染性能统计工具
+- 按阶段累计耗时和调用次数
+- 计数器（渲染帧数、像素数等）
+- 显式登记的内存分配及其峰值
+未启用时使用空实现，所有调用都是无操作，不产生额外开销
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+# 环境变量开关：YC_ANIMATION_PROFILE=1
+PROFILE_ENV_VAR = "YC_ANIMATION_PROFILE"
+
+
+class _StageTimer:
+    """单个阶段的计时上下文"""
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "RenderProfiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.add_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class RenderProfiler:
+    """启用状态下的统计器"""
+    enabled = True
+
+    def __init__(self):
+        self._created = time.perf_counter()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._current_bytes = 0
+        self._peak_bytes = 0
+        self._notes: Dict[str, Any] = {}
+
+    def stage(self, name: str) -> _StageTimer:
+        """阶段计时：with profiler.stage("composite"): ..."""
+        return _StageTimer(self, name)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = {"seconds": 0.0, "calls": 0}
+        stage["seconds"] += seconds
+        stage["calls"] += calls
+
+    def count(self, name: str, value: int = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + int(value)
+
+    def alloc(self, nbytes: int) -> None:
+        """登记一次内存分配并更新峰值"""
+        self._current_bytes += int(nbytes)
+        if self._current_bytes > self._peak_bytes:
+            self._peak_bytes = self._current_bytes
+
+    def free(self, nbytes: int) -> None:
+        self._current_bytes = max(0, self._current_bytes - int(nbytes))
+
+    def note(self, name: str, value: Any) -> None:
+        """附加信息（如渲染模式、缓存命中），原样写入报告"""
+        self._notes[name] = value
+
+    def report(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self._created
+        return {
+            "total_seconds": round(total, 6),
+            "stages": {
+                name: {"seconds": round(stage["seconds"], 6), "calls": int(stage["calls"])}
+                for name, stage in sorted(self._stages.items(), key=lambda item: -item[1]["seconds"])
+            },
+            "counters": dict(sorted(self._counters.items())),
+            "peak_allocated_bytes": self._peak_bytes,
+            "notes": self._notes,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), separators=(',', ':'))
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _NullProfiler:
+    """未启用状态：所有方法均为空操作"""
+    enabled = False
+
+    def stage(self, name: str) -> _NullStage:
+        return _NULL_STAGE
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def alloc(self, nbytes: int) -> None:
+        pass
+
+    def free(self, nbytes: int) -> None:
+        pass
+
+    def note(self, name: str, value: Any) -> None:
+        pass
+
+    def report(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def to_json(self) -> str:
+        return ""
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def profiling_requested(flag: bool = False) -> bool:
+    """节点输入或环境变量任一开启即启用"""
+    if flag:
+        return True
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def create_profiler(flag: bool = False):
+    """按需创建统计器；未启用时返回共享的空实现"""
+    return RenderProfiler() if profiling_requested(flag) else NULL_PROFILER
+
+# author.yichengup.RenderProfiler 2025.01.XX
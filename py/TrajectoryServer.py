@@ -0,0 +1,203 @@
+"""
+轨迹预览HTTP接口
+在ComfyUI的PromptServer上注册 /yc_animation/trajectory：
+只计算每帧的位置和插值后的效果，不渲染图像，供画布编辑器即时预览
+
+请求（POST JSON 或 GET 查询参数）：
+    path_data, total_frames, smooth_path, spline_tolerance, effects_data,
+    end_behavior("hold"/"loop"/"ping_pong"), format("json"/"binary")
+响应：
+    json: {"total_frames", "columns", "visible", "x", "y", "scale_x", ...}（按列存储）
+    binary: float32 小端序 (total_frames, len(columns)) 数组，列名在 X-YC-Columns 响应头中
+"""
+import asyncio
+import json
+import sys
+import traceback
+from array import array
+
+from aiohttp import web
+
+ROUTE_PATH = "/yc_animation/trajectory"
+
+# 输出列（binary 格式按此顺序排列；不可见帧的 x/y 为 NaN）
+COLUMNS = ("visible", "x", "y", "scale_x", "scale_y", "rotation", "flip_x", "flip_y", "opacity")
+
+MAX_TOTAL_FRAMES = 10000
+
+END_BEHAVIORS = ("hold", "loop", "ping_pong")
+
+
+def compute_trajectory(path_data, total_frames, smooth_path=True, effects_data="", spline_tolerance=0.0,
+                       end_behavior="hold"):
+    """
+    使用与 ycImageAnimatePath 相同的时间轴计算逐帧位置和效果
+    返回 {列名: [每帧的值, ...]}
+    """
+    # 延迟导入：注册路由时不加载时间轴和解析模块
+    try:
+        from .AnimationTimeline import AnimationTimeline
+        from .PathDataParser import PathDataParser
+    except ImportError:
+        from AnimationTimeline import AnimationTimeline
+        from PathDataParser import PathDataParser
+
+    engine = AnimationTimeline()
+    keyframes = PathDataParser.extract_keyframes_for_animation(PathDataParser.parse(path_data))
+    effects_dict = engine.parse_effects_data(effects_data)
+    timeline = engine.build_render_timeline(
+        keyframes, effects_dict, total_frames, smooth_path, spline_tolerance=spline_tolerance,
+        end_behavior=end_behavior
+    )
+
+    result = {name: [] for name in COLUMNS}
+    for entry in timeline:
+        position = entry['position']
+        effects = entry['effects']
+        result["visible"].append(position is not None)
+        result["x"].append(float(position['x']) if position is not None else None)
+        result["y"].append(float(position['y']) if position is not None else None)
+        result["scale_x"].append(float(effects['scale_x']))
+        result["scale_y"].append(float(effects['scale_y']))
+        result["rotation"].append(float(effects['rotation']))
+        result["flip_x"].append(bool(effects['flip_x']))
+        result["flip_y"].append(bool(effects['flip_y']))
+        result["opacity"].append(float(effects['opacity']))
+    return result
+
+
+def _parse_bool(value, default):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_request_params(params):
+    """校验请求参数（包括路径数据的结构），错误时抛出 ValueError"""
+    try:
+        from .PathDataParser import PathDataParser
+    except ImportError:
+        from PathDataParser import PathDataParser
+
+    try:
+        total_frames = int(params.get("total_frames", 60))
+    except (TypeError, ValueError):
+        raise ValueError("total_frames 必须是整数")
+    if total_frames < 1 or total_frames > MAX_TOTAL_FRAMES:
+        raise ValueError(f"total_frames 必须在 1 到 {MAX_TOTAL_FRAMES} 之间")
+
+    try:
+        spline_tolerance = float(params.get("spline_tolerance", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        raise ValueError("spline_tolerance 必须是数字")
+    if spline_tolerance < 0:
+        raise ValueError("spline_tolerance 不能为负数")
+
+    end_behavior = str(params.get("end_behavior", "hold") or "hold").lower()
+    if end_behavior not in END_BEHAVIORS:
+        raise ValueError(f"未知的结束行为：{end_behavior}")
+
+    output_format = str(params.get("format", "json")).lower()
+    if output_format not in ("json", "binary"):
+        raise ValueError(f"未知的输出格式：{output_format}")
+
+    path_data = str(params.get("path_data", "") or "")
+    is_valid, error_message = PathDataParser.validate(path_data)
+    if not is_valid:
+        raise ValueError(f"路径数据格式错误：{error_message}")
+
+    return {
+        "path_data": path_data,
+        "effects_data": str(params.get("effects_data", "") or ""),
+        "total_frames": total_frames,
+        "smooth_path": _parse_bool(params.get("smooth_path"), True),
+        "spline_tolerance": spline_tolerance,
+        "end_behavior": end_behavior,
+        "format": output_format,
+    }
+
+
+def _encode_binary(trajectory, total_frames):
+    """按帧展开为 float32 小端序数组"""
+    values = array("f")
+    nan = float("nan")
+    for frame_idx in range(total_frames):
+        for name in COLUMNS:
+            value = trajectory[name][frame_idx]
+            values.append(nan if value is None else float(value))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+async def trajectory_handler(request):
+    if request.method == "POST":
+        try:
+            params = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return web.json_response({"error": "请求体必须是JSON对象"}, status=400)
+        if not isinstance(params, dict):
+            return web.json_response({"error": "请求体必须是JSON对象"}, status=400)
+    else:
+        params = dict(request.query)
+
+    try:
+        options = _parse_request_params(params)
+        # 计算在线程池中进行，不阻塞服务器事件循环
+        trajectory = await asyncio.get_running_loop().run_in_executor(
+            None, compute_trajectory,
+            options["path_data"], options["total_frames"], options["smooth_path"], options["effects_data"],
+            options["spline_tolerance"], options["end_behavior"]
+        )
+    except (ValueError, KeyError) as e:
+        # 参数和路径数据在 _parse_request_params 中校验，校验失败属于请求错误
+        return web.json_response({"error": f"无效的请求参数：{e}"}, status=400)
+    except Exception as e:
+        # 其余异常是服务器内部错误：记录后返回500，不当作请求错误
+        print(f"[TrajectoryServer] Error computing trajectory: {e!r}")
+        traceback.print_exc()
+        return web.json_response({"error": "轨迹计算失败（服务器内部错误）"}, status=500)
+
+    if options["format"] == "binary":
+        return web.Response(
+            body=_encode_binary(trajectory, options["total_frames"]),
+            content_type="application/octet-stream",
+            headers={
+                "X-YC-Columns": ",".join(COLUMNS),
+                "X-YC-Frames": str(options["total_frames"]),
+            },
+        )
+    return web.json_response({"total_frames": options["total_frames"], "columns": list(COLUMNS), **trajectory})
+
+
+def add_routes(router):
+    """
+    注册接口
+    router: web.Application.router（UrlDispatcher），或 PromptServer.instance.routes（RouteTableDef）
+    """
+    if hasattr(router, "add_get"):
+        router.add_get(ROUTE_PATH, trajectory_handler)
+        router.add_post(ROUTE_PATH, trajectory_handler)
+    else:
+        router.get(ROUTE_PATH)(trajectory_handler)
+        router.post(ROUTE_PATH)(trajectory_handler)
+
+
+def create_app():
+    """创建只包含轨迹接口的应用，可直接用于 aiohttp 测试客户端"""
+    app = web.Application()
+    add_routes(app.router)
+    return app
+
+
+def register_routes():
+    """在ComfyUI的PromptServer上注册接口；不在ComfyUI中运行时抛出 ImportError"""
+    from server import PromptServer
+    if getattr(PromptServer, "instance", None) is None:
+        return False
+    add_routes(PromptServer.instance.routes)
+    return True
+
+# author.yichengup.TrajectoryServer 2025.01.XX
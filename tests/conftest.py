@@ -0,0 +1,11 @@
+"""
+测试在无 ComfyUI 的环境中运行：复用基准测试的占位模块，并把 py/ 目录加入 sys.path
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import comfy_stub  # noqa: E402
+
+comfy_stub.install()
@@ -0,0 +1,88 @@
+import json
+
+import torch
+
+import Image_AnimatePathSweep
+from Animation_LayerComposite import ycAnimatedLayerComposite
+from DeviceTransfers import TransferLog
+from Image_AnimatePath import ycImageAnimatePath
+from RenderCache import AnimationRenderCache
+
+PATH = "0:10,10|20:100,70"
+
+
+def test_transfer_log_records_only_cross_device_copies():
+    transfers = TransferLog()
+    host = torch.rand(2, 3)
+    assert transfers.to_host(host, "noop") is host
+    transfers.to_device(host, "cpu", "noop", torch.float16)
+    assert transfers.count == 0
+
+    transfers.to_device(host, "meta", "upload")
+    assert transfers.summary()["transfers"]["upload"] == {
+        "direction": "host_to_device", "device": "meta", "count": 1, "bytes": host.nelement() * 4,
+    }
+
+
+def test_cache_key_on_cpu_records_no_transfers():
+    transfers = TransferLog()
+    image = torch.rand(1, 4, 4, 3)
+    assert AnimationRenderCache.make_key(transfers=transfers, image=image) == AnimationRenderCache.make_key(image=image)
+    assert transfers.count == 0
+
+
+def test_cpu_render_and_composite_stay_on_input_device():
+    background = torch.rand(1, 64, 96, 3)
+    frames, masks, report, _, layer = ycImageAnimatePath().animate(
+        background, PATH, 96, 64, 20, 1.0, True, smooth_path=False,
+        foreground_image=torch.rand(1, 6, 6, 3), output_layer=True, profile=True,
+    )
+    assert json.loads(report)["notes"]["device_transfers"]["count"] == 0
+    assert frames.device == masks.device == background.device
+
+    half_background = background.half()
+    out_frames, out_masks, transfer_report = ycAnimatedLayerComposite().composite(half_background, layer)
+    assert json.loads(transfer_report) == {"count": 0, "bytes": 0, "transfers": {}}
+    assert out_frames.device == out_masks.device == half_background.device
+    assert out_frames.dtype == out_masks.dtype == torch.float16
+
+
+class _SpyTransferLog(TransferLog):
+    """记录所有经过 TransferLog 的调用（包括不产生传输的CPU调用）"""
+    instances = []
+
+    def __init__(self):
+        super().__init__()
+        self.labels = set()
+        _SpyTransferLog.instances.append(self)
+
+    def to_host(self, tensor, label):
+        self.labels.add(label)
+        return super().to_host(tensor, label)
+
+    def to_device(self, tensor, device, label, dtype=None):
+        self.labels.add(label)
+        return super().to_device(tensor, device, label, dtype)
+
+
+def test_sweep_routes_through_transfer_log(monkeypatch):
+    monkeypatch.setattr(Image_AnimatePathSweep, "TransferLog", _SpyTransferLog)
+    _SpyTransferLog.instances.clear()
+    background = torch.rand(1, 64, 96, 3)
+    sprite = torch.rand(1, 6, 6, 3)
+    sweep_frames, sweep_masks, index, variant_frames, _ = Image_AnimatePathSweep.ycImageAnimatePathSweep().sweep(
+        background, PATH + "\n0:90,60|20:10,10", 96, 64, 20, 1.0, True, smooth_path=False,
+        foreground_image=sprite, output_dtype="float16", workers=2,
+    )
+
+    (transfers,) = _SpyTransferLog.instances
+    assert {"background_image", "foreground_image", "frame_upload", "mask_upload"} <= transfers.labels
+    assert transfers.count == 0
+    assert sweep_frames.device == sweep_masks.device == background.device
+    assert sweep_frames.dtype == torch.float16
+    assert len(json.loads(index)) == 2
+
+    frames = ycImageAnimatePath().animate(
+        background, PATH, 96, 64, 20, 1.0, True, smooth_path=False, foreground_image=sprite, output_dtype="float16",
+    )[0]
+    assert torch.equal(variant_frames[0], frames)
@@ -0,0 +1,50 @@
+import pytest
+
+from Animation_EffectsMerge import ycAnimationEffectsMerge
+from EffectsDataParser import EffectsDataParser
+
+FIRST = "0:1,1,0,0,0,1|10:2,2,45,0,0,0.5"
+SECOND = "10:0.5,0.5,-30,1,0,1|20:1,1,90,0,1,1"
+
+
+def test_merge_last_matches_concatenated_parse():
+    merged = EffectsDataParser.merge([FIRST, SECOND], "last")
+    assert list(merged) == [0, 10, 20]
+    assert merged == EffectsDataParser.parse(FIRST + "|" + SECOND)
+    assert merged[10]["rotation"] == -30.0
+
+
+def test_merge_first_keeps_earliest_input():
+    merged = EffectsDataParser.merge([FIRST, SECOND], "first")
+    assert list(merged) == [0, 10, 20]
+    assert merged[10] == EffectsDataParser.parse(FIRST)[10]
+
+
+def test_merge_error_policy_raises_on_conflict():
+    with pytest.raises(ValueError, match="关键帧 10"):
+        EffectsDataParser.merge([FIRST, SECOND], "error")
+    # 没有冲突时与 last 相同
+    assert EffectsDataParser.merge([FIRST, "20:1,1,90,0,1,1"], "error") == \
+        EffectsDataParser.merge([FIRST, "20:1,1,90,0,1,1"], "last")
+
+
+def test_merge_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        EffectsDataParser.merge([FIRST], "newest")
+
+
+def test_merge_node_accepts_dynamic_inputs_in_number_order():
+    optional = ycAnimationEffectsMerge.INPUT_TYPES()["optional"]
+    assert "effects_12" in optional
+    assert optional["effects_12"][0] == "STRING"
+    assert "other_input" not in optional
+    with pytest.raises(KeyError):
+        optional["other_input"]
+
+    # 输入编号决定优先级，与关键字参数顺序无关
+    merged, table = ycAnimationEffectsMerge().merge(
+        FIRST, duplicate_policy="last", effects_12="10:3,3,0,0,0,1", effects_2=SECOND
+    )
+    assert table[10]["scale_x"] == 3.0
+    assert list(table) == [0, 10, 20]
+    assert EffectsDataParser.parse(merged) == table
@@ -0,0 +1,54 @@
+import torch
+
+from AnimationTimeline import AnimationTimeline
+from Animation_OpticalFlow import ycAnimationOpticalFlow
+from Animation_PointTracks import ycAnimationPointTracks
+from Animation_TrajectoryExport import ycAnimationTrajectoryExport
+from Image_AnimatePath import ycImageAnimatePath
+from TrajectoryServer import compute_trajectory
+
+PATH = "2:10,10|8:70,40"
+TOTAL_FRAMES = 30
+
+
+def _expected_sources(end_behavior):
+    return AnimationTimeline().plan_cycle_frames([{"frame": 2}, {"frame": 8}], TOTAL_FRAMES, end_behavior)
+
+
+def test_plan_cycle_frames():
+    assert _expected_sources("hold") is None
+    assert _expected_sources("loop")[8:16] == [8, 3, 4, 5, 6, 7, 2, 3]
+    assert _expected_sources("ping_pong")[8:16] == [8, 7, 6, 5, 4, 3, 2, 3]
+
+
+def test_motion_nodes_follow_end_behavior():
+    sprite = torch.rand(1, 6, 6, 3)
+    for end_behavior in ("loop", "ping_pong"):
+        sources = _expected_sources(end_behavior)
+
+        frames, masks = ycImageAnimatePath().animate(
+            torch.zeros(1, 64, 96, 3), PATH, 96, 64, TOTAL_FRAMES, 1.0, True, smooth_path=False,
+            foreground_image=sprite, end_behavior=end_behavior,
+        )[:2]
+        tracks = ycAnimationTrajectoryExport().export(
+            PATH, 96, 64, TOTAL_FRAMES, smooth_path=False, end_behavior=end_behavior
+        )[0]
+        points = ycAnimationPointTracks().point_tracks(
+            PATH, 96, 64, TOTAL_FRAMES, 1.0, True, smooth_path=False, foreground_image=sprite,
+            num_points=4, end_behavior=end_behavior,
+        )[0]
+        preview = compute_trajectory(PATH, TOTAL_FRAMES, smooth_path=False, end_behavior=end_behavior)
+        flow = ycAnimationOpticalFlow().optical_flow(
+            PATH, 96, 64, TOTAL_FRAMES, 1.0, True, smooth_path=False, foreground_image=sprite,
+            end_behavior=end_behavior,
+        )[0]
+
+        for frame_idx, source in enumerate(sources):
+            assert torch.equal(frames[frame_idx], frames[source])
+            assert torch.equal(masks[frame_idx], masks[source])
+            assert torch.equal(tracks[frame_idx], tracks[source])
+            assert torch.equal(points[frame_idx], points[source])
+            assert preview["x"][frame_idx] == preview["x"][source]
+            assert preview["y"][frame_idx] == preview["y"][source]
+        # 周期之后仍然有运动（hold 时最后一个关键帧之后光流为0）
+        assert flow[10:TOTAL_FRAMES - 1].abs().sum() > 0
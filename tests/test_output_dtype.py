@@ -0,0 +1,45 @@
+import pytest
+import torch
+
+from Image_AnimatePath import ycImageAnimatePath
+
+PATH = "0:40,40|29:200,180"
+EFFECTS = "0:1,1,0,0,0,1|29:1.5,1.5,60,0,0,0.6"
+
+
+def _render(**kwargs):
+    torch.manual_seed(0)
+    background = torch.rand(1, 256, 256, 3)
+    sprite = torch.rand(1, 32, 24, 3)
+    return ycImageAnimatePath().animate(
+        background, PATH, 256, 256, 30, 1.0, True, smooth_path=False,
+        foreground_image=sprite, effects_data=EFFECTS, **kwargs
+    )
+
+
+def test_float16_output_matches_float32():
+    frames32, masks32 = _render()[:2]
+    frames16, masks16, _, estimated16 = _render(output_dtype="float16")[:4]
+    assert frames16.dtype == masks16.dtype == torch.float16
+    # 8位数据归一化后在 float16 中的误差不超过半个量化步长
+    assert torch.allclose(frames16.float(), frames32, atol=1e-3)
+    assert torch.allclose(masks16.float(), masks32, atol=1e-3)
+    assert estimated16 < _render()[3]
+
+
+def test_memory_budget_switches_to_compact_output():
+    full_mb = _render()[3]
+    compact_mb = _render(output_dtype="float16")[3]
+    budget_mb = (full_mb + compact_mb) // 2
+    assert compact_mb <= budget_mb < full_mb
+
+    frames, masks = _render(memory_budget_mb=budget_mb)[:2]
+    expected_frames, expected_masks = _render(output_dtype="float16")[:2]
+    assert frames.dtype == torch.float16
+    assert torch.equal(frames, expected_frames)
+    assert torch.equal(masks, expected_masks)
+
+    with pytest.raises(ValueError):
+        _render(memory_budget_mb=budget_mb, memory_policy="refuse")
+    with pytest.raises(ValueError):
+        _render(memory_budget_mb=1)
@@ -0,0 +1,27 @@
+import torch
+
+from Animation_OpticalFlow import ycAnimationOpticalFlow
+from Animation_PointTracks import ycAnimationPointTracks
+
+PATH = "0:20,20|12:70,45"
+EFFECTS = "0:1,1,0,0,0,1|12:1.3,0.8,25,0,0,1"
+
+
+def test_point_tracks_follow_optical_flow():
+    """同一条时间轴：点在第 t 帧所在像素的光流等于该点到第 t+1 帧的位移"""
+    sprite = torch.rand(1, 16, 12, 3)
+    args = (PATH, 96, 64, 13, 1.5, True)
+    kwargs = dict(smooth_path=False, foreground_image=sprite, effects_data=EFFECTS)
+    tracks, visibility = ycAnimationPointTracks().point_tracks(*args, num_points=64, **kwargs)[:2]
+    flow, flow_mask = ycAnimationOpticalFlow().optical_flow(*args, **kwargs)[:2]
+
+    checked = 0
+    for frame_idx in range(12):
+        for point, next_point, visible in zip(tracks[frame_idx], tracks[frame_idx + 1], visibility[frame_idx]):
+            x, y = int(point[0]), int(point[1])
+            if not visible or not flow_mask[frame_idx, y, x]:
+                continue
+            # 光流在像素中心取值，点到像素中心不超过半个像素，缩放/旋转变化带来的差异很小
+            assert torch.allclose(flow[frame_idx, y, x], next_point - point, atol=0.1)
+            checked += 1
+    assert checked > 200
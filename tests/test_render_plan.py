@@ -0,0 +1,110 @@
+import json
+
+import torch
+
+from Image_AnimatePath import ycImageAnimatePath
+
+
+def _assert_sources_rendered(frame_sources):
+    for frame_idx, source in enumerate(frame_sources):
+        assert source <= frame_idx
+        assert frame_sources[source] == source
+
+
+def test_frame_step_sources_point_at_rendered_frames():
+    node = ycImageAnimatePath()
+    # 第5帧开始静止，步长2时第5帧被跳过
+    hold_sources = [0, 1, 2, 3, 4, 5, 5, 5, 5, 5]
+    stepped = node._plan_frame_step(hold_sources, 2)
+    _assert_sources_rendered(stepped)
+    assert stepped == [0, 0, 2, 2, 4, 4, 4, 4, 4, 4]
+
+
+def test_draft_render_with_hold_tail_on_odd_frame():
+    torch.manual_seed(0)
+    background = torch.rand(1, 64, 64, 3)
+    foreground = torch.rand(1, 8, 8, 3)
+    frames, masks = ycImageAnimatePath().animate(
+        background, "0:10,10|5:50,40", 64, 64, 10, 1.0, True, smooth_path=False,
+        foreground_image=foreground, quality="draft", draft_frame_step=2,
+    )[:2]
+    assert frames.shape == (10, 64, 64, 3)
+    for frame_idx in range(5, 10):
+        assert torch.equal(frames[frame_idx], frames[4])
+        assert torch.equal(masks[frame_idx], masks[4])
+    assert not torch.equal(frames[4], frames[2])
+
+
+def test_fill_hold_frames_copies_loop_and_reverse_runs():
+    node = ycImageAnimatePath()
+    frame_sources = [0, 1, 2, 3, 1, 2, 3, 2, 1, 1, 1]
+    output_batch = torch.zeros((11, 2, 2, 3))
+    mask_batch = torch.zeros((11, 2, 2))
+    for frame_idx in range(4):
+        output_batch[frame_idx] = frame_idx
+        mask_batch[frame_idx] = frame_idx
+    node._fill_hold_frames(output_batch, mask_batch, frame_sources)
+    assert output_batch[:, 0, 0, 0].tolist() == [float(source) for source in frame_sources]
+    assert mask_batch[:, 0, 0].tolist() == [float(source) for source in frame_sources]
+
+
+def test_draft_frame_step_with_loop():
+    torch.manual_seed(0)
+    background = torch.rand(1, 64, 64, 3)
+    foreground = torch.rand(1, 8, 8, 3)
+    frames = ycImageAnimatePath().animate(
+        background, "0:10,10|5:50,40", 64, 64, 23, 1.0, True, smooth_path=False,
+        foreground_image=foreground, quality="draft", draft_frame_step=2, end_behavior="ping_pong",
+    )[0]
+    assert frames.shape == (23, 64, 64, 3)
+    assert torch.equal(frames[6], frames[4])
+    assert torch.equal(frames[10], frames[0])
+
+
+def test_visibility_culling_matches_paste(monkeypatch):
+    """包围盒裁剪不能跳过实际会画到画布上的帧：与关闭裁剪的结果逐帧一致"""
+    args = (torch.rand(1, 64, 96, 3), "0:-30,-25|40:125,90", 96, 64, 41, 1.0, True)
+    kwargs = dict(smooth_path=False, foreground_image=torch.rand(1, 17, 9, 3),
+                  effects_data="0:1,1,0,0,0,1|40:1.7,0.6,173,1,0,1")
+    frames, masks = ycImageAnimatePath().animate(*args, **kwargs)[:2]
+    monkeypatch.setattr(ycImageAnimatePath, "_is_sprite_visible", lambda self, *a: True)
+    expected_frames, expected_masks = ycImageAnimatePath().animate(*args, **kwargs)[:2]
+    assert torch.equal(frames, expected_frames)
+    assert torch.equal(masks, expected_masks)
+
+
+def test_plan_draft_proxy_size():
+    node = ycImageAnimatePath()
+    assert node._plan_draft("final", 96, 64, 0.5, "bilinear", 2, True) is None
+    draft = node._plan_draft("draft", 97, 64, 0.5, "nearest", 0, False)
+    assert (draft["width"], draft["height"]) == (48, 32)
+    assert draft["frame_step"] == 1
+    assert draft["upscale"] is False
+
+
+def test_draft_frame_step_keeps_full_frame_count():
+    total_frames = 17
+    background = torch.rand(1, 64, 96, 3)
+    foreground = torch.rand(1, 10, 10, 3)
+    for frame_step in (1, 2, 3):
+        for upscale in (True, False):
+            frames, masks, report = ycImageAnimatePath().animate(
+                background, "0:5,5|16:90,60", 96, 64, total_frames, 1.0, True, smooth_path=False,
+                foreground_image=foreground, quality="draft", draft_scale=0.5,
+                draft_frame_step=frame_step, draft_upscale=upscale, profile=True,
+            )[:3]
+            size = (64, 96) if upscale else (32, 48)
+            assert frames.shape == (total_frames,) + size + (3,)
+            assert masks.shape == (total_frames,) + size
+
+            counters = json.loads(report)["counters"]
+            rendered = -(-total_frames // frame_step)
+            assert counters["frames_rendered"] == rendered
+            assert counters["frames_copied"] == total_frames - rendered
+            # 跳过的帧复制步长内第一个渲染帧
+            for frame_idx in range(total_frames):
+                source = frame_idx - frame_idx % frame_step
+                assert torch.equal(frames[frame_idx], frames[source])
+                assert torch.equal(masks[frame_idx], masks[source])
+            if frame_step > 1:
+                assert not torch.equal(frames[0], frames[frame_step])
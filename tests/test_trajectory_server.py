@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+
+import TrajectoryServer
+from TrajectoryServer import COLUMNS, ROUTE_PATH, create_app
+
+
+def _post(body):
+    """启动测试服务器，POST 一次，返回 (状态码, JSON响应)"""
+    async def run():
+        async with TestClient(TestServer(create_app())) as client:
+            response = await client.post(ROUTE_PATH, json=body)
+            return response.status, await response.json()
+    return asyncio.run(run())
+
+
+def test_trajectory_route_returns_columns():
+    status, payload = _post({"path_data": "0:10,10|10:110,60", "total_frames": 11, "smooth_path": False})
+    assert status == 200
+    assert payload["total_frames"] == 11
+    assert payload["columns"] == list(COLUMNS)
+    assert payload["visible"] == [True] * 11
+    assert payload["x"][0] == 10.0 and payload["x"][-1] == 110.0
+    assert payload["y"][-1] == 60.0
+
+
+def test_trajectory_route_rejects_malformed_keyframes():
+    bad_paths = [
+        {"keyframes": [{"frame": 0, "points": 5}]},
+        {"keyframes": [{"frame": 0, "points": [[1, 2]]}]},
+        {"keyframes": [{"frame": None, "points": [{"x": 1, "y": 2}]}]},
+    ]
+    for path in bad_paths:
+        status, payload = _post({"path_data": json.dumps(path), "total_frames": 10})
+        assert status == 400
+        assert "error" in payload
+
+
+def test_trajectory_route_rejects_bad_frame_count():
+    status, payload = _post({"path_data": "0:10,10|10:110,60", "total_frames": "many"})
+    assert status == 400
+
+
+def test_trajectory_route_end_behavior():
+    status, payload = _post({"path_data": "0:10,10|4:50,10", "total_frames": 9, "smooth_path": False,
+                             "end_behavior": "ping_pong"})
+    assert status == 200
+    assert payload["x"][5:9] == payload["x"][3::-1]
+    status, payload = _post({"path_data": "0:10,10|4:50,10", "total_frames": 9, "end_behavior": "bounce"})
+    assert status == 400
+
+
+def test_trajectory_route_reports_server_errors_as_500(monkeypatch):
+    def broken_trajectory(*args):
+        raise TypeError("internal bug")
+
+    monkeypatch.setattr(TrajectoryServer, "compute_trajectory", broken_trajectory)
+    status, payload = _post({"path_data": "0:10,10|10:110,60", "total_frames": 11})
+    assert status == 500
+    assert "error" in payload
+
+
+def test_trajectory_route_rejects_non_json_body():
+    async def run():
+        async with TestClient(TestServer(create_app())) as client:
+            response = await client.post(ROUTE_PATH, data="not json", headers={"Content-Type": "application/json"})
+            return response.status
+    assert asyncio.run(run()) == 400